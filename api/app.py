@@ -3,27 +3,51 @@ from flask import Flask
 from flasgger import Swagger # type: ignore
 
 from api.config import Config
+from api.db_pool import init_db_pool
+from api.async_db import init_async_db
 from api.extensions import db, socketio, cache
+from api.tmdb_client import init_tmdb_client
+from api.json_provider import FastJSONProvider
+from api.compression import init_compression
+from api.search_index import init_search_index
+from api.suggest import init_suggest
+from api.ingest import ingest_cli
+from api.sync import init_sync, sync_cli
+from api.session_writer import init_session_writer
+from api.session_cache import init_session_cache
+from api.session_retention import init_session_retention, sessions_cli
+from api.trending_push import init_trending_push
 
 from api.routes.health import bp as health_bp
 from api.routes.auth import bp as auth_bp
 from api.routes.trending import bp as trending_bp
 from api.routes.movies import bp as movies_bp
 from api.routes.tv import bp as tv_bp
+from api.routes.batch import bp as batch_bp
 
 
-def create_app():
+def create_app(test_config=None):
     app = Flask(__name__)
     app.config.from_object(Config)
+    if test_config:
+        app.config.update(test_config)
+    app.json = FastJSONProvider(app)
 
     # Logger
     app.logger.setLevel("INFO")
 
     # Extensions
+    init_db_pool(app)
     db.init_app(app)
+    init_async_db(app)
     Swagger(app)
-    socketio.init_app(app)
+    socketio.init_app(app, message_queue=app.config.get("SOCKETIO_MESSAGE_QUEUE"))
     cache.init_app(app)
+    init_tmdb_client(app)
+    init_compression(app)
+    init_search_index(app, on_loaded=lambda: init_suggest(app))
+    init_session_writer(app)
+    init_session_cache(app)
     
     
 
@@ -33,6 +57,15 @@ def create_app():
     app.register_blueprint(trending_bp)
     app.register_blueprint(movies_bp)
     app.register_blueprint(tv_bp)
+    app.register_blueprint(batch_bp)
+
+    # CLI commands
+    app.cli.add_command(ingest_cli)
+    app.cli.add_command(sync_cli)
+    app.cli.add_command(sessions_cli)
+    init_sync(app)
+    init_session_retention(app)
+    init_trending_push(app)
 
     # WebSocket test event
     @socketio.on("ping")
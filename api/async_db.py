@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Async engine and session factory next to the sync `db`.
+
+Coroutine code uses `async_session()` so Session and User reads and
+writes do not block the event loop; the models are the same db.Model
+classes. The engine points at the same database as `db` (or at
+ASYNC_DATABASE_URL), with the driver swapped for asyncpg or aiosqlite
+and the DB_* pool settings from Config. It is created on first use, so
+workers that never touch it need neither driver installed.
+"""
+
+from typing import Any
+
+from flask import Flask
+from sqlalchemy import or_, select
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from api.db_pool import engine_options
+from api.models.session import Session
+
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+_config: dict[str, Any] = {}
+_engine: AsyncEngine | None = None
+_sessionmaker: async_sessionmaker[AsyncSession] | None = None
+
+
+def async_url(url: str | URL, external_pooler: bool = False) -> URL:
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver for {backend}")
+    url = url.set(drivername=ASYNC_DRIVERS[backend])
+    if external_pooler and backend == "postgresql":
+        # Transaction pooling hands each transaction a different server
+        # connection, where asyncpg's prepared statements do not exist
+        url = url.update_query_dict({"prepared_statement_cache_size": "0"})
+    return url
+
+
+def async_engine_options(config: dict[str, Any]) -> dict[str, Any]:
+    options = engine_options(config)
+    # The sync pool classes cannot serve an async engine; its default
+    # (AsyncAdaptedQueuePool) takes the same sizing arguments
+    if options.pop("poolclass", None) is NullPool:
+        options["poolclass"] = NullPool
+    options.pop("connect_args", None)
+
+    if make_url(config["SQLALCHEMY_DATABASE_URI"]).get_backend_name() == "postgresql":
+        if config.get("DB_POOLER") == "external":
+            options["connect_args"] = {"statement_cache_size": 0}
+        elif config.get("DB_STATEMENT_TIMEOUT_MS", 0):
+            options["connect_args"] = {
+                "server_settings": {"statement_timeout": str(config["DB_STATEMENT_TIMEOUT_MS"])},
+            }
+    return options
+
+
+def init_async_db(app: Flask) -> None:
+    global _config, _engine, _sessionmaker
+
+    _config = {
+        **app.config,
+        "SQLALCHEMY_DATABASE_URI": app.config.get("ASYNC_DATABASE_URL")
+        or app.config["SQLALCHEMY_DATABASE_URI"],
+    }
+    _engine = None
+    _sessionmaker = None
+
+
+def get_async_engine() -> AsyncEngine:
+    global _engine, _sessionmaker
+
+    if _engine is None:
+        url = async_url(_config["SQLALCHEMY_DATABASE_URI"], _config.get("DB_POOLER") == "external")
+        _engine = create_async_engine(url, **async_engine_options(_config))
+        _sessionmaker = async_sessionmaker(_engine, expire_on_commit=False)
+    return _engine
+
+
+def async_session() -> AsyncSession:
+    """New AsyncSession; use as `async with async_session() as session:`."""
+    get_async_engine()
+    return _sessionmaker()
+
+
+async def record_session_async(**fields: Any) -> Session:
+    """Insert and commit a Session row without blocking the event loop."""
+    row = Session(**fields)
+    async with async_session() as session:
+        session.add(row)
+        await session.commit()
+    return row
+
+
+async def live_session_async(session_id: str) -> Session | None:
+    """The non-revoked Session row for a guest or user session id, if any."""
+    async with async_session() as session:
+        result = await session.execute(
+            select(Session).where(or_(
+                Session.tmdb_guest_session_id == session_id,
+                Session.tmdb_user_session_id == session_id,
+            )).where(Session.revoked_at.is_(None)).limit(1)
+        )
+        return result.scalars().first()
+
+
+async def dispose_async_engine() -> None:
+    global _engine, _sessionmaker
+
+    if _engine is not None:
+        await _engine.dispose()
+    _engine = None
+    _sessionmaker = None
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Cache helpers for read-only routes.
+Builds canonical cache keys from the query string so equivalent requests
+share one entry and different pages never collide, and serves stale
+entries while they are refreshed in the background.
+"""
+
+import functools
+import hashlib
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable
+from urllib.parse import urlencode
+
+from flask import Response, copy_current_request_context, current_app, g, request
+
+from api.compression import DYNAMIC_ENCODERS, apply_encoding, negotiate, precompress
+from api.extensions import cache, socketio
+from api.projection import fields_arg, project_bytes
+from api.rate_limiter import BACKGROUND
+
+DEFAULT_TIMEOUT = 300
+DEFAULT_STALE_TIMEOUT = 3600
+
+Normalizer = Callable[[str | None], Any]
+
+
+def clamp_page(page: int | None, max_page: int) -> int:
+    if page is None:
+        return 1
+    return max(1, min(page, max_page))
+
+
+def page_arg(max_page: int) -> Normalizer:
+    def normalize(raw: str | None) -> int:
+        return clamp_page(int_arg(raw), max_page)
+    return normalize
+
+
+def int_arg(raw: str | None) -> int | None:
+    try:
+        return int(raw) if raw is not None else None
+    except ValueError:
+        return None
+
+
+def flag_arg(raw: str | None) -> bool:
+    return (raw or "false").lower() == "true"
+
+
+def text_arg(raw: str | None) -> str | None:
+    if raw is None:
+        return None
+    text = " ".join(raw.split()).casefold()
+    return text or None
+
+
+def build_cache_key(path: str, params: dict[str, Any] | None = None) -> str:
+    """
+    Canonical key for a route path and its normalized params.
+    Params set to None are dropped and the rest are sorted, so the key
+    does not depend on argument order.
+    """
+    items = sorted(
+        (name, str(value).lower() if isinstance(value, bool) else str(value))
+        for name, value in (params or {}).items()
+        if value is not None
+    )
+    return f"view{path}?{urlencode(items)}"
+
+
+def normalized_args(spec: dict[str, Normalizer]) -> dict[str, Any]:
+    return {name: normalize(request.args.get(name)) for name, normalize in spec.items()}
+
+
+def request_cache_key(spec: dict[str, Normalizer]) -> Callable[..., str]:
+    """
+    Build a make_cache_key callable for @cache.cached.
+    Only params listed in spec take part in the key, so unknown query
+    params cannot be used to fill the cache with duplicates.
+    """
+    def make_key(*args: Any, **kwargs: Any) -> str:
+        return build_cache_key(request.path, normalized_args(spec))
+    return make_key
+
+
+def _entry(resp: Response, timeout: int, previous: dict[str, Any] | None = None) -> dict[str, Any]:
+    """
+    Cache entry holding the serialized body, so a hit is served as bytes
+    without re-encoding. With CACHE_PRECOMPRESS every enabled compressed
+    variant is kept too.
+
+    The strong ETag is a hash of the body, computed once here. When a
+    refresh yields the same body, Last-Modified keeps its old value.
+    """
+    body = resp.get_data()
+    etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+    last_modified = int(time.time())
+    if previous is not None and previous.get("etag") == etag:
+        last_modified = previous["last_modified"]
+
+    entry = {
+        "body": body,
+        "status": resp.status_code,
+        "mimetype": resp.mimetype,
+        "fresh_until": time.time() + timeout,
+        "etag": etag,
+        "last_modified": last_modified,
+        "encoded": {},
+    }
+    if current_app.config.get("CACHE_PRECOMPRESS", True):
+        entry["encoded"] = precompress(body)
+    return entry
+
+
+def _variant_etag(entry: dict[str, Any], encoding: str | None) -> str:
+    # Each encoded representation gets its own strong validator
+    return entry["etag"] if encoding is None else f"{entry['etag']}-{encoding}"
+
+
+def _matched_etag(entry: dict[str, Any]) -> str | None:
+    # Variants compressed per response (CACHE_PRECOMPRESS off) are tagged
+    # like precompressed ones, so every encoding's tag is recognised
+    names = dict.fromkeys([None, *entry["encoded"], *DYNAMIC_ENCODERS])
+    for tag in (_variant_etag(entry, name) for name in names):
+        if request.if_none_match.contains(tag):
+            return tag
+    return None
+
+
+def _not_modified(entry: dict[str, Any]) -> bool:
+    if request.if_none_match:
+        return request.if_none_match.star_tag or _matched_etag(entry) is not None
+    if request.if_modified_since:
+        return entry["last_modified"] <= request.if_modified_since.timestamp()
+    return False
+
+
+def _respond(entry: dict[str, Any]) -> Response:
+    """
+    Serve an entry, negotiating a precompressed variant. Conditional
+    requests that still match get a bodyless 304.
+    """
+    encoding = negotiate(entry["encoded"]) if entry["encoded"] else None
+
+    if _not_modified(entry):
+        resp = current_app.response_class(status=304)
+    else:
+        resp = current_app.response_class(
+            entry["body"], status=entry["status"], mimetype=entry["mimetype"]
+        )
+        if encoding is not None:
+            apply_encoding(resp, encoding, entry["encoded"][encoding])
+
+    if entry["encoded"]:
+        resp.vary.add("Accept-Encoding")
+    # A 304 confirms the representation the client holds
+    matched = _matched_etag(entry) if resp.status_code == 304 and request.if_none_match else None
+    resp.set_etag(matched or _variant_etag(entry, encoding))
+    resp.last_modified = datetime.fromtimestamp(entry["last_modified"], timezone.utc)
+    return resp
+
+
+def _stale_timeout() -> int:
+    return current_app.config.get("CACHE_STALE_TIMEOUT", DEFAULT_STALE_TIMEOUT)
+
+
+def _set_entry(key: str, entry: dict[str, Any], timeout: int, stale_timeout: int) -> None:
+    try:
+        cache.set(key, entry, timeout=timeout + stale_timeout)
+    except Exception:
+        current_app.logger.exception("Cache set failed for %s", key)
+
+
+def _store_entry(key: str, rv: Any, timeout: int, stale_timeout: int,
+                 previous: dict[str, Any] | None = None) -> tuple[Response, dict[str, Any] | None]:
+    resp = current_app.make_response(rv)
+    if resp.status_code != 200 or resp.direct_passthrough:
+        return resp, None
+    entry = _entry(resp, timeout, previous)
+    _set_entry(key, entry, timeout, stale_timeout)
+    return resp, entry
+
+
+def _store(key: str, rv: Any, timeout: int, stale_timeout: int,
+           previous: dict[str, Any] | None = None) -> Response:
+    resp, entry = _store_entry(key, rv, timeout, stale_timeout, previous)
+    return resp if entry is None else _respond(entry)
+
+
+def cached_body(key: str) -> bytes | None:
+    """Body of a cached route entry (fresh or stale), without building a response."""
+    try:
+        entry = cache.get(key)
+    except Exception:
+        current_app.logger.exception("Cache get failed for %s", key)
+        return None
+    return None if entry is None else entry["body"]
+
+
+def cache_body(key: str, body: bytes, timeout: int = DEFAULT_TIMEOUT) -> None:
+    """
+    Store a JSON body under a route's cache key, as if that route had
+    served it. Lets batch endpoints warm the per-item routes.
+    """
+    resp = current_app.response_class(body, mimetype="application/json")
+    _set_entry(key, _entry(resp, timeout), timeout, _stale_timeout())
+
+
+def warm_parts(parts: dict[str, bytes], keys: dict[str, str], served: str) -> None:
+    """
+    Cache the parts of an append_to_response fetch under the keys of the
+    routes that serve them. `served` is left to the calling route, and
+    entries that already exist are not replaced.
+    """
+    for name, key in keys.items():
+        if name != served and name in parts and cached_body(key) is None:
+            cache_body(key, parts[name])
+
+
+def _revalidate(key: str, produce: Callable[[], Any],
+                timeout: int, stale_timeout: int, previous: dict[str, Any]) -> None:
+    # cache.add is a no-op when the lock exists: one refresher per key
+    lock_key = f"{key}:refreshing"
+    if not cache.add(lock_key, True, timeout=timeout):
+        return
+
+    @copy_current_request_context
+    def refresh() -> None:
+        g.tmdb_priority = BACKGROUND
+        try:
+            _store(key, produce(), timeout, stale_timeout, previous)
+        except Exception:
+            current_app.logger.exception("Background refresh failed for %s", key)
+        finally:
+            cache.delete(lock_key)
+
+    socketio.start_background_task(refresh)
+
+
+def _serve(key: str, produce: Callable[[], Any], timeout: int, stale_timeout: int) -> Any:
+    try:
+        entry = cache.get(key)
+    except Exception:
+        current_app.logger.exception("Cache get failed for %s", key)
+        return produce()
+
+    if entry is None:
+        return _store(key, produce(), timeout, stale_timeout)
+    if time.time() >= entry["fresh_until"]:
+        _revalidate(key, produce, timeout, stale_timeout, entry)
+    return _respond(entry)
+
+
+def _projected(key: str, projected_key: str, produce: Callable[[], Any], fields: str,
+               timeout: int, stale_timeout: int) -> Any:
+    # Projections are cut from the route's full entry, so every
+    # projection of a resource shares one upstream fetch. They are keyed
+    # on that entry's ETag too: replacing or deleting the full entry
+    # retires all of its projections at once.
+    try:
+        entry = cache.get(key)
+    except Exception:
+        current_app.logger.exception("Cache get failed for %s", key)
+        entry = None
+
+    if entry is None:
+        resp, entry = _store_entry(key, produce(), timeout, stale_timeout)
+        if entry is None:
+            return resp
+    elif time.time() >= entry["fresh_until"]:
+        _revalidate(key, produce, timeout, stale_timeout, entry)
+
+    def project() -> Response:
+        return current_app.response_class(
+            project_bytes(entry["body"], fields), mimetype="application/json"
+        )
+
+    return _serve(f"{projected_key}#{entry['etag']}", project, timeout, stale_timeout)
+
+
+def cached_route(
+    timeout: int = DEFAULT_TIMEOUT,
+    stale_timeout: int | None = None,
+    **spec: Normalizer,
+) -> Callable:
+    """
+    Cache a read route keyed on its path and normalized query params.
+    Only successful responses are stored, as pre-serialized bytes.
+
+    Entries are fresh for `timeout` seconds, then kept for another
+    `stale_timeout` (CACHE_STALE_TIMEOUT by default, 0 disables). A hit
+    in that window returns the stale response at once and refreshes it
+    in the background at low upstream priority.
+
+    A `fields` param projects the response (see api.projection); each
+    projection is cached under its own key, tied to the full entry it
+    was cut from, so deleting that entry invalidates every projection.
+    """
+    make_key = request_cache_key(spec)
+    make_projected_key = request_cache_key({**spec, "fields": fields_arg})
+
+    def decorator(f: Callable) -> Callable:
+        @functools.wraps(f)
+        def decorated_function(*args: Any, **kwargs: Any) -> Any:
+            stale = _stale_timeout() if stale_timeout is None else stale_timeout
+
+            key = make_key(*args, **kwargs)
+            produce = functools.partial(f, *args, **kwargs)
+            fields = fields_arg(request.args.get("fields"))
+            if fields is None:
+                return _serve(key, produce, timeout, stale)
+
+            projected_key = make_projected_key(*args, **kwargs)
+            return _projected(key, projected_key, produce, fields, timeout, stale)
+
+        decorated_function.uncached = f
+        decorated_function.make_cache_key = make_key
+        return decorated_function
+
+    return decorator
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Circuit breakers for upstream TMDB path families.
+After repeated failures a family's circuit opens and calls fail fast
+until a cool-down passes; then a single trial call decides whether
+to close it again.
+"""
+
+import threading
+import time
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def path_family(path: str) -> str:
+    """'/movie/550/reviews' -> '/movie', '/search/tv' -> '/search'."""
+    return "/" + path.lstrip("/").split("/", 1)[0]
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """True if a call may go upstream. Half-open admits one trial call."""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self._state = HALF_OPEN
+            if self._trial_running:
+                return False
+            self._trial_running = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._trial_running = False
+
+    def release(self) -> None:
+        """End a call that never reached upstream without changing state."""
+        with self._lock:
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+
+
+class BreakerRegistry:
+    """One CircuitBreaker per path family, created on first use."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    def for_path(self, path: str) -> CircuitBreaker:
+        family = path_family(path)
+        with self._lock:
+            breaker = self._breakers.get(family)
+            if breaker is None:
+                breaker = self._breakers[family] = CircuitBreaker(
+                    self.failure_threshold, self.reset_timeout
+                )
+            return breaker
+
+    def states(self) -> dict[str, str]:
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {family: breaker.state for family, breaker in breakers.items()}
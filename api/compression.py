@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Response compression negotiated from Accept-Encoding.
+gzip is always available; brotli and zstd are offered when their
+libraries are installed. Cached routes store compressed variants up
+front so hits cost no compression CPU.
+"""
+
+import gzip
+from typing import Callable
+
+from flask import Flask, Response, current_app, request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - depends on the environment
+    zstandard = None
+
+DEFAULT_MIN_BYTES = 1024
+COMPRESSIBLE_MIMETYPES = {"application/json", "text/html", "text/plain", "text/css"}
+
+
+def _encoders(precompress: bool) -> dict[str, Callable[[bytes], bytes]]:
+    # Precompressed variants are built once per cache entry, so they can
+    # afford slower, denser levels than per-response compression.
+    encoders: dict[str, Callable[[bytes], bytes]] = {}
+    if brotli is not None:
+        quality = 9 if precompress else 4
+        encoders["br"] = lambda body: brotli.compress(body, quality=quality)
+    if zstandard is not None:
+        compressor = zstandard.ZstdCompressor(level=12 if precompress else 3)
+        encoders["zstd"] = compressor.compress
+    level = 9 if precompress else 6
+    encoders["gzip"] = lambda body: gzip.compress(body, compresslevel=level)
+    return encoders
+
+
+DYNAMIC_ENCODERS = _encoders(precompress=False)
+PRECOMPRESS_ENCODERS = _encoders(precompress=True)
+
+
+def _enabled_encodings() -> list[str]:
+    configured = current_app.config.get("COMPRESS_ENCODINGS", "br,zstd,gzip")
+    return [name.strip() for name in configured.split(",") if name.strip() in DYNAMIC_ENCODERS]
+
+
+def _min_bytes() -> int:
+    return current_app.config.get("COMPRESS_MIN_BYTES", DEFAULT_MIN_BYTES)
+
+
+def negotiate(available: list[str] | set[str]) -> str | None:
+    """Best encoding the client accepts among `available`, honouring q-values."""
+    candidates = [name for name in _enabled_encodings() if name in available]
+    if not candidates:
+        return None
+    return request.accept_encodings.best_match(candidates)
+
+
+def precompress(body: bytes) -> dict[str, bytes]:
+    """Every enabled encoding of body, or {} when it is under the size threshold."""
+    if len(body) < _min_bytes():
+        return {}
+    return {name: PRECOMPRESS_ENCODERS[name](body) for name in _enabled_encodings()}
+
+
+def apply_encoding(resp: Response, encoding: str, body: bytes) -> Response:
+    resp.set_data(body)
+    resp.headers["Content-Encoding"] = encoding
+    resp.vary.add("Accept-Encoding")
+    return resp
+
+
+def compress_response(resp: Response) -> Response:
+    """after_request hook: compress eligible responses that are not yet encoded."""
+    if (
+        resp.direct_passthrough
+        or "Content-Encoding" in resp.headers
+        or resp.status_code < 200
+        or resp.status_code in (204, 206, 304)
+        or resp.mimetype not in COMPRESSIBLE_MIMETYPES
+    ):
+        return resp
+
+    body = resp.get_data()
+    if len(body) < _min_bytes():
+        return resp
+
+    resp.vary.add("Accept-Encoding")
+    encoding = negotiate(DYNAMIC_ENCODERS)
+    if encoding is None:
+        return resp
+    # The encoded body is another representation: it needs its own validator
+    etag, weak = resp.get_etag()
+    if etag:
+        resp.set_etag(f"{etag}-{encoding}", weak)
+    return apply_encoding(resp, encoding, DYNAMIC_ENCODERS[encoding](body))
+
+
+def init_compression(app: Flask) -> None:
+    if app.config.get("COMPRESS_RESPONSES", True):
+        app.after_request(compress_response)
@@ -5,18 +5,109 @@ from dotenv import load_dotenv
 load_dotenv()
 
 class Config:
+    # DATABASE_UTL is the old, misspelled name; still read so existing .env files work
     SQLALCHEMY_DATABASE_URI = os.getenv(
-        "DATABASE_UTL",
-        "postgresql://localhost/tmdb_api"
-
+        "DATABASE_URL",
+        os.getenv("DATABASE_UTL", "postgresql://localhost/tmdb_api"),
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Database connection pool per worker. DB_POOLER=external leaves pooling
+    # to pgbouncer or similar; DB_STATEMENT_TIMEOUT_MS=0 disables the timeout.
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 5))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 5))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 30000))
+    DB_POOLER = os.getenv("DB_POOLER", "")
+    # Async engine (asyncpg / aiosqlite); defaults to the same database
+    ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+
     SECRET_KEY = os.getenv("SECRET_KEY", "dev_secret_key")
 
     TMDB_API_KEY = os.getenv("TMDB_API_KEY")
     TMDB_READ_TOKEN = os.getenv("TMDB_READ_TOKEN")
 
+    # Upstream connection pool (per TMDB host) and fan-out limit
+    TMDB_POOL_SIZE = int(os.getenv("TMDB_POOL_SIZE", 20))
+    TMDB_MAX_CONCURRENCY = int(os.getenv("TMDB_MAX_CONCURRENCY", 10))
+    TMDB_KEEPALIVE = os.getenv("TMDB_KEEPALIVE", "true").lower() == "true"
+
+    # Client-side token bucket (requests/second) in front of TMDB
+    TMDB_RATE_LIMIT = float(os.getenv("TMDB_RATE_LIMIT", 40))
+    TMDB_RATE_BURST = int(os.getenv("TMDB_RATE_BURST", 40))
+    TMDB_RATE_MAX_WAIT = float(os.getenv("TMDB_RATE_MAX_WAIT", 5))
+    TMDB_RATE_MAX_QUEUE = int(os.getenv("TMDB_RATE_MAX_QUEUE", 100))
+    TMDB_RATE_LIMIT_FILE = os.getenv("TMDB_RATE_LIMIT_FILE")
+
+    # Retries for GETs, and circuit breakers per upstream path family
+    TMDB_REQUEST_TIMEOUT = float(os.getenv("TMDB_REQUEST_TIMEOUT", 5))
+    TMDB_RETRIES = int(os.getenv("TMDB_RETRIES", 2))
+    TMDB_RETRY_BUDGET = float(os.getenv("TMDB_RETRY_BUDGET", 10))
+    TMDB_BREAKER_THRESHOLD = int(os.getenv("TMDB_BREAKER_THRESHOLD", 5))
+    TMDB_BREAKER_RESET = float(os.getenv("TMDB_BREAKER_RESET", 30))
+    TMDB_STALE_TTL = int(os.getenv("TMDB_STALE_TTL", 86400))
+
+    # Seconds a cached route may be served stale while it refreshes
+    CACHE_STALE_TIMEOUT = int(os.getenv("CACHE_STALE_TIMEOUT", 3600))
+
+    # Response compression (br/zstd when installed, gzip always).
+    # Bodies under COMPRESS_MIN_BYTES are sent as-is; cached routes keep
+    # precompressed variants when CACHE_PRECOMPRESS is on.
+    COMPRESS_RESPONSES = os.getenv("COMPRESS_RESPONSES", "true").lower() == "true"
+    COMPRESS_ENCODINGS = os.getenv("COMPRESS_ENCODINGS", "br,zstd,gzip")
+    COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", 1024))
+    CACHE_PRECOMPRESS = os.getenv("CACHE_PRECOMPRESS", "true").lower() == "true"
+
+    # The local search index is built from the ingested movies / tv_series
+    # tables, plus optional JSON-lines files of full TMDB search results
+    SEARCH_INDEX_FROM_DB = os.getenv("SEARCH_INDEX_FROM_DB", "true").lower() == "true"
+    SEARCH_INDEX_MOVIES_FILE = os.getenv("SEARCH_INDEX_MOVIES_FILE")
+    SEARCH_INDEX_TV_FILE = os.getenv("SEARCH_INDEX_TV_FILE")
+
+    # Session rows are buffered and inserted in batches of SESSION_FLUSH_ROWS
+    # or every SESSION_FLUSH_INTERVAL seconds; False commits each one inline
+    SESSION_WRITE_BEHIND = os.getenv("SESSION_WRITE_BEHIND", "true").lower() == "true"
+    SESSION_FLUSH_ROWS = int(os.getenv("SESSION_FLUSH_ROWS", 500))
+    SESSION_FLUSH_INTERVAL = float(os.getenv("SESSION_FLUSH_INTERVAL", 0.5))
+    SESSION_MAX_PENDING = int(os.getenv("SESSION_MAX_PENDING", 50000))
+
+    # Rating routes reject session ids revoked here; unknown ids go to TMDB.
+    # SESSION_EVENTS_REDIS_URL shares logins/logouts between workers.
+    SESSION_CHECK = os.getenv("SESSION_CHECK", "true").lower() == "true"
+    SESSION_CACHE_TTL = float(os.getenv("SESSION_CACHE_TTL", 60))
+    SESSION_CACHE_NEGATIVE_TTL = float(os.getenv("SESSION_CACHE_NEGATIVE_TTL", 5))
+    SESSION_CACHE_MAX_ENTRIES = int(os.getenv("SESSION_CACHE_MAX_ENTRIES", 100000))
+    SESSION_EVENTS_REDIS_URL = os.getenv("SESSION_EVENTS_REDIS_URL")
+
+    # Monthly sessions partitions: created ahead, retired after the retention
+    # period (dropped, or only detached when SESSION_PRUNE_DROP is false)
+    SESSION_RETENTION_DAYS = int(os.getenv("SESSION_RETENTION_DAYS", 90))
+    SESSION_PARTITIONS_AHEAD = int(os.getenv("SESSION_PARTITIONS_AHEAD", 2))
+    SESSION_PRUNE_DROP = os.getenv("SESSION_PRUNE_DROP", "true").lower() == "true"
+    # Seconds between in-process maintenance runs; 0 leaves it to cron
+    SESSION_MAINTENANCE_INTERVAL = int(os.getenv("SESSION_MAINTENANCE_INTERVAL", 0))
+
+    # Seconds between trending refreshes pushed to Socket.IO subscribers; 0 (the default) disables.
+    # SOCKETIO_MESSAGE_QUEUE (e.g. a Redis URL) lets every worker reach every room.
+    TRENDING_PUSH_INTERVAL = int(os.getenv("TRENDING_PUSH_INTERVAL", 0))
+    SOCKETIO_MESSAGE_QUEUE = os.getenv("SOCKETIO_MESSAGE_QUEUE")
+
+    # Seconds between in-process TMDB /changes syncs; 0 leaves it to cron
+    CHANGES_SYNC_INTERVAL = int(os.getenv("CHANGES_SYNC_INTERVAL", 0))
+
+    # Sub-requests of POST /batch run on up to this many threads
+    BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", 8))
+
+    # Tiered cache: per-worker L1 bounded in bytes, shared L2 across workers.
+    # CACHE_L2_TYPE=RedisCache uses CACHE_REDIS_URL, FileSystemCache uses CACHE_DIR.
+    CACHE_L1_MAX_BYTES = int(os.getenv("CACHE_L1_MAX_BYTES", 64 * 1024 * 1024))
+    CACHE_L1_MAX_TTL = int(os.getenv("CACHE_L1_MAX_TTL", 60))
+    CACHE_L2_TYPE = os.getenv("CACHE_L2_TYPE")
+    CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+    CACHE_DIR = os.getenv("CACHE_DIR")
+
     SWAGGER = {
         "title": "TMDB API companion",
         "description": (
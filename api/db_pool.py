@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+SQLAlchemy engine options from Config, and pool checkout timing.
+
+Every worker gets a QueuePool of DB_POOL_SIZE connections plus up to
+DB_MAX_OVERFLOW extra, recycled after DB_POOL_RECYCLE seconds and
+pre-pinged before use. Checkouts are timed so the pool can be sized from
+/health/db: a high p95 wait or any timeouts mean greenlets are queueing
+for connections. Only getting a connection from the pool is timed
+(waiting for one, or opening one while the pool grows); the pre-ping and
+recycling that follow are not.
+
+DB_POOLER=external is for a transaction-pooling proxy such as pgbouncer:
+the proxy owns the pool, so connections are opened per checkout and no
+startup options are sent (set statement_timeout on the database role).
+"""
+
+import bisect
+import threading
+import time
+from typing import Any
+
+from flask import Flask
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import NullPool, QueuePool
+
+# Upper bounds (ms) of the checkout wait histogram; the last bucket is open
+WAIT_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+
+class CheckoutStats:
+    """Wait-time histogram of pool checkouts."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+
+    def record(self, wait_ms: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.total_ms += wait_ms
+            self.max_ms = max(self.max_ms, wait_ms)
+            self.buckets[bisect.bisect_left(WAIT_BUCKETS_MS, wait_ms)] += 1
+
+    def percentile(self, fraction: float) -> float | None:
+        """Upper bound of the bucket holding the given fraction of checkouts."""
+        if not self.checkouts:
+            return None
+        target = fraction * self.checkouts
+        seen = 0
+        for bound, count in zip(WAIT_BUCKETS_MS, self.buckets):
+            seen += count
+            if seen >= target:
+                return bound
+        return self.max_ms
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            labels = [f"<={bound}ms" for bound in WAIT_BUCKETS_MS] + [f">{WAIT_BUCKETS_MS[-1]}ms"]
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "mean_ms": round(self.total_ms / self.checkouts, 3) if self.checkouts else None,
+                "p95_ms": self.percentile(0.95),
+                "max_ms": round(self.max_ms, 3),
+                "histogram": dict(zip(labels, self.buckets)),
+            }
+
+
+checkout_stats = CheckoutStats()
+# QueuePool._do_get calls itself when it loses a race for an overflow slot
+_getting = threading.local()
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited."""
+
+    def _do_get(self):
+        if getattr(_getting, "active", False):
+            return super()._do_get()
+        _getting.active = True
+        start = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except PoolTimeoutError:
+            checkout_stats.record(0, timed_out=True)
+            raise
+        finally:
+            _getting.active = False
+        checkout_stats.record((time.perf_counter() - start) * 1000)
+        return record
+
+
+def engine_options(config: dict[str, Any]) -> dict[str, Any]:
+    url = make_url(config["SQLALCHEMY_DATABASE_URI"])
+    options: dict[str, Any] = {"pool_pre_ping": config.get("DB_POOL_PRE_PING", True)}
+
+    if config.get("DB_POOLER") == "external":
+        return {**options, "poolclass": NullPool}
+
+    # In-memory SQLite lives in one connection; it cannot be pooled
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return options
+
+    options.update(
+        poolclass=TimedQueuePool,
+        pool_size=config.get("DB_POOL_SIZE", 10),
+        max_overflow=config.get("DB_MAX_OVERFLOW", 5),
+        pool_timeout=config.get("DB_POOL_TIMEOUT", 5.0),
+        pool_recycle=config.get("DB_POOL_RECYCLE", 1800),
+    )
+    timeout_ms = config.get("DB_STATEMENT_TIMEOUT_MS", 0)
+    if timeout_ms and url.get_backend_name() == "postgresql":
+        options["connect_args"] = {"options": f"-c statement_timeout={timeout_ms}"}
+    return options
+
+
+def init_db_pool(app: Flask) -> None:
+    """Fill SQLALCHEMY_ENGINE_OPTIONS; call before db.init_app."""
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+        **engine_options(app.config),
+        **app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {}),
+    }
+
+
+def pool_stats(engine) -> dict[str, Any]:
+    pool = engine.pool
+    status = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+        )
+    return {**status, "wait": checkout_stats.snapshot()}
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Bulk loader for TMDB daily ID exports (movie_ids_MM_DD_YYYY.json.gz,
+tv_series_ids_MM_DD_YYYY.json.gz).
+
+The gzip JSON-lines file is streamed in batches. On PostgreSQL each batch
+is COPYed into a temp table and upserted; other databases fall back to a
+multi-row upsert. A batch and its checkpoint commit together, so an
+interrupted load resumes after the last committed line.
+
+Usage: flask ingest movies movie_ids_05_15_2024.json.gz [--batch-size N] [--restart]
+"""
+
+import csv
+import gzip
+import io
+import os
+import time
+from typing import Any, Callable, Iterator
+
+import click
+from flask.cli import AppGroup
+from sqlalchemy import Connection, Table
+from sqlalchemy.dialects import postgresql, sqlite
+
+from api import json_provider
+from api.extensions import db
+from api.models import IngestCheckpoint, Movie, TvSeries
+
+DEFAULT_BATCH_SIZE = 10_000
+
+EXPORTS = {
+    "movies": (Movie.__table__, ("id", "original_title", "popularity", "adult", "video")),
+    "tv": (TvSeries.__table__, ("id", "original_name", "popularity")),
+}
+
+
+def read_batches(path: str, skip: int, batch_size: int) -> Iterator[tuple[int, list[dict]]]:
+    """
+    (last line number, rows) per batch, starting after line `skip`.
+    Only one batch is held in memory at a time.
+    """
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as fh:
+        batch: list[dict] = []
+        for line_no, line in enumerate(fh, 1):
+            if line_no <= skip or not line.strip():
+                continue
+            batch.append(json_provider.loads(line))
+            if len(batch) >= batch_size:
+                yield line_no, batch
+                batch = []
+        if batch:
+            yield line_no, batch
+
+
+def _values(row: dict[str, Any], table: Table, columns: tuple[str, ...]) -> dict[str, Any]:
+    values = {}
+    for name in columns:
+        value = row.get(name)
+        default = table.c[name].default
+        values[name] = default.arg if value is None and default is not None else value
+    return values
+
+
+def _latest(rows: list[dict], table: Table, columns: tuple[str, ...]) -> list[dict[str, Any]]:
+    # An export can list an id twice; the later line wins, and ON CONFLICT
+    # may touch a row only once per statement
+    return list({row["id"]: _values(row, table, columns) for row in rows}.values())
+
+
+def _insert(conn: Connection):
+    dialects = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+    if conn.dialect.name not in dialects:
+        raise click.ClickException(f"Ingest does not support {conn.dialect.name}")
+    return dialects[conn.dialect.name]
+
+
+def _copy(conn: Connection, table: Table, columns: tuple[str, ...], rows: list[dict]) -> None:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for values in _latest(rows, table, columns):
+        writer.writerow(
+            "" if value is None else ("t" if value else "f") if isinstance(value, bool) else value
+            for value in values.values()
+        )
+    buf.seek(0)
+
+    cols = ", ".join(columns)
+    updates = ", ".join(f"{name} = EXCLUDED.{name}" for name in columns if name != "id")
+    stage = f"{table.name}_stage"
+    cursor = conn.connection.cursor()
+    cursor.execute(
+        f"CREATE TEMP TABLE IF NOT EXISTS {stage} "
+        f"(LIKE {table.name} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+    )
+    cursor.copy_expert(f"COPY {stage} ({cols}) FROM STDIN WITH (FORMAT csv)", buf)
+    cursor.execute(
+        f"INSERT INTO {table.name} ({cols}) SELECT {cols} FROM {stage} "
+        f"ON CONFLICT (id) DO UPDATE SET {updates}, ingested_at = NOW()"
+    )
+
+
+def upsert_rows(conn: Connection, table: Table, columns: tuple[str, ...], rows: list[dict]) -> None:
+    """Insert rows keyed by id, updating `columns` of ids that already exist."""
+    stmt = _insert(conn)(table)
+    updates = {name: stmt.excluded[name] for name in columns if name != "id"}
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["id"],
+        set_={**updates, "ingested_at": db.func.now()},
+    )
+    conn.execute(stmt, _latest(rows, table, columns))
+
+
+def _save_checkpoint(conn: Connection, source: str, lines_done: int, completed: bool) -> None:
+    table = IngestCheckpoint.__table__
+    values = {
+        "source": source,
+        "lines_done": lines_done,
+        "completed_at": db.func.now() if completed else None,
+        "updated_at": db.func.now(),
+    }
+    stmt = _insert(conn)(table).values(**values)
+    conn.execute(stmt.on_conflict_do_update(
+        index_elements=["source"],
+        set_={name: value for name, value in values.items() if name != "source"},
+    ))
+
+
+def load_export(
+    kind: str,
+    path: str,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    restart: bool = False,
+    echo: Callable[[str], None] = click.echo,
+) -> int:
+    """Load one export file into its table; returns the number of rows written."""
+    table, columns = EXPORTS[kind]
+    source = os.path.basename(path)
+    table.create(db.engine, checkfirst=True)
+    IngestCheckpoint.__table__.create(db.engine, checkfirst=True)
+
+    checkpoint = None if restart else db.session.get(IngestCheckpoint, source)
+    db.session.remove()
+    if checkpoint is not None and checkpoint.completed_at is not None:
+        echo(f"{source}: already loaded ({checkpoint.lines_done} lines)")
+        return 0
+    skip = checkpoint.lines_done if checkpoint is not None else 0
+    if skip:
+        echo(f"{source}: resuming after line {skip}")
+
+    written = skipped = 0
+    last_line = skip
+    started = time.perf_counter()
+    with db.engine.connect() as conn:
+        write = _copy if conn.dialect.name == "postgresql" else upsert_rows
+        for last_line, batch in read_batches(path, skip, batch_size):
+            # Rows without an id or title cannot be stored; count and move on
+            rows = [row for row in batch if isinstance(row.get("id"), int) and row.get(columns[1])]
+            skipped += len(batch) - len(rows)
+            with conn.begin():
+                if rows:
+                    write(conn, table, columns, rows)
+                _save_checkpoint(conn, source, last_line, completed=False)
+            written += len(rows)
+            rate = written / max(time.perf_counter() - started, 1e-9)
+            echo(f"{source}: {written} rows, line {last_line}, {rate:,.0f} rows/s")
+
+        with conn.begin():
+            _save_checkpoint(conn, source, last_line, completed=True)
+
+    elapsed = time.perf_counter() - started
+    echo(f"{source}: done, {written} rows ({skipped} skipped) in {elapsed:.1f}s, "
+         f"{written / max(elapsed, 1e-9):,.0f} rows/s")
+    return written
+
+
+ingest_cli = AppGroup("ingest", help="Load TMDB daily ID exports into the database.")
+
+
+def _command(kind: str) -> None:
+    @ingest_cli.command(kind, help=f"Load a {EXPORTS[kind][0].name} export (gzip JSON lines).")
+    @click.argument("path", type=click.Path(exists=True, dir_okay=False))
+    @click.option("--batch-size", default=DEFAULT_BATCH_SIZE, show_default=True,
+                  type=click.IntRange(min=1), help="Rows per COPY and checkpoint.")
+    @click.option("--restart", is_flag=True, help="Ignore the checkpoint and start at line 1.")
+    def command(path: str, batch_size: int, restart: bool) -> None:
+        load_export(kind, path, batch_size, restart)
+
+
+for _kind in EXPORTS:
+    _command(_kind)
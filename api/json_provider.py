@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+JSON encoding for Flask responses and TMDB payloads.
+Uses orjson when it is installed and falls back to the stdlib json module.
+"""
+
+import json
+from typing import Any
+
+from flask import Response
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+
+def loads(data: str | bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_bytes(obj: Any, sort_keys: bool = False) -> bytes:
+    """Compact JSON as UTF-8 bytes, ready to be a response body."""
+    if orjson is not None:
+        # Dates go through Flask's default() so both backends emit HTTP dates
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=DefaultJSONProvider.default, option=option)
+    return json.dumps(
+        obj,
+        default=DefaultJSONProvider.default,
+        sort_keys=sort_keys,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    ).encode()
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson when available.
+    Calls that need stdlib-only options (indent, cls, ...) and debug
+    pretty-printing go through the default provider unchanged.
+    """
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return dumps_bytes(obj, sort_keys=self.sort_keys).decode()
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        if orjson is None or (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            dumps_bytes(obj, sort_keys=self.sort_keys) + b"\n",
+            mimetype=self.mimetype,
+        )
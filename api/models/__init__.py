@@ -1,2 +1,6 @@
 from api.models.user import User
 from api.models.session import Session
+from api.models.movie import Movie
+from api.models.tv_series import TvSeries
+from api.models.ingest_checkpoint import IngestCheckpoint
+from api.models.sync_state import SyncState
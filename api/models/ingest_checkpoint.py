@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+from api.extensions import db
+
+
+class IngestCheckpoint(db.Model):
+    __tablename__ = "ingest_checkpoints"
+
+    # Export file name, e.g. movie_ids_05_15_2024.json.gz
+    source = db.Column(db.String(255), primary_key=True)
+
+    # Lines of the file already loaded; committed with each batch
+    lines_done = db.Column(db.BigInteger, nullable=False, default=0)
+
+    completed_at = db.Column(db.DateTime, nullable=True)
+
+    updated_at = db.Column(
+        db.DateTime,
+        server_default=db.func.now(),
+        onupdate=db.func.now(),
+        nullable=False,
+    )
@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+from api.extensions import db
+
+
+class Movie(db.Model):
+    __tablename__ = "movies"
+
+    # TMDB movie id, as listed in the daily movie_ids export
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+
+    original_title = db.Column(db.Text, nullable=False)
+    popularity = db.Column(db.Float, nullable=False, default=0.0)
+    adult = db.Column(db.Boolean, nullable=False, default=False)
+    video = db.Column(db.Boolean, nullable=False, default=False)
+
+    ingested_at = db.Column(
+        db.DateTime,
+        server_default=db.func.now(),
+        nullable=False,
+    )
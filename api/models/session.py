@@ -4,6 +4,30 @@ from api.extensions import db
 
 class Session(db.Model):
     __tablename__ = "sessions"
+    # Live and revoked sessions are indexed apart: the hot live lookups get
+    # small indexes, and the revoked ones still avoid a scan. On PostgreSQL the table itself is partitioned by month (sql/create_tables.sql).
+    __table_args__ = (
+        db.Index(
+            "idx_sessions_guest_active", "tmdb_guest_session_id",
+            postgresql_where=db.text("revoked_at IS NULL"),
+            sqlite_where=db.text("revoked_at IS NULL"),
+        ),
+        db.Index(
+            "idx_sessions_user_active", "tmdb_user_session_id",
+            postgresql_where=db.text("revoked_at IS NULL"),
+            sqlite_where=db.text("revoked_at IS NULL"),
+        ),
+        db.Index(
+            "idx_sessions_guest_revoked", "tmdb_guest_session_id",
+            postgresql_where=db.text("revoked_at IS NOT NULL"),
+            sqlite_where=db.text("revoked_at IS NOT NULL"),
+        ),
+        db.Index(
+            "idx_sessions_user_revoked", "tmdb_user_session_id",
+            postgresql_where=db.text("revoked_at IS NOT NULL"),
+            sqlite_where=db.text("revoked_at IS NOT NULL"),
+        ),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
 
@@ -13,8 +37,8 @@ class Session(db.Model):
         nullable=True,
     )
 
-    tmdb_guest_session_id = db.Column(db.String(128), index=True)
-    tmdb_user_session_id = db.Column(db.String(128), index=True)
+    tmdb_guest_session_id = db.Column(db.String(128))
+    tmdb_user_session_id = db.Column(db.String(128))
 
     created_at = db.Column(
         db.DateTime,
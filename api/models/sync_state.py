@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+from api.extensions import db
+
+
+class SyncState(db.Model):
+    __tablename__ = "sync_state"
+
+    # Sync job name, e.g. movie_changes
+    name = db.Column(db.String(64), primary_key=True)
+
+    # Changes up to this date are applied; the next run starts here
+    high_water_mark = db.Column(db.Date, nullable=False)
+
+    updated_at = db.Column(
+        db.DateTime,
+        server_default=db.func.now(),
+        onupdate=db.func.now(),
+        nullable=False,
+    )
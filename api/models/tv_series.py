@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+from api.extensions import db
+
+
+class TvSeries(db.Model):
+    __tablename__ = "tv_series"
+
+    # TMDB series id, as listed in the daily tv_series_ids export
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+
+    original_name = db.Column(db.Text, nullable=False)
+    popularity = db.Column(db.Float, nullable=False, default=0.0)
+
+    ingested_at = db.Column(
+        db.DateTime,
+        server_default=db.func.now(),
+        nullable=False,
+    )
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Field projection for read routes: `?fields=title,poster_path,seasons.episode_count`
+keeps only the listed keys. Dotted paths reach into nested objects and
+apply to every item of a list along the way.
+"""
+
+import re
+from typing import Any
+
+from api import json_provider
+
+MAX_FIELDS = 50
+
+_FIELD = re.compile(r"[A-Za-z0-9_]+(\.[A-Za-z0-9_]+)*")
+_MISSING = object()
+
+
+def fields_arg(raw: str | None) -> str | None:
+    """
+    Canonical form of a fields param: valid paths, de-duplicated and
+    sorted, so equivalent projections share a cache entry.
+    """
+    fields = {part.strip() for part in (raw or "").split(",")}
+    fields = sorted(field for field in fields if _FIELD.fullmatch(field))
+    return ",".join(fields[:MAX_FIELDS]) or None
+
+
+def _tree(fields: str) -> dict[str, Any]:
+    # {"seasons": {"episode_count": True}, "title": True}; a whole field
+    # wins over any of its sub-paths
+    tree: dict[str, Any] = {}
+    for field in fields.split(","):
+        node = tree
+        *parents, leaf = field.split(".")
+        for name in parents:
+            child = node.setdefault(name, {})
+            if child is True:
+                break
+            node = child
+        else:
+            node[leaf] = True
+    return tree
+
+
+def _apply(value: Any, tree: dict[str, Any] | bool) -> Any:
+    if tree is True:
+        return value
+    if isinstance(value, list):
+        # Items the sub-path cannot reach into (scalars) are dropped; a
+        # list with none left counts as missing
+        items = [child for child in (_apply(item, tree) for item in value) if child is not _MISSING]
+        return items if items or not value else _MISSING
+    if not isinstance(value, dict):
+        return _MISSING
+    projected = {}
+    for name, subtree in tree.items():
+        if name in value:
+            child = _apply(value[name], subtree)
+            if child is not _MISSING:
+                projected[name] = child
+    return projected
+
+
+def project(doc: Any, fields: str) -> Any:
+    """`doc` reduced to `fields` (a fields_arg string). Unknown paths are skipped."""
+    projected = _apply(doc, _tree(fields))
+    return {} if projected is _MISSING else projected
+
+
+def project_bytes(body: bytes, fields: str) -> bytes:
+    return json_provider.dumps_bytes(project(json_provider.loads(body), fields))
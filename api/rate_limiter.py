@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Token-bucket rate limiting for upstream TMDB calls.
+Callers queue for tokens by priority; interactive requests are served
+before background work, and requests that cannot get a token in time
+are shed instead of piling up.
+"""
+
+import fcntl
+import heapq
+import itertools
+import json
+import os
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable
+
+INTERACTIVE = 0
+BACKGROUND = 1
+
+# Waiters re-check the bucket this often. They sleep outside the lock
+# with the sleep they were given (socketio.sleep in the app), so under
+# eventlet a queued request yields instead of blocking the hub.
+POLL_INTERVAL = 0.01
+
+
+def parse_retry_after(value: str | None) -> float:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return 0.0
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class TokenBucket:
+    """
+    In-process token bucket refilled at `rate` tokens/second up to `burst`.
+
+    acquire() waits in priority order until a token is available and
+    returns False when the request is shed: the queue is full, or no token
+    can be had within max_wait seconds.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        max_wait: float = 5.0,
+        max_queue: int = 100,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.max_wait = max_wait
+        self.max_queue = max_queue
+        self._sleep = sleep
+
+        self._lock = threading.Lock()
+        self._waiting: list[tuple[int, int]] = []
+        self._seq = itertools.count()
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+
+        self.granted = 0
+        self.shed = 0
+
+    def _take(self) -> float:
+        """Consume a token if one is available. Returns seconds to wait, 0 on success."""
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if now < self._paused_until:
+            return self._paused_until - now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    def _pause(self, seconds: float) -> None:
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def pause(self, seconds: float) -> None:
+        """Stop granting tokens for `seconds`, e.g. after an upstream 429."""
+        with self._lock:
+            self._pause(seconds)
+
+    def acquire(self, priority: int = INTERACTIVE, max_wait: float | None = None) -> bool:
+        max_wait = self.max_wait if max_wait is None else max_wait
+        deadline = time.monotonic() + max_wait
+
+        with self._lock:
+            if priority > INTERACTIVE and len(self._waiting) >= self.max_queue:
+                self.shed += 1
+                return False
+            ticket = (priority, next(self._seq))
+            heapq.heappush(self._waiting, ticket)
+
+        try:
+            while True:
+                with self._lock:
+                    remaining = deadline - time.monotonic()
+                    if self._waiting[0] == ticket:
+                        wait = self._take()
+                        if wait == 0:
+                            self.granted += 1
+                            return True
+                        if wait > remaining:
+                            self.shed += 1
+                            return False
+                    elif remaining <= 0:
+                        self.shed += 1
+                        return False
+                    else:
+                        wait = remaining
+                self._sleep(min(wait, POLL_INTERVAL))
+        finally:
+            with self._lock:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+
+    def queue_depth(self) -> int:
+        with self._lock:
+            return len(self._waiting)
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "queue_depth": self.queue_depth(),
+            "granted": self.granted,
+            "shed": self.shed,
+        }
+
+
+class FileTokenBucket(TokenBucket):
+    """
+    Token bucket whose token count lives in a shared file, so every worker
+    process on the host draws from one budget. Priority queueing is still
+    per process; only the tokens and pause window are shared.
+    """
+
+    def __init__(self, path: str, rate: float, burst: int, **kwargs: Any) -> None:
+        super().__init__(rate, burst, **kwargs)
+        self.path = path
+
+    def _locked_state(self, update) -> float:
+        # Wall-clock time: monotonic clocks are not comparable across processes.
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            raw = os.read(fd, 4096)
+            try:
+                state = json.loads(raw) if raw else {}
+            except ValueError:
+                state = {}
+            now = time.time()
+            tokens = float(state.get("tokens", self.burst))
+            updated = float(state.get("updated", now))
+            paused_until = float(state.get("paused_until", 0.0))
+
+            tokens = min(self.burst, tokens + max(0.0, now - updated) * self.rate)
+            tokens, paused_until, wait = update(now, tokens, paused_until)
+
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.ftruncate(fd, 0)
+            os.write(fd, json.dumps({
+                "tokens": tokens,
+                "updated": now,
+                "paused_until": paused_until,
+            }).encode())
+            return wait
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    def _take(self) -> float:
+        def update(now: float, tokens: float, paused_until: float):
+            if now < paused_until:
+                return tokens, paused_until, paused_until - now
+            if tokens >= 1:
+                return tokens - 1, paused_until, 0.0
+            return tokens, paused_until, (1 - tokens) / self.rate
+        return self._locked_state(update)
+
+    def _pause(self, seconds: float) -> None:
+        def update(now: float, tokens: float, paused_until: float):
+            return tokens, max(paused_until, now + seconds), 0.0
+        self._locked_state(update)
@@ -1,8 +1,8 @@
 #!/usr/bin/env python3
 from flask import Blueprint, jsonify, request
 from api.tmdb_client import tmdb_get, tmdb_post, tmdb_delete
-from api.extensions import db
-from api.models.session import Session
+from api.session_writer import record_session
+from api.session_cache import revoke_session, session_created
 
 DEFAULT_PAGE = 1
 MAX_PAGE = 50
@@ -17,10 +17,10 @@ def guest_session():
     tags:
       - Auth
     """
-    data, status = tmdb_get("/authentication/guest_session/new")
+    data, status = tmdb_get("/authentication/guest_session/new", coalesce=False)
     if status == 200:
-        db.session.add(Session(tmdb_guest_session_id=data["guest_session_id"]))
-        db.session.commit()
+        record_session(tmdb_guest_session_id=data["guest_session_id"])
+        session_created(data["guest_session_id"])
     return jsonify(data), status
 
 
@@ -39,7 +39,7 @@ def login_session():
     if not username or not password:
         return jsonify({"error": "Missing credentials"}), 400
 
-    token_data, _ = tmdb_get("/authentication/token/new")
+    token_data, _ = tmdb_get("/authentication/token/new", coalesce=False)
     token = token_data["request_token"]
 
     tmdb_post(
@@ -57,8 +57,8 @@ def login_session():
     )
 
     if status == 200:
-        db.session.add(Session(tmdb_user_session_id=session_data["session_id"]))
-        db.session.commit()
+        record_session(tmdb_user_session_id=session_data["session_id"])
+        session_created(session_data["session_id"])
 
     return jsonify(session_data), status
 
@@ -81,4 +81,6 @@ def logout():
         "/authentication/session",
         json_body={"session_id": session_id},
     )
+    if status == 200:
+        revoke_session(session_id)
     return jsonify(data), status
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Batch route: run several read-only GET requests in one round trip.
+Sub-requests are dispatched through the regular blueprints, so each one
+gets the same caching and validation as a direct call.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import Blueprint, Flask, current_app, jsonify, request
+from werkzeug.exceptions import HTTPException
+from werkzeug.routing import RequestRedirect
+from werkzeug.test import EnvironBuilder
+
+from api import json_provider
+
+MAX_SUB_REQUESTS = 20
+ALLOWED_PREFIXES = ("/movies/", "/tv/", "/trending/")
+# Routes that fan out themselves; nesting them would bypass MAX_SUB_REQUESTS
+FAN_OUT_ENDPOINTS = {"batch.batch", "movies.movie_details_batch"}
+
+bp = Blueprint("batch", __name__, url_prefix="/batch")
+
+
+def _environ(base_url: str, path: str) -> dict:
+    builder = EnvironBuilder(path=path, method="GET", base_url=base_url)
+    try:
+        return builder.get_environ()
+    finally:
+        builder.close()
+
+
+def _fans_out(app: Flask, base_url: str, path: str) -> bool:
+    # Resolve the path the way dispatch will, so encodings or dot segments
+    # cannot disguise a batch route
+    adapter = app.url_map.bind_to_environ(_environ(base_url, path))
+    try:
+        endpoint, _ = adapter.match(method="GET")
+    except (RequestRedirect, HTTPException):
+        return False
+    return endpoint in FAN_OUT_ENDPOINTS
+
+
+def _dispatch(app: Flask, base_url: str, path: str) -> tuple[int, bytes]:
+    environ = _environ(base_url, path)
+    with app.request_context(environ):
+        try:
+            resp = app.full_dispatch_request()
+        except Exception:
+            # One failing sub-request gets a 500 in its own slot only
+            app.logger.exception("Batch sub-request %s failed", path)
+            return 500, b'{"error":"Internal server error"}'
+        body = resp.get_data()
+        if resp.mimetype != "application/json":
+            body = json_provider.dumps_bytes(body.decode("utf-8", "replace"))
+        return resp.status_code, body
+
+
+def _paths(body: object) -> list[str] | None:
+    if not isinstance(body, dict) or not isinstance(body.get("requests"), list):
+        return None
+    paths = []
+    for item in body["requests"]:
+        path = item.get("path") if isinstance(item, dict) else item
+        if not isinstance(path, str) or not path.startswith(ALLOWED_PREFIXES):
+            return None
+        paths.append(path)
+    return paths
+
+
+@bp.post("")
+def batch():
+    """
+    Run several GET requests in one call
+    ---
+    tags:
+      - Batch
+    requestBody:
+      required: true
+      content:
+        application/json:
+          schema:
+            type: object
+            required:
+              - requests
+            properties:
+              requests:
+                type: array
+                items:
+                  type: object
+                  properties:
+                    path:
+                      type: string
+                      example: /tv/1399/keywords
+    responses:
+      200:
+        description: Status and body of every sub-request, in request order
+      400:
+        description: Missing, invalid or too many sub-requests
+    """
+    app = current_app._get_current_object()
+    base_url = request.host_url
+    paths = _paths(request.get_json(silent=True))
+    if paths and any(_fans_out(app, base_url, path) for path in paths):
+        return jsonify({"error": "Batch routes cannot be nested in a batch"}), 400
+    if not paths:
+        return jsonify({
+            "error": "requests must list GET paths under /movies, /tv or /trending"
+        }), 400
+    if len(paths) > MAX_SUB_REQUESTS:
+        return jsonify({"error": f"At most {MAX_SUB_REQUESTS} requests per batch"}), 400
+
+    workers = min(len(paths), current_app.config.get("BATCH_MAX_CONCURRENCY", 8))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch") as pool:
+        results = list(pool.map(lambda path: _dispatch(app, base_url, path), paths))
+
+    # Sub-response bodies are already JSON bytes; splice them in as-is
+    items = b",".join(
+        b'{"path":%s,"status":%d,"body":%s}' % (json_provider.dumps_bytes(path), status, body)
+        for path, (status, body) in zip(paths, results)
+    )
+    return current_app.response_class(b'{"responses":[%s]}' % items, mimetype="application/json")
@@ -1,5 +1,10 @@
 #!/usr/bin/env python3
 from flask import Blueprint, jsonify, current_app
+from api.tmdb_client import breaker_states, coalesce_stats, rate_limit_stats
+from api.extensions import cache, db
+from api.db_pool import pool_stats
+from api.session_cache import session_cache_stats
+from api.session_writer import session_writer_stats
 
 DEFAULT_PAGE = 1
 MAX_PAGE = 50
@@ -21,3 +26,56 @@ def health_env():
         "TMDB_API_KEY_loaded": bool(current_app.config.get("TMDB_API_KEY")),
         "DATABASE_URL_loaded": bool(current_app.config.get("SQLALCHEMY_DATABASE_URI")),
     }), 200
+
+
+@bp.get("/upstream")
+def health_upstream():
+    """
+    Upstream TMDB client counters
+    ---
+    tags:
+      - Health
+    """
+    return jsonify({
+        "coalescing": coalesce_stats(),
+        "rate_limit": rate_limit_stats(),
+        "circuits": breaker_states(),
+    }), 200
+
+
+@bp.get("/cache")
+def health_cache():
+    """
+    Per-tier cache hit statistics
+    ---
+    tags:
+      - Health
+    """
+    backend = cache.cache
+    stats = backend.stats() if hasattr(backend, "stats") else {}
+    return jsonify({"backend": type(backend).__name__, **stats}), 200
+
+
+@bp.get("/db")
+def health_db():
+    """
+    Database pool status and checkout wait times
+    ---
+    tags:
+      - Health
+    """
+    return jsonify(pool_stats(db.engine)), 200
+
+
+@bp.get("/sessions")
+def health_sessions():
+    """
+    Session lookup cache and write-behind buffer counters
+    ---
+    tags:
+      - Health
+    """
+    return jsonify({
+        "lookup_cache": session_cache_stats(),
+        "write_behind": session_writer_stats(),
+    }), 200
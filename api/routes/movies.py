@@ -1,20 +1,53 @@
 #!/usr/bin/env python3
-from flask import Blueprint, jsonify, request
-from api.tmdb_client import tmdb_get, tmdb_post, tmdb_delete
-from api.extensions import db, socketio, cache
+from flask import Blueprint, current_app, jsonify, request
+from api.session_cache import check_session
+from api.tmdb_client import (
+    tmdb_gather,
+    tmdb_get_appended,
+    tmdb_passthrough,
+    tmdb_post,
+    tmdb_delete,
+)
+from api.extensions import db, socketio
+from api.projection import fields_arg, project_bytes
+from api.search_index import MOVIE_RESULT_FIELDS, hydrate, movie_index
+from api.suggest import DEFAULT_LIMIT, MAX_LIMIT, movie_suggest
+from api import json_provider
+from api.caching import (
+    build_cache_key,
+    cache_body,
+    cached_body,
+    cached_route,
+    clamp_page,
+    page_arg,
+    int_arg,
+    flag_arg,
+    text_arg,
+    warm_parts,
+)
 
 DEFAULT_PAGE = 1
 MAX_PAGE = 50
+SEARCH_MAX_PAGE = 500
+MAX_BATCH_IDS = 50
+
+# Sub-resources fetched along with the details via append_to_response
+MOVIE_APPEND = ("recommendations", "reviews")
 
 bp = Blueprint("movies", __name__, url_prefix="/movies")
 
 @bp.get("/movies")
-@cache.cached(timeout=300)
+@cached_route()
 def trending_all():
-    data, status = tmdb_get("/trending/all/day")
-    return jsonify(data), status
+    return tmdb_passthrough("/trending/all/day")
 
 @bp.get("/search")
+@cached_route(
+    q=text_arg,
+    page=page_arg(SEARCH_MAX_PAGE),
+    include_adult=flag_arg,
+    year=int_arg,
+)
 def search_movies():
     """ Search movies by title
     ---
@@ -54,13 +87,20 @@ def search_movies():
         description: "Missing query"
     """
     query = request.args.get("q", type=str)
-    page = request.args.get("page", 1, type=int)
+    page = clamp_page(request.args.get("page", 1, type=int), SEARCH_MAX_PAGE)
     include_adult = request.args.get("include_adult", "false").lower() == "true"
     year = request.args.get("year", type=int)
 
     if not query:
         return jsonify({"error": "Missing required query param: q"}), 400
 
+    # Answer from the local index when it knows the title
+    local = movie_index.search(query, page, year=year, include_adult=include_adult)
+    if local is not None:
+        local = hydrate(movie_index, local, "/movie", "/movies", MOVIE_RESULT_FIELDS)
+    if local is not None:
+        return current_app.response_class(json_provider.dumps_bytes(local), mimetype="application/json")
+
     params = {
         "query": query,
         "page": page,
@@ -69,12 +109,163 @@ def search_movies():
     if year:
         params["year"] = year
 
-    data, status = tmdb_get("/search/movie", params=params)
-    return jsonify(data), status
+    return tmdb_passthrough("/search/movie", params=params)
+
+
+@bp.get("/suggest")
+def suggest_movies():
+    """
+    Autocomplete movie titles
+    ---
+    tags:
+      - Movies
+    parameters:
+      - in: "query"
+        name: "prefix"
+        required: "true"
+        schema:
+          type: "string"
+        description: "Start of any word of the title (ex: dark kn)"
+      - in: "query"
+        name: "limit"
+        required: "false"
+        schema:
+          type: "integer"
+          default: "10"
+        description: "Number of suggestions, at most 20"
+    responses:
+      200:
+        description: "Matching titles, most popular first"
+      400:
+        description: "Missing prefix"
+    """
+    prefix = request.args.get("prefix", "", type=str)
+    limit = min(max(request.args.get("limit", DEFAULT_LIMIT, type=int), 1), MAX_LIMIT)
+    if not prefix.strip():
+        return jsonify({"error": "Missing required query param: prefix"}), 400
+    return jsonify({"results": movie_suggest.suggest(prefix, limit)})
+
+
+def _batch_id_values() -> list | None:
+    """The raw ids: a JSON list, or a comma separated string. None for anything else."""
+    if request.method == "POST":
+        body = request.get_json(silent=True)
+        if body is None:
+            raw = request.form.get("ids", "")
+        elif isinstance(body, dict):
+            raw = body.get("ids", "")
+        else:
+            return None
+    else:
+        raw = request.args.get("ids", "")
+    if isinstance(raw, str):
+        return [part for part in raw.split(",") if part.strip()]
+    return raw if isinstance(raw, list) else None
+
+
+def _parse_batch_ids(values: list) -> list[int] | None:
+    """Distinct ids in request order; None if any value is not an integer."""
+    ids: dict[int, None] = {}
+    for value in values:
+        if isinstance(value, bool) or not isinstance(value, (int, str)):
+            return None
+        try:
+            ids[int(value)] = None
+        except ValueError:
+            return None
+    return list(ids)
+
+
+@bp.route("/batch", methods=["GET", "POST"])
+def movie_details_batch():
+    """
+    Get details for several movies in one call
+    ---
+    tags:
+      - Movies
+    parameters:
+      - in: "query"
+        name: "ids"
+        required: "true"
+        schema:
+          type: "string"
+        description: "Comma separated movie IDs (ex: 550,680,13). POST accepts {\"ids\": [...]}"
+      - in: "query"
+        name: "fields"
+        required: "false"
+        schema:
+          type: "string"
+        description: "Fields to keep in each movie (ex: title,poster_path,vote_average)"
+    responses:
+      200:
+        description: "Per-ID status and details, in request order"
+      400:
+        description: "Missing, invalid or too many ids"
+    """
+    values = _batch_id_values()
+    # Bound the work before parsing: duplicates still count toward the limit
+    if values is not None and len(values) > MAX_BATCH_IDS:
+        return jsonify({"error": f"At most {MAX_BATCH_IDS} ids per batch"}), 400
+    ids = _parse_batch_ids(values or [])
+    if not ids:
+        return jsonify({"error": "Missing or invalid ids"}), 400
+
+    # Serve what movie_details already cached, fetch the rest concurrently
+    results: dict[int, tuple[bytes, int]] = {}
+    for movie_id in ids:
+        body = cached_body(build_cache_key(f"/movies/{movie_id}"))
+        if body is not None:
+            results[movie_id] = (body, 200)
+
+    misses = [movie_id for movie_id in ids if movie_id not in results]
+    fetched = tmdb_gather([(f"/movie/{movie_id}", None) for movie_id in misses], raw=True)
+    for movie_id, (body, status) in zip(misses, fetched):
+        results[movie_id] = (body, status)
+        if status == 200:
+            cache_body(build_cache_key(f"/movies/{movie_id}"), body)
+
+    fields = fields_arg(request.args.get("fields"))
+    if fields:
+        results = {
+            movie_id: (project_bytes(body, fields) if status == 200 else body, status)
+            for movie_id, (body, status) in results.items()
+        }
+
+    # Upstream bodies are spliced in as-is rather than decoded and re-encoded
+    items = b",".join(
+        b'{"id":%d,"status":%d,"data":%s}' % (movie_id, status, body)
+        for movie_id, (body, status) in ((i, results[i]) for i in ids)
+    )
+    payload = b'{"results":[%s],"cached":%d,"fetched":%d}' % (
+        items, len(ids) - len(misses), len(misses)
+    )
+    return current_app.response_class(payload, mimetype="application/json")
+
+
+def movie_cache_keys(movie_id: int) -> dict[str, str]:
+    """Keys of the routes one details + append_to_response fetch fills."""
+    page = {"page": DEFAULT_PAGE}
+    return {
+        "": build_cache_key(f"/movies/{movie_id}"),
+        "recommendations": build_cache_key(f"/movies/{movie_id}/recommendations", page),
+        "reviews": build_cache_key(f"/movies/{movie_id}/reviews", page),
+    }
+
+
+def _movie_part(movie_id: int, part: str):
+    """Serve one part of a details + sub-resources fetch, caching the others."""
+    parts, status = tmdb_get_appended(f"/movie/{movie_id}", list(MOVIE_APPEND))
+    if status == 200 and part not in parts:
+        return tmdb_passthrough(f"/movie/{movie_id}/{part}")
+    if status == 200:
+        warm_parts(parts, movie_cache_keys(movie_id), part)
+    return current_app.response_class(
+        parts.get(part, parts[""]), status=status, mimetype="application/json"
+    )
 
 
 @bp.get("/<int:movie_id>")
-@cache.cached(timeout=300)
+@cached_route()
 def movie_details(movie_id):
     """
     Get movie details
@@ -86,15 +277,20 @@ def movie_details(movie_id):
         name: "movie_id"
         required: true
         schema: { type: "integer" }
+      - in: "query"
+        name: "fields"
+        required: false
+        schema: { type: "string" }
+        description: "Comma separated fields to return, nested with dots (ex: title,genres.name)"
     responses:
       200:
         description: "Movie details"
     """
-    data, status = tmdb_get(f"/movie/{movie_id}")
-    return jsonify(data), status
+    return _movie_part(movie_id, "")
 
 
 @bp.get("/<int:movie_id>/recommendations")
+@cached_route(page=page_arg(MAX_PAGE))
 def movie_recommendations(movie_id):
     """
     Get movie recommendations
@@ -106,12 +302,14 @@ def movie_recommendations(movie_id):
         name: "page"
         schema: { type: "integer", default: "1" }
     """
-    page = max(1, min(request.args.get("page", 1, type=int), 50))
-    data, status = tmdb_get(f"/movie/{movie_id}/recommendations", params={"page": page})
-    return jsonify(data), status
+    page = clamp_page(request.args.get("page", 1, type=int), MAX_PAGE)
+    if page == DEFAULT_PAGE:
+        return _movie_part(movie_id, "recommendations")
+    return tmdb_passthrough(f"/movie/{movie_id}/recommendations", params={"page": page})
 
 
 @bp.get("/<int:movie_id>/reviews")
+@cached_route(page=page_arg(MAX_PAGE))
 def movie_reviews(movie_id):
     """
     Get movie reviews
@@ -119,9 +317,10 @@ def movie_reviews(movie_id):
     tags:
       - Movies
     """
-    page = max(1, min(request.args.get("page", 1, type=int), 50))
-    data, status = tmdb_get(f"/movie/{movie_id}/reviews", params={"page": page})
-    return jsonify(data), status
+    page = clamp_page(request.args.get("page", 1, type=int), MAX_PAGE)
+    if page == DEFAULT_PAGE:
+        return _movie_part(movie_id, "reviews")
+    return tmdb_passthrough(f"/movie/{movie_id}/reviews", params={"page": page})
 
 
 @bp.post("/<int:movie_id>/rating")
@@ -148,6 +347,8 @@ def add_movie_rating(movie_id):
 
     if value is None or not session_id:
         return jsonify({"error": "Missing value or session_id"}), 400
+    if not check_session(session_id):
+        return jsonify({"error": "Invalid or revoked session_id"}), 401
 
     data, status = tmdb_post(
         f"/movie/{movie_id}/rating",
@@ -179,6 +380,8 @@ def delete_movie_rating(movie_id):
 
     if not session_id:
         return jsonify({"error": "Missing session_id"}), 400
+    if not check_session(session_id):
+        return jsonify({"error": "Invalid or revoked session_id"}), 401
 
     data, status = tmdb_delete(
         f"/movie/{movie_id}/rating",
@@ -1,32 +1,30 @@
 #!/usr/bin/env python3
-from flask import Blueprint, jsonify, request
-from api.tmdb_client import tmdb_get
-from api.extensions import cache
+from flask import Blueprint, request
+from api.tmdb_client import tmdb_passthrough
+from api.caching import cached_route, clamp_page, page_arg
+
+MAX_PAGE = 500
 
 bp = Blueprint("trending", __name__, url_prefix="/trending")
 
 
 def _page():
-    p = request.args.get("page", 1, type=int)
-    return max(1, min(p, 500))
+    return clamp_page(request.args.get("page", 1, type=int), MAX_PAGE)
 
 
 @bp.get("/all")
-@cache.cached(timeout=300)
+@cached_route(page=page_arg(MAX_PAGE))
 def trending_all():
-    data, status = tmdb_get("/trending/all/day", params={"page": _page()})
-    return jsonify(data), status
+    return tmdb_passthrough("/trending/all/day", params={"page": _page()})
 
 
 @bp.get("/movies")
-@cache.cached(timeout=300)
+@cached_route(page=page_arg(MAX_PAGE))
 def trending_movies():
-    data, status = tmdb_get("/trending/movie/day", params={"page": _page()})
-    return jsonify(data), status
+    return tmdb_passthrough("/trending/movie/day", params={"page": _page()})
 
 
 @bp.get("/tv")
-@cache.cached(timeout=300)
+@cached_route(page=page_arg(MAX_PAGE))
 def trending_tv():
-    data, status = tmdb_get("/trending/tv/day", params={"page": _page()})
-    return jsonify(data), status
+    return tmdb_passthrough("/trending/tv/day", params={"page": _page()})
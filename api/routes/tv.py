@@ -3,19 +3,63 @@
 TV Series routes for interacting with TMDB TV endpoints.
 """
 
-from flask import Blueprint, jsonify, request
-from api.tmdb_client import tmdb_get, tmdb_post, tmdb_delete
-from api.extensions import cache
+from flask import Blueprint, current_app, jsonify, request
+from api import json_provider
+from api.search_index import TV_RESULT_FIELDS, hydrate, tv_index
+from api.suggest import DEFAULT_LIMIT, MAX_LIMIT, tv_suggest
+from api.session_cache import check_session
+from api.tmdb_client import tmdb_get_appended, tmdb_passthrough, tmdb_post, tmdb_delete
+from api.caching import (
+    build_cache_key,
+    cached_route,
+    clamp_page,
+    page_arg,
+    int_arg,
+    flag_arg,
+    text_arg,
+    warm_parts,
+)
+
+DEFAULT_PAGE = 1
+MAX_PAGE = 50
+SEARCH_MAX_PAGE = 500
+
+# Sub-resources fetched along with the details via append_to_response
+TV_APPEND = ("recommendations", "reviews", "keywords", "similar")
 
 bp = Blueprint("tv", __name__, url_prefix="/tv")
 
 @bp.get("/tv")
-@cache.cached(timeout=300)
+@cached_route()
 def trending_all():
-    data, status = tmdb_get("/trending/all/day")
-    return jsonify(data), status
+    return tmdb_passthrough("/trending/all/day")
+
+def tv_cache_keys(tv_id: int) -> dict[str, str]:
+    """Keys of the routes one details + append_to_response fetch fills."""
+    page = {"page": DEFAULT_PAGE}
+    return {
+        "": build_cache_key(f"/tv/{tv_id}"),
+        "recommendations": build_cache_key(f"/tv/{tv_id}/recommendations", page),
+        "reviews": build_cache_key(f"/tv/{tv_id}/reviews", page),
+        "keywords": build_cache_key(f"/tv/{tv_id}/keywords"),
+        "similar": build_cache_key(f"/tv/{tv_id}/similar"),
+    }
+
+
+def _tv_part(tv_id: int, part: str):
+    """Serve one part of a details + sub-resources fetch, caching the others."""
+    parts, status = tmdb_get_appended(f"/tv/{tv_id}", list(TV_APPEND))
+    if status == 200 and part not in parts:
+        return tmdb_passthrough(f"/tv/{tv_id}/{part}")
+    if status == 200:
+        warm_parts(parts, tv_cache_keys(tv_id), part)
+    return current_app.response_class(
+        parts.get(part, parts[""]), status=status, mimetype="application/json"
+    )
+
 
 @bp.get("/<int:tv_id>")
+@cached_route()
 def tv_details(tv_id):
     """
     Get TV series details
@@ -28,15 +72,21 @@ def tv_details(tv_id):
         required: true
         schema:
           type: integer
+      - in: query
+        name: fields
+        required: false
+        schema:
+          type: string
+        description: Comma separated fields to return, nested with dots (ex: name,seasons.episode_count)
     responses:
       200:
         description: TV details
     """
-    data, status = tmdb_get(f"/tv/{tv_id}")
-    return jsonify(data), status
+    return _tv_part(tv_id, "")
 
 
 @bp.get("/<int:tv_id>/recommendations")
+@cached_route(page=page_arg(MAX_PAGE))
 def tv_recommendations(tv_id):
     """
     Get TV recommendations
@@ -50,11 +100,18 @@ def tv_recommendations(tv_id):
           type: integer
           default: 1
     """
-    page = max(1, min(request.args.get("page", 1, type=int), 50))
-    data, status = tmdb_get(f"/tv/{tv_id}/recommendations", params={"page": page})
-    return jsonify(data), status
+    page = clamp_page(request.args.get("page", 1, type=int), MAX_PAGE)
+    if page == DEFAULT_PAGE:
+        return _tv_part(tv_id, "recommendations")
+    return tmdb_passthrough(f"/tv/{tv_id}/recommendations", params={"page": page})
 
 @bp.get("/search")
+@cached_route(
+    q=text_arg,
+    page=page_arg(SEARCH_MAX_PAGE),
+    include_adult=flag_arg,
+    first_air_date_year=int_arg,
+)
 def search_tv():
     """
     Search TV series by title
@@ -75,6 +132,13 @@ def search_tv():
           type: integer
           default: 1
         description: Page number for pagination
+      - in: query
+        name: include_adult
+        required: false
+        schema:
+          type: boolean
+          default: false
+        description: Include adult results
       - in: query
         name: first_air_date_year
         required: false
@@ -88,25 +152,67 @@ def search_tv():
         description: Missing query parameter
     """
     query = request.args.get("q", type=str)
-    page = request.args.get("page", 1, type=int)
-    page = max(1, min(page, 500))
+    page = clamp_page(request.args.get("page", 1, type=int), SEARCH_MAX_PAGE)
+    include_adult = request.args.get("include_adult", "false").lower() == "true"
     year = request.args.get("first_air_date_year", type=int)
 
     if not query:
         return jsonify({"error": "Missing required query param: q"}), 400
 
+    # Answer from the local index when it knows the title
+    local = tv_index.search(query, page, year=year, include_adult=include_adult)
+    if local is not None:
+        local = hydrate(tv_index, local, "/tv", "/tv", TV_RESULT_FIELDS)
+    if local is not None:
+        return current_app.response_class(json_provider.dumps_bytes(local), mimetype="application/json")
+
     params = {
         "query": query,
         "page": page,
+        "include_adult": include_adult,
     }
 
     if year:
         params["first_air_date_year"] = year
 
-    data, status = tmdb_get("/search/tv", params=params)
-    return jsonify(data), status
+    return tmdb_passthrough("/search/tv", params=params)
+
+
+@bp.get("/suggest")
+def suggest_tv():
+    """
+    Autocomplete TV titles
+    ---
+    tags:
+      - TV
+    parameters:
+      - in: "query"
+        name: "prefix"
+        required: "true"
+        schema:
+          type: "string"
+        description: "Start of any word of the title (ex: dark kn)"
+      - in: "query"
+        name: "limit"
+        required: "false"
+        schema:
+          type: "integer"
+          default: "10"
+        description: "Number of suggestions, at most 20"
+    responses:
+      200:
+        description: "Matching titles, most popular first"
+      400:
+        description: "Missing prefix"
+    """
+    prefix = request.args.get("prefix", "", type=str)
+    limit = min(max(request.args.get("limit", DEFAULT_LIMIT, type=int), 1), MAX_LIMIT)
+    if not prefix.strip():
+        return jsonify({"error": "Missing required query param: prefix"}), 400
+    return jsonify({"results": tv_suggest.suggest(prefix, limit)})
 
 @bp.get("/<int:tv_id>/reviews")
+@cached_route(page=page_arg(MAX_PAGE))
 def tv_reviews(tv_id):
     """
     Get TV reviews
@@ -114,11 +220,13 @@ def tv_reviews(tv_id):
     tags:
       - TV
     """
-    page = max(1, min(request.args.get("page", 1, type=int), 50))
-    data, status = tmdb_get(f"/tv/{tv_id}/reviews", params={"page": page})
-    return jsonify(data), status
+    page = clamp_page(request.args.get("page", 1, type=int), MAX_PAGE)
+    if page == DEFAULT_PAGE:
+        return _tv_part(tv_id, "reviews")
+    return tmdb_passthrough(f"/tv/{tv_id}/reviews", params={"page": page})
 
 @bp.get("/<int:tv_id>/keywords")
+@cached_route()
 def tv_keywords(tv_id):
     """
     Get TV keywords
@@ -126,11 +234,11 @@ def tv_keywords(tv_id):
     tags:
       - TV
     """
-    data, status = tmdb_get(f"/tv/{tv_id}/keywords")
-    return jsonify(data), status
+    return _tv_part(tv_id, "keywords")
 
 
 @bp.get("/<int:tv_id>/similar")
+@cached_route()
 def tv_similar(tv_id):
     """
     Get similar TV series
@@ -138,8 +246,7 @@ def tv_similar(tv_id):
     tags:
       - TV
     """
-    data, status = tmdb_get(f"/tv/{tv_id}/similar")
-    return jsonify(data), status
+    return _tv_part(tv_id, "similar")
 
 
 @bp.post("/<int:tv_id>/rating")
@@ -171,6 +278,8 @@ def add_tv_rating(tv_id):
 
     if value is None or not session_id:
         return jsonify({"error": "Missing value or session_id"}), 400
+    if not check_session(session_id):
+        return jsonify({"error": "Invalid or revoked session_id"}), 401
 
     data, status = tmdb_post(
         f"/tv/{tv_id}/rating",
@@ -204,6 +313,8 @@ def delete_tv_rating(tv_id):
 
     if not session_id:
         return jsonify({"error": "Missing session_id"}), 400
+    if not check_session(session_id):
+        return jsonify({"error": "Invalid or revoked session_id"}), 401
 
     data, status = tmdb_delete(
         f"/tv/{tv_id}/rating",
@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+In-process full-text search over ingested TMDB metadata.
+An inverted index with BM25 ranking answers /movies/search and
+/tv/search locally; routes fall back to TMDB when it has no match.
+
+Rows of the ingested tables only carry the original title, so results
+built from them are filled in from the details responses (cached, or
+fetched together) before they are served, and kept in that full form.
+"""
+
+import gzip
+import json
+import math
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from typing import Any, Callable, Iterable
+
+from flask import Flask
+from sqlalchemy import inspect, select
+
+from api import json_provider
+from api.caching import build_cache_key, cache_body, cached_body
+from api.extensions import db, in_cli_command, socketio
+from api.models import Movie, TvSeries
+from api.tmdb_client import tmdb_gather
+
+PAGE_SIZE = 20
+MAX_PREFIX_TERMS = 50
+DB_BATCH_SIZE = 10_000
+
+# Search result fields the ingested tables can fill; the rest (title,
+# overview, poster_path, ...) come from the details when a row is served
+MOVIE_COLUMNS = {
+    "id": "id",
+    "original_title": "original_title",
+    "popularity": "popularity",
+    "adult": "adult",
+    "video": "video",
+}
+TV_COLUMNS = {
+    "id": "id",
+    "original_name": "original_name",
+    "popularity": "popularity",
+}
+
+# Fields of a /search/movie and /search/tv result; details responses
+# carry these too, plus much more that the index should not hold
+MOVIE_RESULT_FIELDS = (
+    "id", "title", "original_title", "original_language", "overview", "release_date",
+    "poster_path", "backdrop_path", "popularity", "vote_average", "vote_count", "adult", "video",
+)
+TV_RESULT_FIELDS = (
+    "id", "name", "original_name", "original_language", "overview", "first_air_date",
+    "poster_path", "backdrop_path", "popularity", "vote_average", "vote_count", "origin_country",
+)
+
+_WORD = re.compile(r"[a-z0-9]+")
+_VOWEL = re.compile(r"[aeiouy]")
+
+
+def stem(word: str) -> str:
+    """
+    Light suffix-stripping stemmer: folds plurals and -ing/-ed forms so
+    "stories"/"story" and "running"/"run" index to the same term.
+    """
+    if len(word) <= 3 or word.isdigit():
+        return word
+    for suffix, replacement in (("sses", "ss"), ("ies", "i"), ("ss", "ss"),
+                                ("us", "us"), ("is", "is"), ("s", "")):
+        if word.endswith(suffix):
+            word = word[: -len(suffix)] + replacement
+            break
+    for suffix in ("ingly", "edly", "ing", "ed"):
+        base = word[: -len(suffix)]
+        if word.endswith(suffix) and len(base) >= 3 and _VOWEL.search(base):
+            word = base
+            if word[-1] == word[-2] and word[-1] not in "lsz":
+                word = word[:-1]
+            break
+    if word.endswith("y") and len(word) > 3 and word[-2] not in "aeiou":
+        word = word[:-1] + "i"
+    elif word.endswith("ie"):
+        word = word[:-1]
+    elif word.endswith("e") and len(word) > 4:
+        word = word[:-1]
+    return word
+
+
+def fold(text: str) -> str:
+    """Lowercase and strip accents ("Amélie" -> "amelie")."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+
+
+def words(text: str) -> list[str]:
+    """
+    Folded words of text. Single letters are dropped, which also
+    discards the fragments of "d'Amélie" and "Ocean's".
+    """
+    return [word for word in _WORD.findall(fold(text)) if len(word) > 1 or word.isdigit()]
+
+
+def tokenize(text: str) -> list[str]:
+    return [stem(word) for word in words(text)]
+
+
+def search_result(details: dict[str, Any], fields: tuple[str, ...]) -> dict[str, Any]:
+    """Cut a details response down to the search result fields, genres to genre_ids."""
+    result = {field: details[field] for field in fields if field in details}
+    if isinstance(details.get("genres"), list):
+        result["genre_ids"] = [genre["id"] for genre in details["genres"] if "id" in genre]
+    return result
+
+
+class SearchIndex:
+    """
+    Inverted index of TMDB search results keyed by id.
+
+    Documents are the objects TMDB returns from /search/movie or
+    /search/tv; results are served in that same shape. `title_fields`
+    are indexed, `date_field` feeds the year filter. Query terms are
+    ANDed and the last one also matches as a prefix, so partially typed
+    queries still hit.
+    """
+
+    def __init__(self, title_fields: tuple[str, ...], date_field: str,
+                 k1: float = 1.2, b: float = 0.75):
+        self.title_fields = title_fields
+        self.date_field = date_field
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        self._docs: dict[int, dict[str, Any]] = {}
+        self._lengths: dict[int, int] = {}
+        self._postings: dict[str, dict[int, int]] = defaultdict(dict)
+        self._vocabulary: list[str] = []
+        self._total_length = 0
+        self._dirty = False
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def __contains__(self, doc_id: object) -> bool:
+        return doc_id in self._docs
+
+    def _text(self, doc: dict[str, Any]) -> str:
+        # original_title often repeats title; index each distinct string once
+        values = dict.fromkeys(str(doc[f]) for f in self.title_fields if doc.get(f))
+        return " ".join(values)
+
+    def _unindex(self, doc_id: int) -> None:
+        for term in set(tokenize(self._text(self._docs[doc_id]))):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_length -= self._lengths.pop(doc_id)
+        del self._docs[doc_id]
+
+    def add(self, doc: dict[str, Any]) -> bool:
+        """Index (or replace) one document; False when it has no id or title."""
+        doc_id = doc.get("id")
+        terms = tokenize(self._text(doc))
+        if not isinstance(doc_id, int) or not terms:
+            return False
+        with self._lock:
+            if doc_id in self._docs:
+                self._unindex(doc_id)
+            self._docs[doc_id] = doc
+            self._lengths[doc_id] = len(terms)
+            self._total_length += len(terms)
+            for term, tf in Counter(terms).items():
+                self._postings[term][doc_id] = tf
+            self._dirty = True
+        return True
+
+    def is_sparse(self, doc: dict[str, Any]) -> bool:
+        """Built from a table row: no display title (title / name) yet."""
+        return not doc.get(self.title_fields[0])
+
+    def documents(self) -> list[dict[str, Any]]:
+        with self._lock:
+            return list(self._docs.values())
+
+    def add_many(self, docs: Iterable[dict[str, Any]]) -> int:
+        return sum(self.add(doc) for doc in docs)
+
+    def load_table(self, model: type, columns: dict[str, str]) -> int:
+        """
+        Index every row of an ingested table (flask ingest) as a search
+        result with the fields in `columns`; returns docs added.
+        """
+        table = model.__table__
+        if not inspect(db.engine).has_table(table.name):
+            return 0
+        query = select(*(table.c[name] for name in dict.fromkeys(columns.values())))
+        added = 0
+        with db.engine.connect() as conn:
+            result = conn.execution_options(yield_per=DB_BATCH_SIZE).execute(query)
+            for rows in result.partitions():
+                added += self.add_many(
+                    {field: row._mapping[column] for field, column in columns.items()}
+                    for row in rows
+                )
+                # Let requests run between batches while the server loads
+                socketio.sleep(0)
+        return added
+
+    def load_jsonl(self, path: str) -> int:
+        """Index a JSON-lines file (gzip when it ends in .gz); returns docs added."""
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as fh:
+            return self.add_many(json.loads(line) for line in fh if line.strip())
+
+    def _vocab(self) -> list[str]:
+        with self._lock:
+            if self._dirty:
+                self._vocabulary = sorted(self._postings)
+                self._dirty = False
+            return self._vocabulary
+
+    def _prefix_terms(self, prefix: str) -> list[str]:
+        vocabulary = self._vocab()
+        start = bisect_left(vocabulary, prefix)
+        terms = []
+        for term in vocabulary[start:start + MAX_PREFIX_TERMS]:
+            if not term.startswith(prefix):
+                break
+            terms.append(term)
+        return terms
+
+    def _year(self, doc: dict[str, Any]) -> int | None:
+        date = doc.get(self.date_field) or ""
+        return int(date[:4]) if date[:4].isdigit() else None
+
+    def _score(self, query: str) -> dict[int, float]:
+        query_words = words(query)
+        if not query_words or not self._docs:
+            return {}
+        n_docs = len(self._docs)
+        avg_length = self._total_length / n_docs
+
+        scores: dict[int, float] | None = None
+        for position, word in enumerate(query_words):
+            terms = {stem(word)}
+            if position == len(query_words) - 1:
+                terms.update(self._prefix_terms(word))
+
+            # Best-scoring variant per document for this query word
+            word_scores: dict[int, float] = {}
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._lengths[doc_id] / avg_length)
+                    score = idf * tf * (self.k1 + 1) / (tf + norm)
+                    if score > word_scores.get(doc_id, 0.0):
+                        word_scores[doc_id] = score
+
+            if scores is None:
+                scores = word_scores
+            else:
+                scores = {d: s + word_scores[d] for d, s in scores.items() if d in word_scores}
+            if not scores:
+                return {}
+        return scores or {}
+
+    def search(self, query: str, page: int = 1, year: int | None = None,
+               include_adult: bool = False) -> dict[str, Any] | None:
+        """
+        A TMDB-shaped result page, or None when nothing matches locally
+        so the caller can ask TMDB instead.
+        """
+        with self._lock:
+            scores = self._score(query)
+            matches = [
+                doc_id for doc_id in scores
+                if (include_adult or not self._docs[doc_id].get("adult"))
+                and (year is None or self._year(self._docs[doc_id]) == year)
+            ]
+            if not matches:
+                return None
+
+            # Relevance first, popularity breaks ties
+            matches.sort(key=lambda d: (-scores[d], -(self._docs[d].get("popularity") or 0)))
+            start = (page - 1) * PAGE_SIZE
+            results = [self._docs[d] for d in matches[start:start + PAGE_SIZE]]
+
+        return {
+            "page": page,
+            "results": results,
+            "total_pages": math.ceil(len(matches) / PAGE_SIZE),
+            "total_results": len(matches),
+        }
+
+
+movie_index = SearchIndex(("title", "original_title"), "release_date")
+tv_index = SearchIndex(("name", "original_name"), "first_air_date")
+
+
+def hydrate(index: SearchIndex, page: dict[str, Any], upstream: str, route: str,
+            fields: tuple[str, ...]) -> dict[str, Any] | None:
+    """
+    Fill the table-built results of a page from the details responses:
+    cached under `route`/<id>, or fetched from `upstream`/<id> together
+    (and cached). They are cut to `fields` and replace the sparse docs in
+    the index. None when a fetch fails, so the caller can ask TMDB.
+    """
+    sparse = [doc["id"] for doc in page["results"] if index.is_sparse(doc)]
+    if not sparse:
+        return page
+
+    bodies: dict[int, bytes] = {}
+    for doc_id in sparse:
+        body = cached_body(build_cache_key(f"{route}/{doc_id}"))
+        if body is not None:
+            bodies[doc_id] = body
+    misses = [doc_id for doc_id in sparse if doc_id not in bodies]
+    fetched = tmdb_gather([(f"{upstream}/{doc_id}", None) for doc_id in misses], raw=True)
+    for doc_id, (body, status) in zip(misses, fetched):
+        if status != 200:
+            return None
+        bodies[doc_id] = body
+        cache_body(build_cache_key(f"{route}/{doc_id}"), body)
+
+    full = {doc_id: search_result(json_provider.loads(body), fields) for doc_id, body in bodies.items()}
+    index.add_many(full.values())
+    return {**page, "results": [full.get(doc["id"], doc) for doc in page["results"]]}
+
+
+def _load(app: Flask, on_loaded: Callable[[], None] | None) -> None:
+    if app.config.get("SEARCH_INDEX_FROM_DB", True):
+        with app.app_context():
+            for model, columns, index in ((Movie, MOVIE_COLUMNS, movie_index),
+                                          (TvSeries, TV_COLUMNS, tv_index)):
+                try:
+                    added = index.load_table(model, columns)
+                except Exception:
+                    app.logger.exception("Could not index %s", model.__tablename__)
+                    continue
+                if added:
+                    app.logger.info("Indexed %d rows from %s", added, model.__tablename__)
+
+    for setting, index in (("SEARCH_INDEX_MOVIES_FILE", movie_index),
+                           ("SEARCH_INDEX_TV_FILE", tv_index)):
+        path = app.config.get(setting)
+        if not path:
+            continue
+        try:
+            added = index.load_jsonl(path)
+        except (OSError, ValueError):
+            app.logger.exception("Could not load search index from %s", path)
+            continue
+        app.logger.info("Indexed %d documents from %s", added, path)
+
+    if on_loaded is not None:
+        on_loaded()
+
+
+def init_search_index(app: Flask, on_loaded: Callable[[], None] | None = None) -> None:
+    """
+    Index the movies / tv_series tables, then SEARCH_INDEX_MOVIES_FILE /
+    SEARCH_INDEX_TV_FILE when configured, and call `on_loaded`. File
+    documents are full search results, so they replace the table rows.
+
+    Loading runs in the background of the server process only; searches
+    go to TMDB until it is done, and `flask` commands never load it.
+    """
+    if in_cli_command():
+        return
+    socketio.start_background_task(_load, app, on_loaded)
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Known-session index for the rating routes.
+
+Each worker keeps a TTL-bounded map of TMDB session ids to "valid",
+"revoked" or "unknown", filled from the sessions table. Rating routes
+reject revoked ids without a TMDB round trip; unknown ids (issued
+elsewhere, or pruned by retention) go on to TMDB, which decides.
+
+Logins and logouts update the local map at once. With
+SESSION_EVENTS_REDIS_URL set they are also published on a Redis channel,
+so other workers update their maps immediately; without it, other
+workers catch up when their entry expires.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from flask import Flask, current_app
+from sqlalchemy import and_, or_
+from sqlalchemy.exc import SQLAlchemyError
+
+from api.extensions import db, socketio
+from api.models.session import Session
+from api.session_writer import flush_sessions
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - depends on the environment
+    redis = None
+
+VALID = "valid"
+REVOKED = "revoked"
+UNKNOWN = "unknown"
+
+CHANNEL = "tmdb-api:sessions"
+DEFAULT_TTL = 60.0
+# Unknown ids are re-checked sooner: the row may still be in the write-behind buffer
+DEFAULT_NEGATIVE_TTL = 5.0
+DEFAULT_MAX_ENTRIES = 100_000
+# The listener polls Redis rather than blocking in a read the hub cannot
+# interrupt, and resubscribes with doubling delays when the link drops
+LISTEN_POLL_INTERVAL = 0.1
+RECONNECT_DELAY = 1.0
+MAX_RECONNECT_DELAY = 30.0
+
+
+class SessionCache:
+    """LRU map of session id -> (state, expires_at)."""
+
+    def __init__(self, ttl: float = DEFAULT_TTL, negative_ttl: float = DEFAULT_NEGATIVE_TTL,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, session_id: str) -> str | None:
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None or entry[1] <= time.monotonic():
+                self.misses += 1
+                return None
+            self._entries.move_to_end(session_id)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, session_id: str, state: str) -> None:
+        ttl = self.negative_ttl if state == UNKNOWN else self.ttl
+        with self._lock:
+            self._entries[session_id] = (state, time.monotonic() + ttl)
+            self._entries.move_to_end(session_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+_cache = SessionCache()
+_redis = None
+
+
+def _lookup(session_id: str, revoked: bool):
+    state = Session.revoked_at.is_not(None) if revoked else Session.revoked_at.is_(None)
+    # The state test sits in each branch so each one can search its
+    # partial index (idx_sessions_*_active / idx_sessions_*_revoked)
+    return db.select(Session.id).where(or_(
+        and_(Session.tmdb_guest_session_id == session_id, state),
+        and_(Session.tmdb_user_session_id == session_id, state),
+    )).limit(1)
+
+
+def _load_state(session_id: str) -> str | None:
+    """The id's state from the table; None when the database cannot say."""
+    try:
+        if db.session.execute(_lookup(session_id, revoked=False)).first() is not None:
+            return VALID
+        # Revoked rows are only looked for on a live miss
+        if db.session.execute(_lookup(session_id, revoked=True)).first() is not None:
+            return REVOKED
+    except SQLAlchemyError:
+        db.session.rollback()
+        current_app.logger.exception("Session lookup failed; letting TMDB decide")
+        return None
+    return UNKNOWN
+
+
+def session_state(session_id: str) -> str:
+    state = _cache.get(session_id)
+    if state is None:
+        state = _load_state(session_id)
+        if state is None:
+            # Fail open, and ask the database again next time
+            return UNKNOWN
+        _cache.put(session_id, state)
+    return state
+
+
+def check_session(session_id: str) -> bool:
+    """False when the id was revoked here (SESSION_CHECK=False skips this)."""
+    if not current_app.config.get("SESSION_CHECK", True):
+        return True
+    return session_state(session_id) != REVOKED
+
+
+def _publish(session_id: str, state: str) -> None:
+    _cache.put(session_id, state)
+    if _redis is not None:
+        try:
+            _redis.publish(CHANNEL, json.dumps({"session_id": session_id, "state": state}))
+        except Exception:
+            current_app.logger.exception("Could not publish session event")
+
+
+def session_created(session_id: str) -> None:
+    _publish(session_id, VALID)
+
+
+def revoke_session(session_id: str) -> None:
+    """Mark the session's rows revoked and tell every worker."""
+    # The row may still be waiting in the write-behind buffer
+    flush_sessions()
+    db.session.execute(
+        db.update(Session)
+        .where(or_(
+            Session.tmdb_guest_session_id == session_id,
+            Session.tmdb_user_session_id == session_id,
+        ))
+        .where(Session.revoked_at.is_(None))
+        .values(revoked_at=db.func.now())
+    )
+    db.session.commit()
+    _publish(session_id, REVOKED)
+
+
+def session_cache_stats() -> dict[str, int]:
+    return _cache.stats()
+
+
+def _apply_event(app: Flask, message: dict) -> None:
+    try:
+        event = json.loads(message["data"])
+        _cache.put(event["session_id"], event["state"])
+    except (ValueError, KeyError, TypeError):
+        app.logger.warning("Ignoring malformed session event: %r", message)
+
+
+def _listen(app: Flask, client) -> None:
+    delay = RECONNECT_DELAY
+    while True:
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        try:
+            pubsub.subscribe(CHANNEL)
+            delay = RECONNECT_DELAY
+            while True:
+                message = pubsub.get_message(timeout=0)
+                if message is None:
+                    socketio.sleep(LISTEN_POLL_INTERVAL)
+                else:
+                    _apply_event(app, message)
+        except redis.RedisError:
+            app.logger.warning("Session events connection lost; retrying in %.0fs", delay)
+        finally:
+            try:
+                pubsub.close()
+            except redis.RedisError:
+                pass
+        # Events sent while disconnected are gone: reload every id from the table
+        _cache.clear()
+        socketio.sleep(delay)
+        delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+
+def init_session_cache(app: Flask) -> None:
+    global _cache, _redis
+
+    _cache = SessionCache(
+        ttl=app.config.get("SESSION_CACHE_TTL", DEFAULT_TTL),
+        negative_ttl=app.config.get("SESSION_CACHE_NEGATIVE_TTL", DEFAULT_NEGATIVE_TTL),
+        max_entries=app.config.get("SESSION_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES),
+    )
+    _redis = None
+    url = app.config.get("SESSION_EVENTS_REDIS_URL")
+    if not url:
+        return
+    if redis is None:
+        app.logger.warning("SESSION_EVENTS_REDIS_URL is set but redis is not installed")
+        return
+    _redis = redis.Redis.from_url(url)
+    socketio.start_background_task(_listen, app, _redis)
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Monthly partitions and retention for the sessions table.
+
+On PostgreSQL, sql/create_tables.sql creates `sessions` partitioned by
+range on created_at, with one partition per month (sessions_pYYYYMM) and
+a default partition as a safety net. The maintenance job creates the
+next SESSION_PARTITIONS_AHEAD months in advance and retires months older
+than SESSION_RETENTION_DAYS. A retired month is detached, its live user
+sessions are carried into the current month (TMDB user sessions do not
+expire), and the table is dropped, or kept for archiving when
+SESSION_PRUNE_DROP is off. Dropping a partition costs no vacuum work and
+leaves the indexes of the other partitions alone.
+
+On other databases, or a sessions table that is not partitioned, expired
+guest and revoked rows are deleted instead.
+
+sql/create_tables.sql creates the current and next two months. After
+that run `flask sessions maintain` from cron, or set
+SESSION_MAINTENANCE_INTERVAL to have the API server run it at startup and
+then every that many seconds.
+"""
+
+import re
+from datetime import date, timedelta
+from typing import Callable
+
+import click
+from flask import Flask, current_app
+from flask.cli import AppGroup
+from sqlalchemy import Connection, inspect, or_, text
+
+from api.extensions import cache, db, in_cli_command, socketio
+from api.models.session import Session
+
+DEFAULT_RETENTION_DAYS = 90
+DEFAULT_PARTITIONS_AHEAD = 2
+
+PARTITION_NAME = re.compile(r"^sessions_p(\d{4})(\d{2})$")
+# Rows still in use after their month is retired
+_CARRIED_COLUMNS = "user_id, tmdb_guest_session_id, tmdb_user_session_id"
+
+
+def _month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def _next_month(month: date) -> date:
+    return (month.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def partition_name(month: date) -> str:
+    return f"sessions_p{month:%Y%m}"
+
+
+def _is_partitioned(conn: Connection) -> bool:
+    if conn.dialect.name != "postgresql":
+        return False
+    return conn.execute(text(
+        "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('sessions')"
+    )).first() is not None
+
+
+def _partitions(conn: Connection) -> dict[date, str]:
+    names = conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass('sessions')"
+    )).scalars()
+    months = {}
+    for name in names:
+        match = PARTITION_NAME.match(name)
+        if match:
+            months[date(int(match[1]), int(match[2]), 1)] = name
+    return months
+
+
+def ensure_partitions(conn: Connection, today: date, ahead: int) -> list[str]:
+    """Create the partitions for this month and the next `ahead` months."""
+    existing = _partitions(conn)
+    created = []
+    month = _month_start(today)
+    for _ in range(ahead + 1):
+        if month not in existing:
+            name = partition_name(month)
+            conn.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF sessions "
+                f"FOR VALUES FROM ('{month}') TO ('{_next_month(month)}')"
+            ))
+            created.append(name)
+        month = _next_month(month)
+    return created
+
+
+def prune_partitions(conn: Connection, cutoff: date, drop: bool = True) -> list[str]:
+    """Retire every monthly partition that ends on or before `cutoff`."""
+    retired = []
+    for month, name in sorted(_partitions(conn).items()):
+        if _next_month(month) > cutoff:
+            break
+        conn.execute(text(f"ALTER TABLE sessions DETACH PARTITION {name}"))
+        conn.execute(text(
+            f"INSERT INTO sessions ({_CARRIED_COLUMNS}) SELECT {_CARRIED_COLUMNS} FROM {name} "
+            "WHERE tmdb_user_session_id IS NOT NULL AND revoked_at IS NULL"
+        ))
+        if drop:
+            conn.execute(text(f"DROP TABLE {name}"))
+        retired.append(name)
+    return retired
+
+
+def delete_expired(conn: Connection, cutoff: date) -> int:
+    """Unpartitioned fallback: delete old guest sessions and old revoked sessions."""
+    table = Session.__table__
+    result = conn.execute(
+        table.delete()
+        .where(table.c.created_at < cutoff)
+        .where(or_(table.c.tmdb_user_session_id.is_(None), table.c.revoked_at.is_not(None)))
+    )
+    return result.rowcount
+
+
+def maintain_sessions(
+    today: date | None = None,
+    echo: Callable[[str], None] = lambda message: None,
+) -> dict[str, int]:
+    today = today or date.today()
+    retention = current_app.config.get("SESSION_RETENTION_DAYS", DEFAULT_RETENTION_DAYS)
+    ahead = current_app.config.get("SESSION_PARTITIONS_AHEAD", DEFAULT_PARTITIONS_AHEAD)
+    cutoff = today - timedelta(days=retention)
+
+    if not inspect(db.engine).has_table(Session.__tablename__):
+        return {"created": 0, "retired": 0, "deleted": 0}
+
+    with db.engine.begin() as conn:
+        if not _is_partitioned(conn):
+            deleted = delete_expired(conn, cutoff)
+            echo(f"sessions: {deleted} rows older than {cutoff} deleted")
+            return {"created": 0, "retired": 0, "deleted": deleted}
+        created = ensure_partitions(conn, today, ahead)
+        retired = prune_partitions(conn, cutoff, current_app.config.get("SESSION_PRUNE_DROP", True))
+
+    for name in created:
+        echo(f"sessions: created {name}")
+    for name in retired:
+        echo(f"sessions: retired {name}")
+    return {"created": len(created), "retired": len(retired), "deleted": 0}
+
+
+sessions_cli = AppGroup("sessions", help="Maintain the sessions table.")
+
+
+@sessions_cli.command("maintain")
+def maintain_command() -> None:
+    """Create upcoming session partitions and retire expired ones."""
+    maintain_sessions(echo=click.echo)
+
+
+def init_session_retention(app: Flask) -> None:
+    """Start the in-process maintenance loop when SESSION_MAINTENANCE_INTERVAL is set."""
+    interval = app.config.get("SESSION_MAINTENANCE_INTERVAL", 0)
+    # One-off commands must not start deleting rows on the side
+    if interval <= 0 or in_cli_command():
+        return
+
+    def loop() -> None:
+        # The first run is at startup, so a new month's partition exists
+        # before rows for it arrive
+        while True:
+            with app.app_context():
+                # One worker per interval does the maintenance
+                if cache.add("sessions:maintenance:running", True, timeout=interval):
+                    try:
+                        totals = maintain_sessions()
+                    except Exception:
+                        current_app.logger.exception("Session maintenance failed")
+                    else:
+                        current_app.logger.info("Session maintenance: %s", totals)
+            socketio.sleep(interval)
+
+    socketio.start_background_task(loop)
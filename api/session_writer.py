@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Write-behind buffer for Session rows created by the auth routes.
+
+Requests append rows to an in-process buffer; a background task writes
+them with one multi-row INSERT when SESSION_FLUSH_ROWS rows are waiting
+or SESSION_FLUSH_INTERVAL seconds have passed, and once more on shutdown.
+SESSION_WRITE_BEHIND=False restores a synchronous commit per session for
+deployments that cannot lose a row on a crash.
+"""
+
+import atexit
+import threading
+import time
+from collections import deque
+from typing import Any
+
+from flask import Flask, current_app
+
+from api.extensions import db, socketio
+from api.models.session import Session
+
+DEFAULT_FLUSH_ROWS = 500
+DEFAULT_FLUSH_INTERVAL = 0.5
+DEFAULT_MAX_PENDING = 50_000
+# How often the background task checks the buffer. It polls with
+# socketio.sleep rather than waiting on a threading primitive, which would
+# block the whole hub under eventlet.
+POLL_INTERVAL = 0.05
+
+
+class SessionWriter:
+    """Batches Session rows and inserts them from a background task."""
+
+    def __init__(self, app: Flask, flush_rows: int = DEFAULT_FLUSH_ROWS,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+                 max_pending: int = DEFAULT_MAX_PENDING):
+        self.app = app
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: deque[dict[str, Any]] = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._running = False
+        self.written = 0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def put(self, row: dict[str, Any]) -> None:
+        with self._lock:
+            if len(self._pending) >= self.max_pending:
+                # Database is down or far behind: shed the oldest row, not memory
+                self._pending.popleft()
+                self.dropped += 1
+            self._pending.append(row)
+
+    def flush(self) -> int:
+        """Insert everything buffered so far; rows go back on failure."""
+        with self._flush_lock:
+            with self._lock:
+                rows = list(self._pending)
+                self._pending.clear()
+            if not rows:
+                return 0
+            with self.app.app_context():
+                try:
+                    db.session.execute(db.insert(Session), rows)
+                    db.session.commit()
+                except Exception:
+                    db.session.rollback()
+                    current_app.logger.exception("Session flush of %d rows failed", len(rows))
+                    with self._lock:
+                        self._pending.extendleft(reversed(rows))
+                    return 0
+                finally:
+                    db.session.remove()
+            self.written += len(rows)
+            return len(rows)
+
+    def _run(self) -> None:
+        last_flush = time.monotonic()
+        while self._running:
+            socketio.sleep(min(POLL_INTERVAL, self.flush_interval))
+            if (len(self._pending) >= self.flush_rows
+                    or time.monotonic() - last_flush >= self.flush_interval):
+                self.flush()
+                last_flush = time.monotonic()
+
+    def start(self) -> None:
+        self._running = True
+        socketio.start_background_task(self._run)
+
+    def close(self) -> None:
+        """Stop the background task and write whatever is still buffered."""
+        self._running = False
+        self.flush()
+
+    def stats(self) -> dict[str, int]:
+        return {"pending": len(self), "written": self.written, "dropped": self.dropped}
+
+
+_writer: SessionWriter | None = None
+
+
+def init_session_writer(app: Flask) -> None:
+    global _writer
+
+    if _writer is not None:
+        _writer.close()
+        atexit.unregister(_writer.close)
+        _writer = None
+    if not app.config.get("SESSION_WRITE_BEHIND", True):
+        return
+
+    _writer = SessionWriter(
+        app,
+        flush_rows=app.config.get("SESSION_FLUSH_ROWS", DEFAULT_FLUSH_ROWS),
+        flush_interval=app.config.get("SESSION_FLUSH_INTERVAL", DEFAULT_FLUSH_INTERVAL),
+        max_pending=app.config.get("SESSION_MAX_PENDING", DEFAULT_MAX_PENDING),
+    )
+    _writer.start()
+    atexit.register(_writer.close)
+
+
+def record_session(**fields: Any) -> None:
+    """Persist a Session row: buffered, or committed now in durable mode."""
+    if _writer is None:
+        db.session.add(Session(**fields))
+        db.session.commit()
+    else:
+        _writer.put(fields)
+
+
+def flush_sessions() -> int:
+    return 0 if _writer is None else _writer.flush()
+
+
+def session_writer_stats() -> dict[str, int] | None:
+    return None if _writer is None else _writer.stats()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Single-flight call coalescing.
+Concurrent callers asking for the same key share one underlying call.
+Uses threading primitives, which eventlet's monkey patching turns into
+green equivalents, so it works for both threads and greenlets.
+"""
+
+import threading
+from typing import Any, Callable, Hashable
+
+
+class _Call:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call] = {}
+        self.executed = 0
+        self.collapsed = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Run fn once for all concurrent callers of key.
+        Followers block until the leader finishes and get its result,
+        or its exception re-raised.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.collapsed += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "executed": self.executed,
+            "collapsed": self.collapsed,
+            "in_flight": self.in_flight(),
+        }
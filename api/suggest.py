@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Title autocomplete for /movies/suggest and /tv/suggest.
+
+Titles are folded and stored in one byte buffer; every word start is an
+entry in a sorted offset array, so "dark kn" finds "The Dark Knight".
+A prefix maps to a contiguous range of entries by binary search, and a
+max segment tree over entry weights yields the top-k of that range in
+O(k log n) without scanning it.
+"""
+
+import heapq
+import re
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Any, Iterable
+
+from flask import Flask
+
+from api.search_index import fold, movie_index, tv_index
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 20
+# Matches in the middle of a title rank below matches at its start
+MID_TITLE_WEIGHT = 0.5
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def normalize(text: str) -> str:
+    """Folded words joined by single spaces ("Spider-Man" -> "spider man")."""
+    return " ".join(_WORD.findall(fold(text)))
+
+
+class _Snapshot:
+    """Immutable arrays behind a PrefixIndex; rebuilt wholesale, swapped atomically."""
+
+    def __init__(self, docs: list[dict[str, Any]], title_field: str, date_field: str,
+                 fallback_field: str | None = None):
+        keys = bytearray()
+        names = bytearray()
+        self.name_offsets = array("I", [0])
+        self.ids = array("I")
+        self.years = array("H")
+        self.popularity = array("f")
+
+        starts: list[int] = []
+        owners: list[int] = []
+        weights: list[float] = []
+        for doc in docs:
+            title = doc.get(title_field) or (fallback_field and doc.get(fallback_field)) or ""
+            key = normalize(title).encode()
+            if not key or not isinstance(doc.get("id"), int):
+                continue
+            slot = len(self.ids)
+            date = doc.get(date_field) or ""
+            popularity = float(doc.get("popularity") or 0.0)
+            self.ids.append(doc["id"])
+            self.years.append(int(date[:4]) if date[:4].isdigit() else 0)
+            self.popularity.append(popularity)
+            names += title.encode()
+            self.name_offsets.append(len(names))
+
+            base = len(keys)
+            keys += key + b"\0"
+            for match in re.finditer(rb"[^ ]+", key):
+                starts.append(base + match.start())
+                owners.append(slot)
+                weights.append(popularity if match.start() == 0 else popularity * MID_TITLE_WEIGHT)
+
+        self.keys = bytes(keys)
+        self.names = bytes(names)
+        order = sorted(range(len(starts)), key=lambda i: self._key_at(starts[i]))
+        self.starts = array("I", (starts[i] for i in order))
+        self.owners = array("I", (owners[i] for i in order))
+        self.weights = array("f", (weights[i] for i in order))
+
+        # Iterative max segment tree of entry positions: leaves at n..2n-1
+        n = len(self.starts)
+        self.tree = array("I", [0]) * n + array("I", range(n))
+        for node in range(n - 1, 0, -1):
+            left, right = self.tree[2 * node], self.tree[2 * node + 1]
+            self.tree[node] = left if self.weights[left] >= self.weights[right] else right
+
+    def _key_at(self, offset: int) -> bytes:
+        return self.keys[offset:self.keys.index(b"\0", offset)]
+
+    def prefix_range(self, prefix: bytes) -> tuple[int, int]:
+        # Comparing only len(prefix) bytes turns the prefix into a range;
+        # the \0 terminator sorts shorter keys first
+        size = len(prefix)
+        head = lambda i: self.keys[self.starts[i]:self.starts[i] + size]
+        entries = range(len(self.starts))
+        return bisect_left(entries, prefix, key=head), bisect_right(entries, prefix, key=head)
+
+    def argmax(self, lo: int, hi: int) -> int:
+        """Entry with the highest weight in [lo, hi)."""
+        n = len(self.starts)
+        best = -1
+        lo += n
+        hi += n
+        while lo < hi:
+            if lo & 1:
+                best = self._better(best, self.tree[lo])
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                best = self._better(best, self.tree[hi])
+            lo //= 2
+            hi //= 2
+        return best
+
+    def _better(self, a: int, b: int) -> int:
+        return b if a < 0 or self.weights[b] > self.weights[a] else a
+
+    def result(self, slot: int) -> dict[str, Any]:
+        start, end = self.name_offsets[slot], self.name_offsets[slot + 1]
+        return {
+            "id": self.ids[slot],
+            "title": self.names[start:end].decode(),
+            "year": self.years[slot] or None,
+            "popularity": round(self.popularity[slot], 3),
+        }
+
+    def memory_bytes(self) -> int:
+        arrays = (self.name_offsets, self.ids, self.years, self.popularity,
+                  self.starts, self.owners, self.weights, self.tree)
+        return len(self.keys) + len(self.names) + sum(a.itemsize * len(a) for a in arrays)
+
+
+class PrefixIndex:
+    """
+    Popularity-ranked prefix lookup over titles. `title_field` is shown
+    and matched, or `fallback_field` for documents without one yet (rows
+    of the ingested tables); `date_field` supplies the year. Built from a
+    batch of TMDB documents; `load` swaps in a new build without blocking
+    readers.
+    """
+
+    def __init__(self, title_field: str, date_field: str, fallback_field: str | None = None):
+        self.title_field = title_field
+        self.date_field = date_field
+        self.fallback_field = fallback_field
+        self._snapshot = _Snapshot([], title_field, date_field)
+        self._build_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._snapshot.ids)
+
+    def load(self, docs: Iterable[dict[str, Any]]) -> int:
+        with self._build_lock:
+            self._snapshot = _Snapshot(list(docs), self.title_field, self.date_field,
+                                       self.fallback_field)
+        return len(self)
+
+    def memory_bytes(self) -> int:
+        return self._snapshot.memory_bytes()
+
+    def suggest(self, prefix: str, limit: int = DEFAULT_LIMIT) -> list[dict[str, Any]]:
+        """Up to `limit` titles with a word starting with `prefix`, best first."""
+        snap = self._snapshot
+        key = normalize(prefix).encode()
+        if not key or limit < 1:
+            return []
+        lo, hi = snap.prefix_range(key)
+        if lo >= hi:
+            return []
+
+        # Best-first walk: pop the heaviest entry of a range, split around it
+        seen: set[int] = set()
+        results = []
+        best = snap.argmax(lo, hi)
+        heap = [(-snap.weights[best], best, lo, hi)]
+        while heap and len(results) < limit:
+            _, entry, lo, hi = heapq.heappop(heap)
+            slot = snap.owners[entry]
+            if slot not in seen:
+                seen.add(slot)
+                results.append(snap.result(slot))
+            for start, end in ((lo, entry), (entry + 1, hi)):
+                if start < end:
+                    child = snap.argmax(start, end)
+                    heapq.heappush(heap, (-snap.weights[child], child, start, end))
+        return results
+
+
+movie_suggest = PrefixIndex("title", "release_date", "original_title")
+tv_suggest = PrefixIndex("name", "first_air_date", "original_name")
+
+
+def init_suggest(app: Flask) -> None:
+    """Build the suggest indexes from the titles in the search indexes."""
+    for suggest, index in ((movie_suggest, movie_index), (tv_suggest, tv_index)):
+        if len(index):
+            count = suggest.load(index.documents())
+            app.logger.info("Suggest index: %d titles, %d bytes", count, suggest.memory_bytes())
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Incremental sync from TMDB's /movie/changes and /tv/changes.
+
+Walks the change list from the stored high-water mark to today, fetches
+the changed ids concurrently at background priority (so the rate limiter
+favours user traffic), upserts them into movies / tv_series, and drops
+the cached details responses along with the sub-resources fetched with
+them (projections follow their full entry). The mark only moves once a whole window
+is applied, so an interrupted run repeats it on restart.
+
+Run from cron with `flask sync changes`, or in-process every
+CHANGES_SYNC_INTERVAL seconds.
+"""
+
+from datetime import date, timedelta
+from typing import Any, Callable
+
+import click
+from flask import Flask, current_app
+from flask.cli import AppGroup
+
+from api.extensions import cache, db, socketio
+from api.ingest import EXPORTS, upsert_rows
+from api.models import SyncState
+from api.rate_limiter import BACKGROUND
+from api.routes.movies import movie_cache_keys
+from api.routes.tv import tv_cache_keys
+from api.search_index import MOVIE_RESULT_FIELDS, TV_RESULT_FIELDS, movie_index, search_result, tv_index
+from api.tmdb_client import tmdb_gather, tmdb_get
+
+# TMDB accepts at most 14 days between start_date and end_date
+MAX_WINDOW_DAYS = 14
+DEFAULT_LOOKBACK_DAYS = 1
+DETAILS_CHUNK = 100
+
+SOURCES = {
+    "movies": {"upstream": "/movie", "keys": movie_cache_keys,
+               "index": movie_index, "result_fields": MOVIE_RESULT_FIELDS},
+    "tv": {"upstream": "/tv", "keys": tv_cache_keys,
+           "index": tv_index, "result_fields": TV_RESULT_FIELDS},
+}
+
+
+class SyncError(Exception):
+    """TMDB failed mid-window; the high-water mark was left where it was."""
+
+
+def _state_name(kind: str) -> str:
+    return f"{SOURCES[kind]['upstream'].strip('/')}_changes"
+
+
+def high_water_mark(kind: str) -> date | None:
+    state = db.session.get(SyncState, _state_name(kind))
+    return None if state is None else state.high_water_mark
+
+
+def _set_high_water_mark(kind: str, mark: date) -> None:
+    state = db.session.get(SyncState, _state_name(kind))
+    if state is None:
+        db.session.add(SyncState(name=_state_name(kind), high_water_mark=mark))
+    else:
+        state.high_water_mark = mark
+    db.session.commit()
+
+
+def changed_ids(kind: str, start: date, end: date) -> list[int]:
+    """Every id on every page of the change list for [start, end]."""
+    path = f"{SOURCES[kind]['upstream']}/changes"
+    params = {"start_date": start.isoformat(), "end_date": end.isoformat()}
+
+    first, status = tmdb_get(path, {**params, "page": 1}, priority=BACKGROUND)
+    if status != 200:
+        raise SyncError(f"{path} page 1: HTTP {status}")
+    pages = [first]
+    rest = [(path, {**params, "page": page}) for page in range(2, first.get("total_pages", 1) + 1)]
+    for (_, call_params), (data, status) in zip(rest, tmdb_gather(rest, priority=BACKGROUND)):
+        if status != 200:
+            raise SyncError(f"{path} page {call_params['page']}: HTTP {status}")
+        pages.append(data)
+
+    ids = (item.get("id") for data in pages for item in data.get("results", []))
+    return list(dict.fromkeys(i for i in ids if isinstance(i, int)))
+
+
+def apply_changes(kind: str, ids: list[int]) -> dict[str, int]:
+    """Fetch `ids`, upsert the found ones, delete the gone ones, drop their cache entries."""
+    source = SOURCES[kind]
+    table, columns = EXPORTS[kind]
+    counts = {"updated": 0, "deleted": 0}
+
+    for offset in range(0, len(ids), DETAILS_CHUNK):
+        chunk = ids[offset:offset + DETAILS_CHUNK]
+        calls = [(f"{source['upstream']}/{item_id}", None) for item_id in chunk]
+        results = tmdb_gather(calls, priority=BACKGROUND)
+
+        found: list[dict[str, Any]] = []
+        gone: list[int] = []
+        for item_id, (data, status) in zip(chunk, results):
+            if status == 200:
+                # A title-less record cannot be stored; leave the old row
+                if data.get(columns[1]):
+                    found.append(data)
+            elif status == 404:
+                gone.append(item_id)
+            else:
+                raise SyncError(f"{source['upstream']}/{item_id}: HTTP {status}")
+
+        with db.engine.begin() as conn:
+            if found:
+                upsert_rows(conn, table, columns, found)
+            if gone:
+                conn.execute(table.delete().where(table.c.id.in_(gone)))
+
+        for data in found:
+            if data["id"] in source["index"]:
+                source["index"].add(search_result(data, source["result_fields"]))
+        cache.delete_many(*(key for item_id in chunk for key in source["keys"](item_id).values()))
+        counts["updated"] += len(found)
+        counts["deleted"] += len(gone)
+    return counts
+
+
+def sync_changes(
+    kind: str,
+    today: date | None = None,
+    echo: Callable[[str], None] = lambda message: None,
+) -> dict[str, int]:
+    """
+    Apply changes from the high-water mark (or DEFAULT_LOOKBACK_DAYS ago
+    on the first run) up to today, one window of at most 14 days at a time.
+    """
+    for table in (EXPORTS[kind][0], SyncState.__table__):
+        table.create(db.engine, checkfirst=True)
+
+    today = today or date.today()
+    start = high_water_mark(kind) or today - timedelta(days=DEFAULT_LOOKBACK_DAYS)
+    totals = {"changed": 0, "updated": 0, "deleted": 0}
+    while True:
+        end = min(start + timedelta(days=MAX_WINDOW_DAYS - 1), today)
+        ids = changed_ids(kind, start, end)
+        counts = apply_changes(kind, ids)
+        # Today stays open: the next run starts from it again
+        _set_high_water_mark(kind, end)
+
+        totals["changed"] += len(ids)
+        for name, count in counts.items():
+            totals[name] += count
+        echo(f"{kind} {start}..{end}: {len(ids)} changed, "
+             f"{counts['updated']} updated, {counts['deleted']} deleted")
+        if end >= today:
+            return totals
+        start = end + timedelta(days=1)
+
+
+sync_cli = AppGroup("sync", help="Keep local TMDB metadata up to date.")
+
+
+@sync_cli.command("changes")
+@click.argument("kinds", nargs=-1, type=click.Choice(list(SOURCES)))
+def sync_changes_command(kinds: tuple[str, ...]) -> None:
+    """Apply TMDB /changes since the last run (movies and tv by default)."""
+    for kind in kinds or SOURCES:
+        try:
+            sync_changes(kind, echo=click.echo)
+        except SyncError as exc:
+            raise click.ClickException(str(exc)) from exc
+
+
+def init_sync(app: Flask) -> None:
+    """Start the in-process sync loop when CHANGES_SYNC_INTERVAL is set."""
+    interval = app.config.get("CHANGES_SYNC_INTERVAL", 0)
+    if interval <= 0:
+        return
+
+    def loop() -> None:
+        while True:
+            socketio.sleep(interval)
+            with app.app_context():
+                # One worker per interval does the sync
+                if not cache.add("sync:changes:running", True, timeout=interval):
+                    continue
+                for kind in SOURCES:
+                    try:
+                        totals = sync_changes(kind)
+                    except Exception:
+                        current_app.logger.exception("Change sync failed for %s", kind)
+                    else:
+                        current_app.logger.info("Change sync %s: %s", kind, totals)
+
+    socketio.start_background_task(loop)
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Two-tier Flask-Caching backend.
+L1 is a per-process LRU bounded by the pickled size of its values.
+L2 is any Flask-Caching backend shared by every worker (Redis, or a
+cache directory on a single host). Reads fall through L1 -> L2 and L2
+hits are promoted into L1; writes go to both tiers, so entries evicted
+from L1 are still served from L2. An L2 failure is logged and treated as
+a miss (or a failed write), so an unreachable shared tier degrades to
+L1 only instead of failing requests.
+"""
+
+import logging
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+from flask_caching.backends.base import BaseCache
+from werkzeug.utils import import_string
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_L1_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_L1_MAX_TTL = 60
+
+
+class ByteLRUCache(BaseCache):
+    """In-process LRU cache that evicts by total value size in bytes."""
+
+    def __init__(self, max_bytes: int = DEFAULT_L1_MAX_BYTES, default_timeout: int = 300) -> None:
+        super().__init__(default_timeout=default_timeout)
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+
+    def _expires(self, timeout: int | None) -> float:
+        timeout = self._normalize_timeout(timeout)
+        return time.time() + timeout if timeout > 0 else 0
+
+    def _drop(self, key: str) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self.size -= len(entry[1])
+        return True
+
+    def _put(self, key: str, value: Any, timeout: int | None) -> bool:
+        data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        if len(data) > self.max_bytes:
+            return False
+        self._drop(key)
+        self._entries[key] = (self._expires(timeout), data)
+        self.size += len(data)
+        while self.size > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self.evictions += 1
+        return True
+
+    def _live(self, key: str) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, data = entry
+        if expires and expires <= time.time():
+            self._drop(key)
+            return None
+        self._entries.move_to_end(key)
+        return data
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            data = self._live(key)
+        return None if data is None else pickle.loads(data)
+
+    def set(self, key: str, value: Any, timeout: int | None = None) -> bool:
+        with self._lock:
+            return self._put(key, value, timeout)
+
+    def add(self, key: str, value: Any, timeout: int | None = None) -> bool:
+        with self._lock:
+            if self._live(key) is not None:
+                return False
+            return self._put(key, value, timeout)
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            return self._drop(key)
+
+    def has(self, key: str) -> bool:
+        with self._lock:
+            return self._live(key) is not None
+
+    def clear(self) -> bool:
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+        return True
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class TieredCache(BaseCache):
+    """
+    L1 ByteLRUCache in front of an optional shared L2 backend.
+
+    L1 copies live at most l1_max_ttl seconds, which bounds how long a
+    worker can keep serving a key another worker deleted from L2.
+    add() goes to L2 when present so it stays atomic across workers.
+    """
+
+    def __init__(
+        self,
+        l1: ByteLRUCache,
+        l2: BaseCache | None = None,
+        l1_max_ttl: int = DEFAULT_L1_MAX_TTL,
+        default_timeout: int = 300,
+    ) -> None:
+        super().__init__(default_timeout=default_timeout)
+        self.l1 = l1
+        self.l2 = l2
+        self.l1_max_ttl = l1_max_ttl
+        self.hits = {"l1": 0, "l2": 0}
+        self.misses = 0
+        self.promotions = 0
+        self.l2_errors = 0
+
+    @classmethod
+    def factory(cls, app, config, args, kwargs):
+        """
+        Build from Flask-Caching config. CACHE_L2_TYPE names a stock
+        backend ("RedisCache", "FileSystemCache", ...) configured by the
+        usual keys (CACHE_REDIS_URL, CACHE_DIR); unset means L1 only.
+        """
+        timeout = config["CACHE_DEFAULT_TIMEOUT"]
+        l1 = ByteLRUCache(
+            max_bytes=config.get("CACHE_L1_MAX_BYTES", DEFAULT_L1_MAX_BYTES),
+            default_timeout=timeout,
+        )
+        l2 = None
+        l2_type = config.get("CACHE_L2_TYPE")
+        if l2_type:
+            if "." not in l2_type:
+                l2_type = f"flask_caching.backends.{l2_type}"
+            l2 = import_string(l2_type).factory(app, config, [], {"default_timeout": timeout})
+        return cls(
+            l1,
+            l2,
+            l1_max_ttl=config.get("CACHE_L1_MAX_TTL", DEFAULT_L1_MAX_TTL),
+            default_timeout=timeout,
+        )
+
+    def _l1_timeout(self, timeout: int | None) -> int:
+        timeout = self._normalize_timeout(timeout)
+        if self.l2 is None:
+            return timeout
+        if timeout <= 0:
+            return self.l1_max_ttl
+        return min(timeout, self.l1_max_ttl)
+
+    def _l2_failed(self, operation: str, key: str, exc: Exception) -> None:
+        self.l2_errors += 1
+        logger.warning("Cache L2 %s failed for %s: %s", operation, key, exc)
+
+    def get(self, key: str) -> Any:
+        value = self.l1.get(key)
+        if value is not None:
+            self.hits["l1"] += 1
+            return value
+        if self.l2 is not None:
+            try:
+                value = self.l2.get(key)
+            except Exception as exc:
+                self._l2_failed("get", key, exc)
+                value = None
+            if value is not None:
+                self.hits["l2"] += 1
+                self.promotions += 1
+                self.l1.set(key, value, timeout=self._l1_timeout(None))
+                return value
+        self.misses += 1
+        return None
+
+    def set(self, key: str, value: Any, timeout: int | None = None) -> bool:
+        stored = self.l1.set(key, value, timeout=self._l1_timeout(timeout))
+        if self.l2 is not None:
+            try:
+                return bool(self.l2.set(key, value, timeout=timeout))
+            except Exception as exc:
+                self._l2_failed("set", key, exc)
+                return False
+        return stored
+
+    def add(self, key: str, value: Any, timeout: int | None = None) -> bool:
+        if self.l2 is None:
+            return self.l1.add(key, value, timeout=timeout)
+        # No lock is granted while the tier that makes it atomic is down
+        try:
+            added = self.l2.add(key, value, timeout=timeout)
+        except Exception as exc:
+            self._l2_failed("add", key, exc)
+            return False
+        if not added:
+            return False
+        self.l1.set(key, value, timeout=self._l1_timeout(timeout))
+        return True
+
+    def delete(self, key: str) -> bool:
+        deleted = self.l1.delete(key)
+        if self.l2 is not None:
+            try:
+                deleted = bool(self.l2.delete(key)) or deleted
+            except Exception as exc:
+                self._l2_failed("delete", key, exc)
+                return False
+        return deleted
+
+    def delete_many(self, *keys: str) -> list[str]:
+        # BaseCache.delete_many stops at the first key that is not cached
+        return [key for key in keys if self.delete(key)]
+
+    def has(self, key: str) -> bool:
+        if self.l1.has(key):
+            return True
+        if self.l2 is None:
+            return False
+        try:
+            return bool(self.l2.has(key))
+        except Exception as exc:
+            self._l2_failed("has", key, exc)
+            return False
+
+    def clear(self) -> bool:
+        self.l1.clear()
+        if self.l2 is not None:
+            try:
+                return bool(self.l2.clear())
+            except Exception as exc:
+                self._l2_failed("clear", "*", exc)
+                return False
+        return True
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "l1": {
+                "hits": self.hits["l1"],
+                "entries": len(self.l1),
+                "bytes": self.l1.size,
+                "max_bytes": self.l1.max_bytes,
+                "evictions": self.l1.evictions,
+            },
+            "l2": {
+                "backend": type(self.l2).__name__ if self.l2 is not None else None,
+                "hits": self.hits["l2"],
+                "promotions": self.promotions,
+                "errors": self.l2_errors,
+            },
+            "misses": self.misses,
+        }
@@ -4,13 +4,111 @@ Utility functions for interacting with the TMDB API.
 Ensures clean responses and avoids storing unnecessary upstream data.
 """
 
+import asyncio
+import random
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
 from typing import Any
+from urllib.parse import urlencode
 import requests
-from flask import current_app
+from requests.adapters import HTTPAdapter
+from flask import Flask, Response, current_app, g
+
+from api.extensions import cache, socketio
+from api import json_provider
+from api.singleflight import SingleFlight
+from api.circuit_breaker import BreakerRegistry
+from api.rate_limiter import (
+    INTERACTIVE,
+    FileTokenBucket,
+    TokenBucket,
+    parse_retry_after,
+)
 
 TMDB_BASE_URL = "https://api.themoviedb.org/3"
 
+DEFAULT_POOL_SIZE = 20
+DEFAULT_POOL_HOSTS = 4
+DEFAULT_RATE_LIMIT = 40.0
+DEFAULT_RETRY_AFTER = 1.0
+GATHER_POLL_INTERVAL = 0.005
+
+RATE_LIMITED = {"error": "TMDB rate limit reached, try again shortly"}, 503
+CIRCUIT_OPEN = {"error": "TMDB is unavailable, try again shortly"}, 503
+
+# Upstream statuses worth retrying for idempotent GETs
+RETRYABLE_STATUS = {500, 502, 503, 504}
+
+# GETs that mint a token or session per call: each caller needs its own
+# response, so these are never shared between callers
+PRIVATE_PREFIXES = ("/authentication/",)
+
 _session = requests.Session()
+_executor = ThreadPoolExecutor(max_workers=DEFAULT_POOL_SIZE, thread_name_prefix="tmdb")
+_flight = SingleFlight()
+_limiter = TokenBucket(DEFAULT_RATE_LIMIT, int(DEFAULT_RATE_LIMIT), sleep=socketio.sleep)
+_breakers = BreakerRegistry()
+_retry = {
+    "retries": 2,
+    "backoff": 0.2,
+    "backoff_max": 2.0,
+    "budget": 10.0,
+    "stale_ttl": 86400,
+}
+
+
+def init_tmdb_client(app: Flask) -> None:
+    """
+    Size the shared connection pool from app config.
+
+    TMDB_POOL_SIZE caps open connections per upstream host, TMDB_POOL_HOSTS
+    is how many host pools are kept, and TMDB_KEEPALIVE=False closes each
+    connection after use. Requests beyond the pool size wait for a free
+    connection instead of opening new ones.
+    """
+    global _executor, _limiter, _breakers
+
+    pool_size = app.config.get("TMDB_POOL_SIZE", DEFAULT_POOL_SIZE)
+    adapter = HTTPAdapter(
+        pool_connections=app.config.get("TMDB_POOL_HOSTS", DEFAULT_POOL_HOSTS),
+        pool_maxsize=pool_size,
+        pool_block=True,
+    )
+    _session.mount("https://", adapter)
+    _session.mount("http://", adapter)
+    if not app.config.get("TMDB_KEEPALIVE", True):
+        _session.headers["Connection"] = "close"
+
+    _executor.shutdown(wait=False)
+    _executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="tmdb")
+
+    # TMDB_RATE_LIMIT_FILE shares one token budget across worker processes
+    rate = app.config.get("TMDB_RATE_LIMIT", DEFAULT_RATE_LIMIT)
+    limiter_options = {
+        "max_wait": app.config.get("TMDB_RATE_MAX_WAIT", 5.0),
+        "max_queue": app.config.get("TMDB_RATE_MAX_QUEUE", 100),
+        "sleep": socketio.sleep,
+    }
+    burst = app.config.get("TMDB_RATE_BURST", int(rate))
+    shared_file = app.config.get("TMDB_RATE_LIMIT_FILE")
+    if shared_file:
+        _limiter = FileTokenBucket(shared_file, rate, burst, **limiter_options)
+    else:
+        _limiter = TokenBucket(rate, burst, **limiter_options)
+
+    # Retries apply to GETs only; the budget bounds a call's total time
+    _retry.update({
+        "retries": app.config.get("TMDB_RETRIES", 2),
+        "backoff": app.config.get("TMDB_RETRY_BACKOFF", 0.2),
+        "backoff_max": app.config.get("TMDB_RETRY_BACKOFF_MAX", 2.0),
+        "budget": app.config.get("TMDB_RETRY_BUDGET", 10.0),
+        "stale_ttl": app.config.get("TMDB_STALE_TTL", 86400),
+    })
+    _breakers = BreakerRegistry(
+        failure_threshold=app.config.get("TMDB_BREAKER_THRESHOLD", 5),
+        reset_timeout=app.config.get("TMDB_BREAKER_RESET", 30.0),
+    )
 
 
 def _headers() -> dict[str, str] | None:
@@ -24,38 +122,305 @@ def _headers() -> dict[str, str] | None:
     }
 
 
-def _timeout() -> int:
+def _timeout() -> float:
     return current_app.config.get("TMDB_REQUEST_TIMEOUT", 15)
 
 
+def _max_concurrency() -> int:
+    return current_app.config.get(
+        "TMDB_MAX_CONCURRENCY",
+        current_app.config.get("TMDB_POOL_SIZE", DEFAULT_POOL_SIZE),
+    )
+
+
 def _handle_error(resp: requests.Response) -> tuple[dict, int]:
     try:
-        payload = resp.json()
+        payload = json_provider.loads(resp.content)
         message = payload.get("status_message", "TMDB error")
     except ValueError:
         message = "Upstream TMDB error"
     return {"error": message}, resp.status_code
 
 
+def _params_key(params: dict[str, Any] | None) -> tuple[tuple[str, str], ...]:
+    return tuple(sorted((k, str(v)) for k, v in (params or {}).items() if v is not None))
+
+
+def _upstream(
+    method: str,
+    path: str,
+    priority: int = INTERACTIVE,
+    retry_429: bool = False,
+    **kwargs: Any,
+) -> requests.Response | None:
+    """
+    Send one request under the rate limiter. Returns None if it was shed.
+    A 429 pauses the limiter for Retry-After; idempotent calls then queue
+    for one more attempt instead of passing the 429 to our client.
+    """
+    attempts = 2 if retry_429 else 1
+    for _ in range(attempts):
+        if not _limiter.acquire(priority):
+            return None
+        resp = _session.request(method, f"{TMDB_BASE_URL}{path}", **kwargs)
+        if resp.status_code != 429:
+            return resp
+        _limiter.pause(
+            parse_retry_after(resp.headers.get("Retry-After")) or DEFAULT_RETRY_AFTER
+        )
+    return resp
+
+
+def _stale_key(path: str, params: dict[str, Any] | None) -> str:
+    return f"stale/GET{path}?{urlencode(_params_key(params))}"
+
+
+def _backoff(attempt: int) -> float:
+    # Full jitter: spread retries from many workers across the window
+    return random.uniform(0, min(_retry["backoff_max"], _retry["backoff"] * 2 ** attempt))
+
+
+def _from_stale(stale: dict[str, Any], raw: bool) -> tuple[dict | bytes, int]:
+    # Stale copies are kept as raw bytes so both modes can share them
+    body = stale["body"]
+    return (body if raw else json_provider.loads(body)), stale["status"]
+
+
+def _validators(stale: dict[str, Any] | None) -> dict[str, str]:
+    """Conditional request headers that let TMDB answer 304 for a copy we hold."""
+    if stale is None:
+        return {}
+    validators = {}
+    if stale.get("etag"):
+        validators["If-None-Match"] = stale["etag"]
+    if stale.get("last_modified"):
+        validators["If-Modified-Since"] = stale["last_modified"]
+    return validators
+
+
+def _fetch_get(
+    path: str,
+    params: dict[str, Any] | None,
+    headers: dict[str, str],
+    timeout: float,
+    priority: int = INTERACTIVE,
+    raw: bool = False,
+) -> tuple[dict | bytes, int]:
+    """
+    GET with retries and a per-path-family circuit breaker.
+
+    Timeouts, connection errors and 5xx responses are retried with
+    jittered exponential backoff while the retry budget lasts. When the
+    call still fails, or the family's circuit is open, the last good
+    response for the same request is served if we have one.
+    That copy's ETag/Last-Modified are also sent upstream, so an
+    unchanged resource comes back as a bodyless 304. Private paths
+    (tokens, sessions) never get a stale copy.
+    With raw=True a successful body is returned as the upstream bytes.
+    """
+    breaker = _breakers.for_path(path)
+    cacheable = not _is_private(path)
+    stale_key = _stale_key(path, params)
+    stale = cache.get(stale_key) if cacheable else None
+    if not breaker.allow():
+        return _from_stale(stale, raw) if stale is not None else CIRCUIT_OPEN
+    headers = {**headers, **_validators(stale)}
+
+    deadline = time.monotonic() + _retry["budget"]
+    attempt = 0
+    try:
+        while True:
+            error: requests.RequestException | None = None
+            try:
+                resp = _upstream(
+                    "GET",
+                    path,
+                    priority,
+                    retry_429=True,
+                    headers=headers,
+                    params=params,
+                    timeout=max(0.1, min(timeout, deadline - time.monotonic())),
+                )
+            except requests.RequestException as exc:
+                resp, error = None, exc
+
+            failed = error is not None or (
+                resp is not None and resp.status_code in RETRYABLE_STATUS
+            )
+            if not failed:
+                break
+            # Bad URLs, redirect loops and the like fail the same way again
+            if error is not None and not isinstance(error, (requests.Timeout, requests.ConnectionError)):
+                break
+            delay = _backoff(attempt)
+            attempt += 1
+            if attempt > _retry["retries"] or time.monotonic() + delay >= deadline:
+                break
+            # Cooperative under eventlet; plain time.sleep in threading mode
+            socketio.sleep(delay)
+    except BaseException:
+        # Never leave a half-open trial marked as running
+        breaker.release()
+        raise
+
+    if failed:
+        breaker.record_failure()
+        if stale is not None:
+            return _from_stale(stale, raw)
+        if error is not None:
+            status = 504 if isinstance(error, requests.Timeout) else 502
+            return {"error": "Upstream TMDB unavailable"}, status
+        return _handle_error(resp)
+
+    if resp is None:
+        breaker.release()
+        return RATE_LIMITED
+    breaker.record_success()
+    if resp.status_code == 304 and stale is not None:
+        cache.set(stale_key, stale, timeout=_retry["stale_ttl"])
+        return _from_stale(stale, raw)
+    if resp.status_code >= 400:
+        return _handle_error(resp)
+
+    stale = {
+        "body": resp.content,
+        "status": resp.status_code,
+        "etag": resp.headers.get("ETag"),
+        "last_modified": resp.headers.get("Last-Modified"),
+    }
+    if cacheable:
+        cache.set(stale_key, stale, timeout=_retry["stale_ttl"])
+    return _from_stale(stale, raw)
+
+
+def _is_private(path: str) -> bool:
+    return path.startswith(PRIVATE_PREFIXES)
+
+
+def _send_get(
+    path: str,
+    params: dict[str, Any] | None,
+    headers: dict[str, str],
+    timeout: float,
+    priority: int = INTERACTIVE,
+    raw: bool = False,
+    coalesce: bool = True,
+) -> tuple[dict | bytes, int]:
+    # No app context here: this also runs on executor threads.
+    # Identical in-flight GETs share one upstream call and its result,
+    # so callers must not mutate the returned payload.
+    if not coalesce or _is_private(path):
+        return _fetch_get(path, params, headers, timeout, priority, raw)
+    key = ("GET", path, _params_key(params), raw)
+    return _flight.do(
+        key, lambda: _fetch_get(path, params, headers, timeout, priority, raw)
+    )
+
+
+def coalesce_stats() -> dict[str, int]:
+    """Upstream GETs executed vs. collapsed into an identical in-flight call."""
+    return _flight.stats()
+
+
+def rate_limit_stats() -> dict[str, float]:
+    """Token bucket settings, current queue depth and granted/shed counts."""
+    return _limiter.stats()
+
+
+def breaker_states() -> dict[str, str]:
+    """Circuit state per upstream path family."""
+    return _breakers.states()
+
+
+def _priority(priority: int | None) -> int:
+    # Background work (e.g. cache refresh) marks its context via g.tmdb_priority
+    if priority is not None:
+        return priority
+    return g.get("tmdb_priority", INTERACTIVE)
+
+
 def tmdb_get(
     path: str,
-    params: dict[str, Any] | None = None
+    params: dict[str, Any] | None = None,
+    priority: int | None = None,
+    coalesce: bool = True,
 ) -> tuple[dict, int]:
+    """
+    GET a TMDB endpoint. coalesce=False gives the caller its own upstream
+    call; /authentication/ paths always get one.
+    """
     headers = _headers()
     if headers is None:
         return {"error": "Server misconfiguration"}, 500
 
-    resp = _session.get(
-        f"{TMDB_BASE_URL}{path}",
-        headers=headers,
-        params=params,
-        timeout=_timeout(),
-    )
+    return _send_get(path, params, headers, _timeout(), _priority(priority), coalesce=coalesce)
 
-    if resp.status_code >= 400:
-        return _handle_error(resp)
 
-    return resp.json(), resp.status_code
+def tmdb_get_raw(
+    path: str,
+    params: dict[str, Any] | None = None,
+    priority: int | None = None,
+) -> tuple[bytes, int]:
+    """
+    tmdb_get without the parse step: returns the upstream JSON body as
+    bytes. Error payloads are encoded the same way tmdb_get shapes them.
+    """
+    headers = _headers()
+    if headers is None:
+        body: dict | bytes = {"error": "Server misconfiguration"}
+        status = 500
+    else:
+        body, status = _send_get(
+            path, params, headers, _timeout(), _priority(priority), raw=True
+        )
+    if isinstance(body, dict):
+        body = json_provider.dumps_bytes(body)
+    return body, status
+
+
+def tmdb_passthrough(
+    path: str,
+    params: dict[str, Any] | None = None,
+) -> Response:
+    """
+    Proxy a GET straight to the client: the upstream bytes become the
+    response body with no decode/encode round trip.
+    """
+    body, status = tmdb_get_raw(path, params)
+    return current_app.response_class(body, status=status, mimetype="application/json")
+
+
+# Sub-resources whose standalone endpoint also carries the parent id,
+# which TMDB leaves out when they are appended
+_APPENDED_WITH_ID = {"keywords", "reviews", "credits", "videos", "images"}
+
+
+def tmdb_get_appended(
+    path: str,
+    append: list[str],
+    priority: int | None = None,
+) -> tuple[dict[str, bytes], int]:
+    """
+    Fetch `path` and its sub-resources in one call with TMDB's
+    append_to_response, split back into the bodies the standalone
+    endpoints would return. "" maps to the base document; on errors it
+    holds the error payload and no other parts are returned.
+    """
+    body, status = tmdb_get_raw(path, {"append_to_response": ",".join(append)}, priority)
+    if status != 200:
+        return {"": body}, status
+
+    doc = json_provider.loads(body)
+    parts: dict[str, bytes] = {}
+    for name in append:
+        part = doc.pop(name, None)
+        if not isinstance(part, dict):
+            continue
+        if name in _APPENDED_WITH_ID and "id" in doc:
+            part = {"id": doc["id"], **part}
+        parts[name] = json_provider.dumps_bytes(part)
+    parts[""] = json_provider.dumps_bytes(doc)
+    return parts, status
 
 
 def tmdb_post(
@@ -67,18 +432,21 @@ def tmdb_post(
     if headers is None:
         return {"error": "Server misconfiguration"}, 500
 
-    resp = _session.post(
-        f"{TMDB_BASE_URL}{path}",
+    resp = _upstream(
+        "POST",
+        path,
         headers=headers,
         json=json_body,
         params=params,
         timeout=_timeout(),
     )
 
+    if resp is None:
+        return RATE_LIMITED
     if resp.status_code >= 400:
         return _handle_error(resp)
 
-    return resp.json(), resp.status_code
+    return json_provider.loads(resp.content), resp.status_code
 
 
 def tmdb_delete(
@@ -89,17 +457,133 @@ def tmdb_delete(
     if headers is None:
         return {"error": "Server misconfiguration"}, 500
 
-    resp = _session.delete(
-        f"{TMDB_BASE_URL}{path}",
+    resp = _upstream(
+        "DELETE",
+        path,
         headers=headers,
         json=json_body,
         timeout=_timeout(),
     )
 
+    if resp is None:
+        return RATE_LIMITED
     if resp.status_code >= 400:
         return _handle_error(resp)
 
     try:
-        return resp.json(), resp.status_code
+        return json_provider.loads(resp.content), resp.status_code
     except ValueError:
         return {"success": True}, resp.status_code
+
+
+async def tmdb_get_async(
+    path: str,
+    params: dict[str, Any] | None = None,
+    limit: asyncio.Semaphore | None = None,
+    priority: int | None = None,
+    raw: bool = False,
+) -> tuple[dict | bytes, int]:
+    """
+    Awaitable tmdb_get. The blocking call runs on the client's executor
+    so the event loop stays free while the request is in flight.
+    Connection errors come back as a 502 instead of raising.
+    With raw=True bodies come back as bytes, like tmdb_get_raw.
+    """
+    result = await _get_async(path, params, limit, priority, raw)
+    if raw and isinstance(result[0], dict):
+        return json_provider.dumps_bytes(result[0]), result[1]
+    return result
+
+
+async def _get_async(
+    path: str,
+    params: dict[str, Any] | None,
+    limit: asyncio.Semaphore | None,
+    priority: int | None,
+    raw: bool,
+) -> tuple[dict | bytes, int]:
+    headers = _headers()
+    if headers is None:
+        return {"error": "Server misconfiguration"}, 500
+    timeout = _timeout()
+    priority = _priority(priority)
+
+    loop = asyncio.get_running_loop()
+    try:
+        if limit is None:
+            return await loop.run_in_executor(
+                _executor, _send_get, path, params, headers, timeout, priority, raw
+            )
+        async with limit:
+            return await loop.run_in_executor(
+                _executor, _send_get, path, params, headers, timeout, priority, raw
+            )
+    except requests.RequestException as exc:
+        current_app.logger.warning("TMDB request to %s failed: %s", path, exc)
+        return {"error": "Upstream TMDB unavailable"}, 502
+
+
+async def tmdb_gather_async(
+    calls: list[tuple[str, dict[str, Any] | None]],
+    priority: int | None = None,
+    raw: bool = False,
+) -> list[tuple[dict | bytes, int]]:
+    """tmdb_gather for coroutines already running inside an event loop."""
+    limit = asyncio.Semaphore(_max_concurrency())
+    return list(await asyncio.gather(
+        *(tmdb_get_async(path, params, limit, priority, raw) for path, params in calls)
+    ))
+
+
+def _gathered(path: str, future: Future, raw: bool) -> tuple[dict | bytes, int]:
+    try:
+        body, status = future.result()
+    except requests.RequestException as exc:
+        current_app.logger.warning("TMDB request to %s failed: %s", path, exc)
+        body, status = {"error": "Upstream TMDB unavailable"}, 502
+    if raw and isinstance(body, dict):
+        body = json_provider.dumps_bytes(body)
+    return body, status
+
+
+def tmdb_gather(
+    calls: list[tuple[str, dict[str, Any] | None]],
+    priority: int | None = None,
+    raw: bool = False,
+) -> list[tuple[dict | bytes, int]]:
+    """
+    Issue several GETs at once and return their results in call order.
+
+    At most TMDB_MAX_CONCURRENCY requests are in flight for one gather;
+    the pool size still bounds the total across the process. Requests run
+    on the client's executor while the caller polls with socketio.sleep,
+    so any number of greenlets or threads can gather at once.
+    Usage: tmdb_gather([("/movie/550", None), ("/tv/1399", None)])
+    """
+    if not calls:
+        return []
+    headers = _headers()
+    if headers is None:
+        error = ({"error": "Server misconfiguration"}, 500)
+        return [(json_provider.dumps_bytes(error[0]), 500) if raw else error for _ in calls]
+    timeout = _timeout()
+    priority = _priority(priority)
+    limit = max(1, _max_concurrency())
+
+    results: list[tuple[dict | bytes, int] | None] = [None] * len(calls)
+    queued = iter(enumerate(calls))
+    pending: dict[Future, int] = {}
+    while True:
+        for index, (path, params) in islice(queued, limit - len(pending)):
+            future = _executor.submit(_send_get, path, params, headers, timeout, priority, raw)
+            pending[future] = index
+        if not pending:
+            return results
+        done = [future for future in pending if future.done()]
+        if not done:
+            # Not Future.result(): without monkey patching it would hold the hub
+            socketio.sleep(GATHER_POLL_INTERVAL)
+            continue
+        for future in done:
+            index = pending.pop(future)
+            results[index] = _gathered(calls[index][0], future, raw)
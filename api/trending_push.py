@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Trending pushed over Socket.IO instead of polled.
+
+A client emits `trending:subscribe` with {"feed": "all" | "movies" | "tv"}
+and gets a `trending:snapshot` of page 1 back. Every TRENDING_PUSH_INTERVAL
+seconds one worker refetches each feed at background priority, diffs it
+against the previous snapshot, and emits a `trending:delta` to the feed's
+room with only the entries that entered, exited or changed rank. Each
+delta carries the version it applies to; a client that sees a gap
+subscribes again for a fresh snapshot.
+
+Snapshots live in the shared cache, so whichever worker holds the lock
+diffs against the same previous state. Rooms span workers when
+SOCKETIO_MESSAGE_QUEUE is set. The fetched page also refreshes the cached
+/trending/<feed> response, so remaining pollers get the same data.
+"""
+
+from typing import Any
+
+from flask import Flask, current_app
+from flask_socketio import emit, join_room, leave_room
+
+from api.caching import build_cache_key, cache_body, cached_body
+from api.extensions import cache, socketio
+from api.json_provider import loads
+from api.rate_limiter import BACKGROUND
+from api.tmdb_client import tmdb_get_raw
+
+FEEDS = {
+    "all": "/trending/all/day",
+    "movies": "/trending/movie/day",
+    "tv": "/trending/tv/day",
+}
+MEDIA_TYPES = {"movies": "movie", "tv": "tv"}
+
+SNAPSHOT_TIMEOUT = 24 * 3600
+
+
+def room(feed: str) -> str:
+    return f"trending:{feed}"
+
+
+def _snapshot_key(feed: str) -> str:
+    return f"trending:snapshot:{feed}"
+
+
+def _entry_key(feed: str, item: dict[str, Any]) -> tuple[str, int]:
+    # The all feed mixes movies and tv, whose ids overlap
+    return item.get("media_type") or MEDIA_TYPES.get(feed, ""), item.get("id")
+
+
+def diff(feed: str, previous: list[dict[str, Any]], current: list[dict[str, Any]]) -> dict[str, list]:
+    """Entries that entered, exited or moved between two ranked lists (ranks from 1)."""
+    before = {_entry_key(feed, item): rank for rank, item in enumerate(previous, start=1)}
+    after = {_entry_key(feed, item): rank for rank, item in enumerate(current, start=1)}
+
+    entered = [
+        {"rank": rank, "item": item}
+        for rank, item in enumerate(current, start=1)
+        if _entry_key(feed, item) not in before
+    ]
+    exited = [
+        {"media_type": media_type, "id": item_id, "rank": rank}
+        for (media_type, item_id), rank in before.items()
+        if (media_type, item_id) not in after
+    ]
+    moved = [
+        {"media_type": media_type, "id": item_id, "from": before[(media_type, item_id)], "to": rank}
+        for (media_type, item_id), rank in after.items()
+        if (media_type, item_id) in before and before[(media_type, item_id)] != rank
+    ]
+    return {"entered": entered, "exited": exited, "moved": moved}
+
+
+def current_snapshot(feed: str) -> dict[str, Any] | None:
+    return cache.get(_snapshot_key(feed))
+
+
+def refresh_feed(feed: str) -> dict[str, Any] | None:
+    """Refetch one feed, store the snapshot, and emit the delta. Returns the delta."""
+    body, status = tmdb_get_raw(FEEDS[feed], {"page": 1}, priority=BACKGROUND)
+    if status != 200:
+        current_app.logger.warning("Trending refresh for %s got HTTP %s", feed, status)
+        return None
+    results = loads(body).get("results", [])
+    cache_body(build_cache_key(f"/trending/{feed}", {"page": 1}), body)
+
+    previous = current_snapshot(feed)
+    if previous is None:
+        cache.set(_snapshot_key(feed), {"version": 1, "results": results}, timeout=SNAPSHOT_TIMEOUT)
+        return None
+
+    delta = diff(feed, previous["results"], results)
+    # Unchanged ranks keep the version clients already hold
+    version = previous["version"] + 1 if any(delta.values()) else previous["version"]
+    cache.set(_snapshot_key(feed), {"version": version, "results": results}, timeout=SNAPSHOT_TIMEOUT)
+    if version == previous["version"]:
+        return None
+    payload = {"feed": feed, "from_version": previous["version"], "version": version, **delta}
+    socketio.emit("trending:delta", payload, to=room(feed))
+    return payload
+
+
+def _feed_arg(data: Any) -> str | None:
+    feed = data.get("feed") if isinstance(data, dict) else None
+    return feed if feed in FEEDS else None
+
+
+def _subscribe(data: Any) -> dict[str, Any]:
+    feed = _feed_arg(data)
+    if feed is None:
+        return {"error": f"feed must be one of {', '.join(FEEDS)}"}
+
+    join_room(room(feed))
+    snapshot = current_snapshot(feed)
+    if snapshot is None:
+        # Nothing watched this feed yet: start from the cached route or TMDB
+        body = cached_body(build_cache_key(f"/trending/{feed}", {"page": 1}))
+        if body is None:
+            body, status = tmdb_get_raw(FEEDS[feed], {"page": 1})
+            if status != 200:
+                return {"error": "Trending is unavailable", "status": status}
+        snapshot = {"version": 1, "results": loads(body).get("results", [])}
+        cache.add(_snapshot_key(feed), snapshot, timeout=SNAPSHOT_TIMEOUT)
+    emit("trending:snapshot", {"feed": feed, **snapshot})
+    return {"subscribed": feed}
+
+
+def _unsubscribe(data: Any) -> dict[str, Any]:
+    feed = _feed_arg(data)
+    if feed is None:
+        return {"error": f"feed must be one of {', '.join(FEEDS)}"}
+    leave_room(room(feed))
+    return {"unsubscribed": feed}
+
+
+def init_trending_push(app: Flask) -> None:
+    """Register the subscribe events and start the watcher when TRENDING_PUSH_INTERVAL is set."""
+    socketio.on_event("trending:subscribe", _subscribe)
+    socketio.on_event("trending:unsubscribe", _unsubscribe)
+
+    interval = app.config.get("TRENDING_PUSH_INTERVAL", 0)
+    if interval <= 0:
+        return
+
+    def loop() -> None:
+        while True:
+            socketio.sleep(interval)
+            with app.app_context():
+                # One worker per interval refreshes; the others only relay
+                if not cache.add("trending:push:running", True, timeout=interval):
+                    continue
+                for feed in FEEDS:
+                    try:
+                        refresh_feed(feed)
+                    except Exception:
+                        current_app.logger.exception("Trending refresh failed for %s", feed)
+
+    socketio.start_background_task(loop)
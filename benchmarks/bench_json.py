@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Per-request JSON CPU cost: stdlib json vs. the fast provider backend.
+
+Times one upstream decode plus one response encode for payloads shaped
+like GET /movies/<id> (details with credits, videos and images) and
+GET /trending/all (one 20-result page).
+
+Usage: python -m benchmarks.bench_json [iterations]
+"""
+
+import json
+import sys
+import time
+
+from api import json_provider
+
+
+def movie_details_payload() -> dict:
+    person = {
+        "adult": False, "gender": 2, "id": 819, "known_for_department": "Acting",
+        "name": "Edward Norton", "original_name": "Edward Norton", "popularity": 26.99,
+        "profile_path": "/8nytsqL59SFJTVYVrN72k6qkGgJ.jpg", "credit_id": "52fe4250c3a36847f80149f3",
+    }
+    image = {
+        "aspect_ratio": 1.778, "height": 2160, "iso_639_1": None,
+        "file_path": "/hZkgoQYus5vegHoetLkCJzb17zJ.jpg", "vote_average": 5.454,
+        "vote_count": 12, "width": 3840,
+    }
+    video = {
+        "iso_639_1": "en", "iso_3166_1": "US", "name": "Fight Club | #TBT Trailer",
+        "key": "6JnN1DmbqoU", "site": "YouTube", "size": 1080, "type": "Trailer",
+        "official": True, "published_at": "2014-10-02T19:20:22.000Z",
+        "id": "5c9294240e0a267cd516835f",
+    }
+    return {
+        "adult": False, "backdrop_path": "/hZkgoQYus5vegHoetLkCJzb17zJ.jpg",
+        "budget": 63000000, "genres": [{"id": 18, "name": "Drama"}], "id": 550,
+        "imdb_id": "tt0137523", "original_language": "en", "original_title": "Fight Club",
+        "overview": "A ticking-time-bomb insomniac and a slippery soap salesman " * 4,
+        "popularity": 61.416, "poster_path": "/pB8BM7pdSp6B6Ih7QZ4DrQ3PmJK.jpg",
+        "production_companies": [{"id": i, "name": f"Company {i}", "origin_country": "US"} for i in range(6)],
+        "release_date": "1999-10-15", "revenue": 100853753, "runtime": 139,
+        "spoken_languages": [{"english_name": "English", "iso_639_1": "en", "name": "English"}],
+        "status": "Released", "tagline": "Mischief. Mayhem. Soap.", "title": "Fight Club",
+        "video": False, "vote_average": 8.433, "vote_count": 26280,
+        "credits": {
+            "cast": [dict(person, cast_id=i, character=f"Role {i}", order=i) for i in range(80)],
+            "crew": [dict(person, department="Crew", job=f"Job {i}") for i in range(150)],
+        },
+        "videos": {"results": [dict(video, id=str(i)) for i in range(25)]},
+        "images": {
+            "backdrops": [image] * 60,
+            "logos": [image] * 15,
+            "posters": [image] * 90,
+        },
+    }
+
+
+def trending_page_payload() -> dict:
+    item = {
+        "adult": False, "backdrop_path": "/sR0SpCrXamlIkYMdfz83sFn5JS6.jpg", "id": 823464,
+        "title": "Godzilla x Kong: The New Empire", "original_language": "en",
+        "original_title": "Godzilla x Kong: The New Empire",
+        "overview": "Following their explosive showdown, Godzilla and Kong must reunite " * 2,
+        "poster_path": "/z1p34vh7dEOnLDmyCrlUVLuoDzd.jpg", "media_type": "movie",
+        "genre_ids": [878, 28, 12], "popularity": 9785.169, "release_date": "2024-03-27",
+        "video": False, "vote_average": 7.246, "vote_count": 1410,
+    }
+    return {
+        "page": 1,
+        "results": [dict(item, id=item["id"] + i) for i in range(20)],
+        "total_pages": 1000,
+        "total_results": 20000,
+    }
+
+
+def stdlib_round_trip(raw: bytes) -> bytes:
+    return json.dumps(json.loads(raw), separators=(",", ":"), sort_keys=True).encode()
+
+
+def fast_round_trip(raw: bytes) -> bytes:
+    return json_provider.dumps_bytes(json_provider.loads(raw), sort_keys=True)
+
+
+def per_call_us(fn, raw: bytes, iterations: int) -> float:
+    fn(raw)
+    start = time.process_time()
+    for _ in range(iterations):
+        fn(raw)
+    return (time.process_time() - start) / iterations * 1e6
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    print(f"fast backend: {json_provider.BACKEND}, {iterations} iterations\n")
+    print(f"{'payload':<20}{'bytes':>10}{'stdlib us':>12}{'fast us':>12}{'saved us':>12}")
+
+    for name, payload in [
+        ("/movies/<id>", movie_details_payload()),
+        ("/trending/all", trending_page_payload()),
+    ]:
+        raw = json.dumps(payload).encode()
+        slow = per_call_us(stdlib_round_trip, raw, iterations)
+        fast = per_call_us(fast_round_trip, raw, iterations)
+        print(f"{name:<20}{len(raw):>10}{slow:>12.1f}{fast:>12.1f}{slow - fast:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Search latency: local inverted index vs. proxying to TMDB /search/movie.
+
+Indexes a synthetic corpus of movie titles, then times the same queries
+against SearchIndex.search and, when TMDB_READ_TOKEN is set, against the
+upstream proxy path (tmdb_get_raw, no cache).
+
+Usage: python -m benchmarks.bench_search [documents] [queries]
+"""
+
+import os
+import random
+import statistics
+import sys
+import time
+
+from api.search_index import SearchIndex
+
+WORDS = (
+    "alien star war night dark knight return lost city love story dead man "
+    "house ghost river king queen last first day life death blood moon sun "
+    "secret garden island road home ocean fire ice storm shadow silent hill "
+    "empire planet space time machine dream girl boy wild west iron heart"
+).split()
+
+
+def corpus(size: int, rng: random.Random) -> list[dict]:
+    return [
+        {
+            "id": i,
+            "title": " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 5))).title(),
+            "release_date": f"{rng.randint(1930, 2024)}-01-01",
+            "popularity": rng.random() * 100,
+            "adult": rng.random() < 0.02,
+        }
+        for i in range(1, size + 1)
+    ]
+
+
+def queries(count: int, rng: random.Random) -> list[str]:
+    # Mix of whole words and partially typed last words, like type-ahead
+    result = []
+    for _ in range(count):
+        terms = [rng.choice(WORDS) for _ in range(rng.randint(1, 3))]
+        if rng.random() < 0.5:
+            terms[-1] = terms[-1][: rng.randint(2, len(terms[-1]))]
+        result.append(" ".join(terms))
+    return result
+
+
+def percentiles(samples: list[float]) -> tuple[float, float]:
+    cuts = statistics.quantiles(samples, n=100)
+    return statistics.median(samples), cuts[98]
+
+
+def time_local(index: SearchIndex, qs: list[str]) -> list[float]:
+    samples = []
+    for q in qs:
+        start = time.perf_counter()
+        index.search(q)
+        samples.append((time.perf_counter() - start) * 1e6)
+    return samples
+
+
+def time_upstream(qs: list[str]) -> list[float]:
+    from api.app import create_app
+    from api.tmdb_client import tmdb_get_raw
+
+    samples = []
+    with create_app().app_context():
+        for q in qs:
+            start = time.perf_counter()
+            tmdb_get_raw("/search/movie", {"query": q, "page": 1})
+            samples.append((time.perf_counter() - start) * 1e6)
+    return samples
+
+
+def main() -> None:
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    rng = random.Random(42)
+
+    index = SearchIndex(("title", "original_title"), "release_date")
+    start = time.perf_counter()
+    index.add_many(corpus(size, rng))
+    print(f"indexed {len(index)} documents in {time.perf_counter() - start:.2f}s\n")
+
+    qs = queries(count, rng)
+    print(f"{'path':<12}{'queries':>10}{'p50 us':>12}{'p99 us':>12}")
+    p50, p99 = percentiles(time_local(index, qs))
+    print(f"{'local':<12}{count:>10}{p50:>12.1f}{p99:>12.1f}")
+
+    if os.getenv("TMDB_READ_TOKEN"):
+        upstream_qs = qs[:50]
+        p50, p99 = percentiles(time_upstream(upstream_qs))
+        print(f"{'upstream':<12}{len(upstream_qs):>10}{p50:>12.1f}{p99:>12.1f}")
+    else:
+        print("upstream: skipped, set TMDB_READ_TOKEN to time the proxy path")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Suggest index footprint and latency.
+
+Builds a PrefixIndex over synthetic movie titles, reports the bytes
+held by its buffers (and the projection per million titles), then times
+top-10 lookups for 1-6 character prefixes.
+
+Usage: python -m benchmarks.bench_suggest [titles] [queries]
+"""
+
+import random
+import statistics
+import sys
+import time
+
+from api.suggest import PrefixIndex
+from benchmarks.bench_search import WORDS, corpus
+
+
+def main() -> None:
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    rng = random.Random(7)
+
+    index = PrefixIndex("title", "release_date")
+    docs = corpus(size, rng)
+    start = time.perf_counter()
+    index.load(docs)
+    built = time.perf_counter() - start
+
+    memory = index.memory_bytes()
+    print(f"built {len(index)} titles in {built:.2f}s")
+    print(f"buffers: {memory / 2**20:.1f} MiB, {memory / len(index):.1f} bytes/title, "
+          f"{memory / len(index) * 1e6 / 2**20:.0f} MiB per million titles\n")
+
+    print(f"{'prefix len':<12}{'queries':>10}{'p50 us':>12}{'p99 us':>12}")
+    for length in (1, 2, 3, 4, 6):
+        samples = []
+        for _ in range(count):
+            prefix = rng.choice(WORDS)[:length]
+            begin = time.perf_counter()
+            index.suggest(prefix, 10)
+            samples.append((time.perf_counter() - begin) * 1e6)
+        p99 = statistics.quantiles(samples, n=100)[98]
+        print(f"{length:<12}{count:>10}{statistics.median(samples):>12.1f}{p99:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
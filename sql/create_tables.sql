@@ -5,11 +5,72 @@ CREATE TABLE IF NOT EXISTS users (
   created_at TIMESTAMP NOT NULL DEFAULT NOW()
 );
 
+-- Partitioned by month; sessions_pYYYYMM partitions are created ahead and
+-- retired by `flask sessions maintain` (see sql/partition_sessions.sql to
+-- convert an existing table)
 CREATE TABLE IF NOT EXISTS sessions (
-  id SERIAL PRIMARY KEY,
+  id SERIAL,
   user_id INTEGER REFERENCES users(id),
   tmdb_guest_session_id VARCHAR(128),
   tmdb_user_session_id VARCHAR(128),
   created_at TIMESTAMP NOT NULL DEFAULT NOW(),
-  revoked_at TIMESTAMP NULL
+  revoked_at TIMESTAMP NULL,
+  PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+-- The default partition, then this month and the next two so new rows do
+-- not start out in the default. An existing unpartitioned sessions table
+-- is left as it is (convert it with sql/partition_sessions.sql), and a
+-- month that already has rows in the default is left to that script too,
+-- so this file stays safe to re-run.
+DO $$
+DECLARE
+  month DATE := date_trunc('month', NOW())::DATE;
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'sessions'::regclass) THEN
+    RAISE NOTICE 'sessions is not partitioned; see sql/partition_sessions.sql';
+    RETURN;
+  END IF;
+  CREATE TABLE IF NOT EXISTS sessions_default PARTITION OF sessions DEFAULT;
+  WHILE month <= date_trunc('month', NOW() + INTERVAL '2 months') LOOP
+    IF to_regclass(format('sessions_p%s', to_char(month, 'YYYYMM'))) IS NULL
+       AND NOT EXISTS (SELECT 1 FROM sessions_default
+                       WHERE created_at >= month AND created_at < month + INTERVAL '1 month') THEN
+      EXECUTE format(
+        'CREATE TABLE sessions_p%s PARTITION OF sessions FOR VALUES FROM (%L) TO (%L)',
+        to_char(month, 'YYYYMM'), month, month + INTERVAL '1 month');
+    END IF;
+    month := month + INTERVAL '1 month';
+  END LOOP;
+END $$;
+
+-- Loaded from TMDB daily ID exports (flask ingest)
+CREATE TABLE IF NOT EXISTS movies (
+  id INTEGER PRIMARY KEY,
+  original_title TEXT NOT NULL,
+  popularity DOUBLE PRECISION NOT NULL DEFAULT 0,
+  adult BOOLEAN NOT NULL DEFAULT FALSE,
+  video BOOLEAN NOT NULL DEFAULT FALSE,
+  ingested_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS tv_series (
+  id INTEGER PRIMARY KEY,
+  original_name TEXT NOT NULL,
+  popularity DOUBLE PRECISION NOT NULL DEFAULT 0,
+  ingested_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS ingest_checkpoints (
+  source VARCHAR(255) PRIMARY KEY,
+  lines_done BIGINT NOT NULL DEFAULT 0,
+  completed_at TIMESTAMP NULL,
+  updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+-- High-water marks of the TMDB /changes sync (flask sync changes)
+CREATE TABLE IF NOT EXISTS sync_state (
+  name VARCHAR(64) PRIMARY KEY,
+  high_water_mark DATE NOT NULL,
+  updated_at TIMESTAMP NOT NULL DEFAULT NOW()
 );
@@ -2,13 +2,18 @@
 CREATE INDEX IF NOT EXISTS idx_users_email
 on users (email);
 
--- Index for session tables
-CREATE INDEX IF NOT EXISTS idx_sessions_guest
-on sessions (tmdb_guest_session_id);
+-- Index for session tables, per monthly partition: live and revoked
+-- sessions apart, so the live lookups stay small and the revoked check
+-- (rating routes, on a live miss) does not scan.
+-- created_at needs no index; partition bounds already prune by it.
+CREATE INDEX IF NOT EXISTS idx_sessions_guest_active
+on sessions (tmdb_guest_session_id) WHERE revoked_at IS NULL;
 
-CREATE INDEX IF NOT EXISTS idx_sessions_user
-on sessions (tmdb_user_session_id);
+CREATE INDEX IF NOT EXISTS idx_sessions_user_active
+on sessions (tmdb_user_session_id) WHERE revoked_at IS NULL;
 
--- Index for movie_watchlist table
-CREATE INDEX IF NOT EXISTS idx_sessions_created
-on sessions (created_at);
+CREATE INDEX IF NOT EXISTS idx_sessions_guest_revoked
+on sessions (tmdb_guest_session_id) WHERE revoked_at IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_sessions_user_revoked
+on sessions (tmdb_user_session_id) WHERE revoked_at IS NOT NULL;
@@ -0,0 +1,57 @@
+-- One-off conversion of an unpartitioned sessions table to monthly partitions.
+-- Run in a maintenance window with the API stopped; `flask sessions maintain`
+-- keeps the partitions going afterwards.
+BEGIN;
+
+ALTER TABLE sessions RENAME TO sessions_unpartitioned;
+DROP INDEX IF EXISTS idx_sessions_guest;
+DROP INDEX IF EXISTS idx_sessions_user;
+DROP INDEX IF EXISTS idx_sessions_created;
+
+CREATE TABLE sessions (
+  id SERIAL,
+  user_id INTEGER REFERENCES users(id),
+  tmdb_guest_session_id VARCHAR(128),
+  tmdb_user_session_id VARCHAR(128),
+  created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+  revoked_at TIMESTAMP NULL,
+  PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+CREATE TABLE sessions_default PARTITION OF sessions DEFAULT;
+
+-- A partition for every month that has rows, up to two months ahead
+DO $$
+DECLARE
+  month DATE := date_trunc('month', COALESCE(
+    (SELECT MIN(created_at) FROM sessions_unpartitioned), NOW()))::DATE;
+BEGIN
+  WHILE month <= date_trunc('month', NOW() + INTERVAL '2 months') LOOP
+    EXECUTE format(
+      'CREATE TABLE sessions_p%s PARTITION OF sessions FOR VALUES FROM (%L) TO (%L)',
+      to_char(month, 'YYYYMM'), month, month + INTERVAL '1 month');
+    month := month + INTERVAL '1 month';
+  END LOOP;
+END $$;
+
+INSERT INTO sessions (id, user_id, tmdb_guest_session_id, tmdb_user_session_id, created_at, revoked_at)
+SELECT id, user_id, tmdb_guest_session_id, tmdb_user_session_id, created_at, revoked_at
+FROM sessions_unpartitioned;
+
+SELECT setval(pg_get_serial_sequence('sessions', 'id'), COALESCE((SELECT MAX(id) FROM sessions), 1));
+
+CREATE INDEX idx_sessions_guest_active
+on sessions (tmdb_guest_session_id) WHERE revoked_at IS NULL;
+
+CREATE INDEX idx_sessions_user_active
+on sessions (tmdb_user_session_id) WHERE revoked_at IS NULL;
+
+CREATE INDEX idx_sessions_guest_revoked
+on sessions (tmdb_guest_session_id) WHERE revoked_at IS NOT NULL;
+
+CREATE INDEX idx_sessions_user_revoked
+on sessions (tmdb_user_session_id) WHERE revoked_at IS NOT NULL;
+
+DROP TABLE sessions_unpartitioned;
+
+COMMIT;
@@ -0,0 +1,33 @@
+import pytest
+
+from api.app import create_app
+from api.config import Config
+from api.extensions import db
+
+# Tests never touch the DATABASE_URL from the environment or .env
+TEST_CONFIG = {
+    "TESTING": True,
+    "SQLALCHEMY_DATABASE_URI": "sqlite://",
+    "ASYNC_DATABASE_URL": None,
+    "SESSION_MAINTENANCE_INTERVAL": 0,
+    "CHANGES_SYNC_INTERVAL": 0,
+}
+
+
+@pytest.fixture(autouse=True)
+def _test_config(monkeypatch):
+    # Apps a test builds with a bare create_app() get the same settings
+    for name, value in TEST_CONFIG.items():
+        monkeypatch.setattr(Config, name, value, raising=False)
+
+
+@pytest.fixture
+def app():
+    """App on a fresh in-memory SQLite database with every table created."""
+    app = create_app(TEST_CONFIG)
+    with app.app_context():
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
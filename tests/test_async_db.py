@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+from sqlalchemy import select
+
+from api.app import create_app
+from api.async_db import (
+    async_engine_options,
+    async_session,
+    async_url,
+    dispose_async_engine,
+    init_async_db,
+    live_session_async,
+    record_session_async,
+)
+from api.extensions import db
+from api.models import User
+
+
+def test_async_url_swaps_driver():
+    assert async_url("postgresql://localhost/tmdb_api").drivername == "postgresql+asyncpg"
+    assert async_url("sqlite:///tmdb.db").drivername == "sqlite+aiosqlite"
+    pooled = async_url("postgresql://localhost/tmdb_api", external_pooler=True)
+    assert pooled.query["prepared_statement_cache_size"] == "0"
+
+
+def test_async_engine_options_follow_config():
+    options = async_engine_options({
+        "SQLALCHEMY_DATABASE_URI": "postgresql://localhost/tmdb_api",
+        "DB_POOL_SIZE": 4,
+        "DB_STATEMENT_TIMEOUT_MS": 1500,
+    })
+    assert "poolclass" not in options
+    assert options["pool_size"] == 4
+    assert options["connect_args"] == {"server_settings": {"statement_timeout": "1500"}}
+
+
+def test_sessions_round_trip_through_the_async_engine(tmp_path):
+    pytest.importorskip("aiosqlite")
+    pytest.importorskip("greenlet")
+    app = create_app()
+    app.config["ASYNC_DATABASE_URL"] = f"sqlite:///{tmp_path / 'async.db'}"
+    init_async_db(app)
+
+    async def scenario():
+        async with async_session() as session:
+            await session.run_sync(lambda sync: db.metadata.create_all(sync.connection()))
+            session.add(User(email="a@example.com", password_hash="x"))
+            await session.commit()
+            user = (await session.execute(select(User))).scalars().one()
+
+        await record_session_async(user_id=user.id, tmdb_user_session_id="abc")
+        await record_session_async(tmdb_guest_session_id="gone", revoked_at=user.created_at)
+        found = await live_session_async("abc")
+        missing = await live_session_async("gone")
+        await dispose_async_engine()
+        return user, found, missing
+
+    user, found, missing = asyncio.run(scenario())
+    assert found.user_id == user.id
+    assert found.created_at is not None
+    assert missing is None
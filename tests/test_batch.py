@@ -0,0 +1,128 @@
+import json
+
+from flask import current_app
+
+from api.app import create_app
+from api.extensions import cache
+import api.routes.movies as movies
+
+
+def _client(monkeypatch):
+    gathered = []
+
+    def fake_gather(calls, priority=None, raw=False):
+        gathered.extend(path for path, _ in calls)
+        return [
+            (b'{"error":"not found"}', 404) if path.endswith("/404")
+            else (json.dumps({"id": int(path.rsplit("/", 1)[1])}).encode(), 200)
+            for path, _ in calls
+        ]
+
+    def fake_passthrough(path, params=None):
+        body = json.dumps({"id": int(path.rsplit("/", 1)[1]), "cached": True})
+        return current_app.response_class(body, mimetype="application/json")
+
+    def fake_appended(path, append, priority=None):
+        return {"": fake_passthrough(path).get_data()}, 200
+
+    monkeypatch.setattr(movies, "tmdb_gather", fake_gather)
+    monkeypatch.setattr(movies, "tmdb_passthrough", fake_passthrough)
+    monkeypatch.setattr(movies, "tmdb_get_appended", fake_appended)
+    app = create_app()
+    app.testing = True
+    with app.app_context():
+        cache.clear()
+    return app.test_client(), gathered
+
+
+def test_batch_uses_cache_and_fetches_misses(monkeypatch):
+    client, gathered = _client(monkeypatch)
+    client.get("/movies/550")
+
+    resp = client.get("/movies/batch?ids=550,13,404,13")
+    assert resp.status_code == 200
+    assert resp.json["cached"] == 1
+    assert resp.json["fetched"] == 2
+    assert [r["id"] for r in resp.json["results"]] == [550, 13, 404]
+    assert resp.json["results"][0]["data"] == {"id": 550, "cached": True}
+    assert resp.json["results"][2]["status"] == 404
+    assert gathered == ["/movie/13", "/movie/404"]
+
+    # Fetched details warmed the per-movie route
+    assert client.post("/movies/batch", json={"ids": [13]}).json["cached"] == 1
+    assert client.get("/movies/13").json == {"id": 13}
+
+
+def test_batch_validates_ids(monkeypatch):
+    client, _ = _client(monkeypatch)
+
+    assert client.get("/movies/batch").status_code == 400
+    assert client.get("/movies/batch?ids=1,abc").status_code == 400
+    for body in ({"ids": 5}, {"ids": [1, 2.5]}, {"ids": [1, True]}, {"ids": [[1]]}, [1, 2]):
+        assert client.post("/movies/batch", json=body).status_code == 400, body
+    assert client.post("/movies/batch", json={"ids": [" 7", 7, "8"]}).json["fetched"] == 2
+    too_many = ",".join(str(i) for i in range(movies.MAX_BATCH_IDS + 1))
+    assert client.get(f"/movies/batch?ids={too_many}").status_code == 400
+
+
+def test_generic_batch_runs_sub_requests_through_cached_routes(monkeypatch):
+    import api.routes.tv as tv
+
+    fetched = []
+
+    def fake_appended(path, append, priority=None):
+        fetched.append(path)
+        parts = {name: json.dumps({"part": name}).encode() for name in append}
+        parts[""] = json.dumps({"path": path}).encode()
+        return parts, 200
+
+    monkeypatch.setattr(tv, "tmdb_get_appended", fake_appended)
+    client, _ = _client(monkeypatch)
+
+    body = {"requests": [{"path": "/tv/1399"}, {"path": "/tv/1399/keywords"}, "/tv/nope"]}
+    resp = client.post("/batch", json=body)
+    assert resp.status_code == 200
+    results = resp.json["responses"]
+    assert [r["path"] for r in results] == ["/tv/1399", "/tv/1399/keywords", "/tv/nope"]
+    assert results[0] == {"path": "/tv/1399", "status": 200, "body": {"path": "/tv/1399"}}
+    assert results[1]["body"] == {"part": "keywords"}
+    assert results[2]["status"] == 404
+    assert isinstance(results[2]["body"], str)
+
+    # Sub-requests filled the cache like direct calls would
+    calls = len(fetched)
+    assert client.get("/tv/1399").json == {"path": "/tv/1399"}
+    assert client.get("/tv/1399/similar").json == {"part": "similar"}
+    assert len(fetched) == calls
+
+
+def test_generic_batch_validates_requests(monkeypatch):
+    from api.routes import batch
+
+    client, _ = _client(monkeypatch)
+    assert client.post("/batch", json={}).status_code == 400
+    for body in ([{"path": "/movies/1"}], {"requests": "/movies/1"}, {"requests": [["/movies/1"]]}):
+        assert client.post("/batch", json=body).status_code == 400, body
+    assert client.post("/batch", json={"requests": ["/auth/login"]}).status_code == 400
+    assert client.post("/batch", json={"requests": ["/batch"]}).status_code == 400
+    for nested in ("/movies/batch?ids=1,2", "/movies/%62atch?ids=1"):
+        resp = client.post("/batch", json={"requests": ["/movies/1", nested]})
+        assert resp.status_code == 400, nested
+    too_many = ["/movies/1"] * (batch.MAX_SUB_REQUESTS + 1)
+    assert client.post("/batch", json={"requests": too_many}).status_code == 400
+
+
+def test_failing_sub_request_only_fails_its_own_slot(monkeypatch):
+    client, _ = _client(monkeypatch)
+
+    def broken(path, append, priority=None):
+        if path.endswith("/666"):
+            raise TypeError("boom")
+        return {"": json.dumps({"path": path}).encode()}, 200
+
+    monkeypatch.setattr(movies, "tmdb_get_appended", broken)
+    resp = client.post("/batch", json={"requests": ["/movies/666", "/movies/1"]})
+
+    assert resp.status_code == 200
+    assert [r["status"] for r in resp.json["responses"]] == [500, 200]
+    assert resp.json["responses"][1]["body"] == {"path": "/movie/1"}
@@ -0,0 +1,169 @@
+import json
+
+from flask import jsonify
+
+from api.app import create_app
+from api.caching import build_cache_key
+from api.extensions import cache
+import api.routes.trending as trending
+import api.routes.movies as movies
+
+
+def _client(monkeypatch, module):
+    calls = []
+
+    def fake_passthrough(path, params=None):
+        calls.append((path, params))
+        return jsonify({"path": path, "params": params})
+
+    monkeypatch.setattr(module, "tmdb_passthrough", fake_passthrough)
+    app = create_app()
+    app.testing = True
+    with app.app_context():
+        cache.clear()
+    return app.test_client(), calls
+
+
+def test_build_cache_key_is_order_independent():
+    a = build_cache_key("/movies/search", {"q": "alien", "page": 2, "year": None})
+    b = build_cache_key("/movies/search", {"page": 2, "q": "alien"})
+    assert a == b == "view/movies/search?page=2&q=alien"
+
+
+def test_trending_pages_are_cached_separately(monkeypatch):
+    client, calls = _client(monkeypatch, trending)
+
+    first = client.get("/trending/all?page=1")
+    second = client.get("/trending/all?page=2")
+    assert first.json["params"] == {"page": 1}
+    assert second.json["params"] == {"page": 2}
+
+    # Clamped, defaulted and unknown params all map onto existing entries
+    client.get("/trending/all")
+    client.get("/trending/all?page=0&utm=x")
+    client.get("/trending/all?page=2")
+    assert len(calls) == 2
+
+
+def test_search_key_is_case_folded(monkeypatch):
+    client, calls = _client(monkeypatch, movies)
+
+    client.get("/movies/search?q=Pulp%20Fiction")
+    client.get("/movies/search?q=pulp++fiction&page=1&include_adult=FALSE")
+    assert len(calls) == 1
+
+
+def test_errors_are_not_cached(monkeypatch):
+    client, calls = _client(monkeypatch, movies)
+
+    assert client.get("/movies/search").status_code == 400
+    assert client.get("/movies/search").status_code == 400
+    client.get("/movies/search?q=alien")
+    client.get("/movies/search?q=alien")
+    assert len(calls) == 1
+
+
+def test_stale_entry_is_served_and_refreshed_once(monkeypatch):
+    client, calls = _client(monkeypatch, trending)
+    client.get("/trending/all")
+
+    app = client.application
+    key = build_cache_key("/trending/all", {"page": 1})
+    with app.app_context():
+        entry = cache.get(key)
+        entry["fresh_until"] = 0
+        cache.set(key, entry)
+
+    tasks = []
+    monkeypatch.setattr(
+        "api.caching.socketio.start_background_task",
+        lambda fn: tasks.append(fn),
+    )
+    assert client.get("/trending/all").status_code == 200
+    assert client.get("/trending/all").status_code == 200
+    assert len(calls) == 1
+    assert len(tasks) == 1
+
+    tasks[0]()
+    assert len(calls) == 2
+    with app.app_context():
+        assert cache.get(key)["fresh_until"] > 0
+
+
+def test_hits_serve_precompressed_gzip(monkeypatch):
+    import gzip
+
+    client, calls = _client(monkeypatch, trending)
+    client.application.config["COMPRESS_MIN_BYTES"] = 10
+
+    plain = client.get("/trending/all")
+    packed = client.get("/trending/all", headers={"Accept-Encoding": "gzip"})
+
+    assert len(calls) == 1
+    assert packed.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(packed.get_data()) == plain.get_data()
+    assert "Accept-Encoding" in packed.headers["Vary"]
+
+
+def test_etag_and_304(monkeypatch):
+    client, calls = _client(monkeypatch, trending)
+
+    first = client.get("/trending/all")
+    etag = first.headers["ETag"]
+    assert first.headers["Last-Modified"]
+
+    again = client.get("/trending/all", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.get_data() == b""
+    assert again.headers["ETag"] == etag
+
+    other = client.get("/trending/all?page=2", headers={"If-None-Match": etag})
+    assert other.status_code == 200
+    assert len(calls) == 2
+
+
+def test_details_fetch_warms_sub_resource_routes(monkeypatch):
+    fetched = []
+
+    def fake_appended(path, append, priority=None):
+        fetched.append((path, tuple(append)))
+        parts = {name: json.dumps({"part": name}).encode() for name in append}
+        parts[""] = json.dumps({"id": 550}).encode()
+        return parts, 200
+
+    monkeypatch.setattr(movies, "tmdb_get_appended", fake_appended)
+    client, _ = _client(monkeypatch, movies)
+
+    assert client.get("/movies/550").json == {"id": 550}
+    assert client.get("/movies/550/recommendations").json == {"part": "recommendations"}
+    assert client.get("/movies/550/reviews?page=1").json == {"part": "reviews"}
+    assert fetched == [("/movie/550", ("recommendations", "reviews"))]
+
+
+def test_projections_share_the_full_entry(monkeypatch):
+    client, calls = _client(monkeypatch, trending)
+
+    full = client.get("/trending/all").json
+    assert client.get("/trending/all?fields=path").json == {"path": full["path"]}
+    assert client.get("/trending/all?fields=params.page,path").json == {
+        "path": full["path"], "params": {"page": 1},
+    }
+    assert len(calls) == 1
+
+
+def test_projection_miss_fills_the_full_entry(monkeypatch):
+    client, calls = _client(monkeypatch, movies)
+
+    assert client.get("/movies/search?q=alien&fields=path").json == {"path": "/search/movie"}
+    assert client.get("/movies/search?q=alien").json["params"]["query"] == "alien"
+    assert len(calls) == 1
+
+
+def test_deleting_the_full_entry_retires_its_projections(monkeypatch):
+    client, calls = _client(monkeypatch, trending)
+
+    assert client.get("/trending/all?fields=path").json == {"path": "/trending/all/day"}
+    with client.application.app_context():
+        cache.delete(build_cache_key("/trending/all", {"page": 1}))
+    assert client.get("/trending/all?fields=path").status_code == 200
+    assert len(calls) == 2
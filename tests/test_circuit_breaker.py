@@ -0,0 +1,41 @@
+import time
+
+from api.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, path_family
+
+
+def test_path_family():
+    assert path_family("/movie/550/reviews") == "/movie"
+    assert path_family("/search/tv") == "/search"
+    assert path_family("/trending/all/day") == "/trending"
+
+
+def test_opens_after_threshold_and_fails_fast():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+
+def test_half_open_admits_one_trial():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+
+def test_failed_trial_reopens():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
@@ -0,0 +1,58 @@
+import gzip
+
+from flask import jsonify
+
+from api.app import create_app
+from api.extensions import cache
+import api.routes.trending as trending
+
+
+def _client():
+    app = create_app()
+    app.testing = True
+    app.add_url_rule("/big", "big", lambda: jsonify({"overview": "x" * 5000}))
+    return app.test_client()
+
+
+def test_small_responses_are_not_compressed():
+    resp = _client().get("/health", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in resp.headers
+
+
+def test_large_responses_are_gzipped_when_accepted():
+    client = _client()
+    plain = client.get("/big")
+    packed = client.get("/big", headers={"Accept-Encoding": "gzip, deflate"})
+
+    assert "Content-Encoding" not in plain.headers
+    assert packed.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(packed.get_data()) == plain.get_data()
+    assert "Accept-Encoding" in plain.headers["Vary"]
+
+
+def test_refused_encodings_are_not_used():
+    resp = _client().get("/big", headers={"Accept-Encoding": "gzip;q=0, identity"})
+    assert "Content-Encoding" not in resp.headers
+
+
+def test_dynamically_compressed_responses_get_their_own_etag(monkeypatch):
+    monkeypatch.setattr(trending, "tmdb_passthrough",
+                        lambda path, params=None: jsonify({"overview": "x" * 5000}))
+    app = create_app()
+    app.testing = True
+    app.config["CACHE_PRECOMPRESS"] = False
+    with app.app_context():
+        cache.clear()
+    client = app.test_client()
+
+    plain = client.get("/trending/all")
+    packed = client.get("/trending/all", headers={"Accept-Encoding": "gzip"})
+    assert packed.headers["Content-Encoding"] == "gzip"
+    assert packed.headers["ETag"] == plain.headers["ETag"][:-1] + '-gzip"'
+
+    again = client.get("/trending/all", headers={"Accept-Encoding": "gzip",
+                                                 "If-None-Match": packed.headers["ETag"]})
+    assert again.status_code == 304
+    assert again.headers["ETag"] == packed.headers["ETag"]
+    # The identity tag still validates the uncompressed body
+    assert client.get("/trending/all", headers={"If-None-Match": plain.headers["ETag"]}).status_code == 304
@@ -0,0 +1,68 @@
+import time
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import NullPool
+
+from api.db_pool import TimedQueuePool, checkout_stats, engine_options
+
+
+def _config(**overrides):
+    return {"SQLALCHEMY_DATABASE_URI": "postgresql://localhost/tmdb_api", **overrides}
+
+
+def test_postgres_gets_a_sized_pool_and_statement_timeout():
+    options = engine_options(_config(DB_POOL_SIZE=20, DB_STATEMENT_TIMEOUT_MS=1500))
+
+    assert options["poolclass"] is TimedQueuePool
+    assert options["pool_size"] == 20
+    assert options["pool_pre_ping"] is True
+    assert options["connect_args"] == {"options": "-c statement_timeout=1500"}
+
+
+def test_external_pooler_and_memory_sqlite_skip_the_client_pool():
+    external = engine_options(_config(DB_POOLER="external", DB_STATEMENT_TIMEOUT_MS=1500))
+    assert external["poolclass"] is NullPool
+    assert "connect_args" not in external
+
+    assert "poolclass" not in engine_options({"SQLALCHEMY_DATABASE_URI": "sqlite://"})
+
+
+def test_checkout_waits_and_timeouts_are_recorded(tmp_path):
+    options = engine_options({
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'pool.db'}",
+        "DB_POOL_SIZE": 1,
+        "DB_MAX_OVERFLOW": 0,
+        "DB_POOL_TIMEOUT": 0.05,
+    })
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", **options)
+    checkout_stats.reset()
+
+    held = engine.connect()
+    with pytest.raises(PoolTimeoutError):
+        engine.connect()
+    held.close()
+    engine.connect().close()
+
+    stats = checkout_stats.snapshot()
+    assert stats["timeouts"] == 1
+    assert stats["checkouts"] == 2
+    assert sum(stats["histogram"].values()) == 2
+    engine.dispose()
+
+
+def test_pre_ping_is_not_counted_as_waiting(tmp_path, monkeypatch):
+    options = engine_options({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'pool.db'}"})
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", **options)
+    engine.connect().close()
+    checkout_stats.reset()
+
+    ping = engine.dialect.do_ping
+    monkeypatch.setattr(engine.dialect, "do_ping", lambda conn: time.sleep(0.1) or ping(conn))
+    engine.connect().close()
+
+    stats = checkout_stats.snapshot()
+    assert stats["checkouts"] == 1
+    assert stats["max_ms"] < 100
+    engine.dispose()
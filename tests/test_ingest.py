@@ -0,0 +1,60 @@
+import gzip
+import json
+
+from api.extensions import db
+from api.models import IngestCheckpoint, Movie, TvSeries
+
+ROWS = [
+    {"adult": False, "id": 3924, "original_title": "Blondie", "popularity": 2.41, "video": False},
+    {"adult": False, "id": 6124, "original_title": "Peter Voss, der Millionendieb", "popularity": 1.1, "video": False},
+    {"adult": True, "id": 8773, "original_title": "L'amour à vingt ans", "popularity": 3.6, "video": False},
+    {"adult": False, "id": 25449, "original_title": "New World Disorder 9", "popularity": 0.6, "video": True},
+    {"adult": False, "id": 3924, "original_title": "Blondie (1938)", "popularity": 2.5, "video": False},
+]
+
+
+def _export(tmp_path, name, rows):
+    path = tmp_path / name
+    with gzip.open(path, "wt", encoding="utf-8") as fh:
+        fh.writelines(json.dumps(row) + "\n" for row in rows)
+    return str(path)
+
+
+def test_ingest_loads_export_in_batches_and_upserts(app, tmp_path):
+    path = _export(tmp_path, "movie_ids_05_15_2024.json.gz", ROWS)
+
+    result = app.test_cli_runner().invoke(args=["ingest", "movies", path, "--batch-size", "2"])
+    assert result.exit_code == 0, result.output
+    assert "rows/s" in result.output
+
+    with app.app_context():
+        assert db.session.query(Movie).count() == 4
+        assert db.session.get(Movie, 3924).original_title == "Blondie (1938)"
+        assert db.session.get(Movie, 8773).adult is True
+        checkpoint = db.session.get(IngestCheckpoint, "movie_ids_05_15_2024.json.gz")
+        assert checkpoint.lines_done == 5
+        assert checkpoint.completed_at is not None
+
+    again = app.test_cli_runner().invoke(args=["ingest", "movies", path])
+    assert "already loaded" in again.output
+
+
+def test_ingest_resumes_after_checkpoint(app, tmp_path):
+    rows = [{"id": i, "original_name": f"Show {i}", "popularity": 1.0} for i in range(1, 8)]
+    path = _export(tmp_path, "tv_series_ids_05_15_2024.json.gz", rows)
+
+    with app.app_context():
+        db.session.add(IngestCheckpoint(source="tv_series_ids_05_15_2024.json.gz", lines_done=4))
+        db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=["ingest", "tv", path, "--batch-size", "2"])
+    assert result.exit_code == 0, result.output
+    assert "resuming after line 4" in result.output
+
+    with app.app_context():
+        assert sorted(s.id for s in db.session.query(TvSeries)) == [5, 6, 7]
+
+    restarted = app.test_cli_runner().invoke(args=["ingest", "tv", path, "--restart"])
+    assert restarted.exit_code == 0, restarted.output
+    with app.app_context():
+        assert db.session.query(TvSeries).count() == 7
@@ -0,0 +1,30 @@
+from datetime import datetime
+
+from api.app import create_app
+import api.json_provider as json_provider
+
+
+def test_jsonify_uses_provider_and_sorts_keys():
+    app = create_app()
+    with app.app_context():
+        body = app.json.response({"b": 1, "a": "é"}).get_data()
+    assert body == '{"a":"é","b":1}\n'.encode()
+
+
+def test_round_trip_with_stdlib_fallback(monkeypatch):
+    payload = {"id": 550, "title": "Fight Club", "genres": [{"id": 18}]}
+    fast = json_provider.dumps_bytes(payload)
+
+    monkeypatch.setattr(json_provider, "orjson", None)
+    slow = json_provider.dumps_bytes(payload)
+
+    assert json_provider.loads(fast) == json_provider.loads(slow) == payload
+
+
+def test_dates_are_encoded_like_flask(monkeypatch):
+    value = {"at": datetime(2024, 1, 2)}
+    fast = json_provider.dumps_bytes(value)
+    monkeypatch.setattr(json_provider, "orjson", None)
+
+    assert fast == json_provider.dumps_bytes(value)
+    assert json_provider.loads(fast)["at"] == "Tue, 02 Jan 2024 00:00:00 GMT"
@@ -0,0 +1,43 @@
+from api.projection import fields_arg, project, project_bytes
+
+SHOW = {
+    "id": 1399,
+    "name": "Game of Thrones",
+    "poster_path": "/p.jpg",
+    "production_companies": [{"id": 76043, "name": "Revolution Sun Studios"}],
+    "seasons": [
+        {"season_number": 1, "episode_count": 10, "overview": "..."},
+        {"season_number": 2, "episode_count": 10, "overview": "..."},
+    ],
+    "created_by": {"name": "D. B. Weiss"},
+}
+
+
+def test_fields_arg_is_canonical():
+    assert fields_arg(" poster_path,name,,name ") == "name,poster_path"
+    assert fields_arg("name,bad field,../x") == "name"
+    assert fields_arg("") is None
+    assert fields_arg(None) is None
+
+
+def test_project_keeps_listed_and_nested_fields():
+    projected = project(SHOW, "name,seasons.episode_count,created_by.name,missing")
+    assert projected == {
+        "name": "Game of Thrones",
+        "seasons": [{"episode_count": 10}, {"episode_count": 10}],
+        "created_by": {"name": "D. B. Weiss"},
+    }
+
+
+def test_whole_field_wins_over_sub_paths():
+    assert project(SHOW, "seasons,seasons.episode_count")["seasons"] == SHOW["seasons"]
+    assert project(SHOW, "name.first") == {}
+
+
+def test_sub_paths_skip_scalar_list_items():
+    doc = {"name": "Game of Thrones", "origin_country": ["US"], "mixed": ["a", {"code": "US"}, 3], "none": []}
+
+    assert project(doc, "name,origin_country.code") == {"name": "Game of Thrones"}
+    assert project(doc, "mixed.code") == {"mixed": [{"code": "US"}]}
+    assert project(doc, "none.code") == {"none": []}
+    assert project_bytes(b'{"origin_country":["US","GB"]}', "origin_country.code") == b"{}"
@@ -0,0 +1,87 @@
+import threading
+import time
+
+from api.rate_limiter import (
+    BACKGROUND,
+    INTERACTIVE,
+    FileTokenBucket,
+    TokenBucket,
+    parse_retry_after,
+)
+
+
+def test_burst_then_shed_when_wait_exceeds_budget():
+    bucket = TokenBucket(rate=1, burst=2, max_wait=0.05)
+
+    assert bucket.acquire()
+    assert bucket.acquire()
+    assert not bucket.acquire()
+    assert bucket.stats()["shed"] == 1
+
+
+def test_pause_blocks_until_retry_after():
+    bucket = TokenBucket(rate=100, burst=5, max_wait=1)
+    bucket.pause(0.1)
+
+    start = time.monotonic()
+    assert bucket.acquire()
+    assert time.monotonic() - start >= 0.09
+
+
+def test_waiters_sleep_with_the_given_sleep_outside_the_lock():
+    naps = []
+
+    def nap(seconds):
+        # Another caller must be able to use the bucket while we wait
+        assert bucket.queue_depth() == 1
+        naps.append(seconds)
+        time.sleep(seconds)
+
+    bucket = TokenBucket(rate=100, burst=1, max_wait=1, sleep=nap)
+    assert bucket.acquire()
+    assert bucket.acquire()
+    assert naps and max(naps) <= 0.01
+
+
+def test_interactive_requests_jump_the_queue():
+    bucket = TokenBucket(rate=20, burst=1, max_wait=2)
+    assert bucket.acquire()
+    order = []
+
+    def take(priority, name):
+        bucket.acquire(priority)
+        order.append(name)
+
+    background = threading.Thread(target=take, args=(BACKGROUND, "background"))
+    background.start()
+    deadline = time.monotonic() + 2
+    while bucket.queue_depth() < 1:
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+    interactive = threading.Thread(target=take, args=(INTERACTIVE, "interactive"))
+    interactive.start()
+    background.join()
+    interactive.join()
+
+    assert order == ["interactive", "background"]
+
+
+def test_background_is_shed_when_queue_is_full():
+    bucket = TokenBucket(rate=1, burst=1, max_queue=0)
+    assert not bucket.acquire(BACKGROUND)
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3
+    assert parse_retry_after(None) == 0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0
+
+
+def test_file_bucket_shares_tokens(tmp_path):
+    path = str(tmp_path / "bucket.json")
+    first = FileTokenBucket(path, rate=1, burst=2, max_wait=0.05)
+    second = FileTokenBucket(path, rate=1, burst=2, max_wait=0.05)
+
+    assert first.acquire()
+    assert second.acquire()
+    assert not first.acquire()
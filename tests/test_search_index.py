@@ -0,0 +1,180 @@
+import gzip
+import json
+
+import click
+
+from api.app import create_app
+from api.caching import build_cache_key, cache_body
+from api.extensions import cache, db
+from api.models import Movie, TvSeries
+from api.search_index import MOVIE_COLUMNS, TV_COLUMNS, SearchIndex, stem, tokenize
+import api.routes.movies as movies
+import api.search_index as search_index
+
+MOVIES = [
+    {"id": 348, "title": "Alien", "release_date": "1979-05-25", "popularity": 50.0},
+    {"id": 679, "title": "Aliens", "release_date": "1986-07-18", "popularity": 40.0},
+    {"id": 126889, "title": "Alien: Covenant", "release_date": "2017-05-09", "popularity": 60.0},
+    {"id": 862, "title": "Toy Story", "original_title": "Toy Story", "popularity": 90.0},
+    {"id": 1, "title": "Alien Encounters", "adult": True, "popularity": 99.0},
+    {"id": 194, "title": "Le Fabuleux Destin d'Amélie Poulain", "popularity": 20.0},
+]
+
+
+def _index():
+    index = SearchIndex(("title", "original_title"), "release_date")
+    index.add_many(MOVIES)
+    return index
+
+
+def test_tokenizer_folds_case_accents_and_suffixes():
+    assert tokenize("Amélie's STORIES") == tokenize("amelie story")
+    assert stem("running") == stem("run")
+    assert stem("heroes") == stem("hero")
+
+
+def test_bm25_ranks_exact_title_first_and_filters():
+    index = _index()
+
+    ids = [r["id"] for r in index.search("alien")["results"]]
+    assert ids[0] == 348
+    assert 1 not in ids
+    assert 1 in [r["id"] for r in index.search("alien", include_adult=True)["results"]]
+    assert [r["id"] for r in index.search("aliens", year=1986)["results"]] == [679]
+    assert index.search("amelie poulain")["results"][0]["id"] == 194
+
+
+def test_last_word_matches_as_prefix_and_misses_return_none():
+    index = _index()
+
+    assert [r["id"] for r in index.search("alien cov")["results"]] == [126889]
+    assert index.search("toy stories")["total_results"] == 1
+    assert index.search("godzilla") is None
+    assert index.search("alien", year=1950) is None
+
+
+def test_replacing_a_document_reindexes_it(tmp_path):
+    path = tmp_path / "movies.jsonl.gz"
+    with gzip.open(path, "wt") as fh:
+        fh.writelines(json.dumps(doc) + "\n" for doc in MOVIES)
+    index = SearchIndex(("title", "original_title"), "release_date")
+    assert index.load_jsonl(str(path)) == len(MOVIES)
+
+    index.add({"id": 862, "title": "Toy Story Renamed"})
+    assert len(index) == len(MOVIES)
+    assert index.search("renamed")["results"][0]["id"] == 862
+
+
+def test_search_route_uses_index_and_falls_back_upstream(monkeypatch):
+    upstream = []
+
+    def fake_passthrough(path, params=None):
+        upstream.append(params["query"])
+        return {"results": []}
+
+    monkeypatch.setattr(movies, "movie_index", _index())
+    monkeypatch.setattr(movies, "tmdb_passthrough", fake_passthrough)
+    app = create_app()
+    app.testing = True
+    with app.app_context():
+        cache.clear()
+    client = app.test_client()
+
+    local = client.get("/movies/search?q=Alien&year=1979")
+    assert [r["id"] for r in local.json["results"]] == [348]
+    client.get("/movies/search?q=godzilla")
+    assert upstream == ["godzilla"]
+
+
+def test_index_is_built_from_ingested_tables():
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        db.session.add_all([
+            Movie(id=550, original_title="Fight Club", popularity=60.0),
+            Movie(id=551, original_title="The Poseidon Adventure", popularity=9.0, adult=False),
+            TvSeries(id=1399, original_name="Game of Thrones", popularity=300.0),
+        ])
+        db.session.commit()
+
+        movies_index = SearchIndex(("title", "original_title"), "release_date")
+        tv = SearchIndex(("name", "original_name"), "first_air_date")
+        assert movies_index.load_table(Movie, MOVIE_COLUMNS) == 2
+        assert tv.load_table(TvSeries, TV_COLUMNS) == 1
+
+    # Rows have no display title; only what the table really holds
+    assert movies_index.search("fight")["results"] == [{
+        "id": 550, "original_title": "Fight Club", "popularity": 60.0, "adult": False, "video": False,
+    }]
+    assert movies_index.is_sparse(movies_index.search("fight")["results"][0])
+    assert tv.search("thrones")["results"][0] == {
+        "id": 1399, "original_name": "Game of Thrones", "popularity": 300.0,
+    }
+
+
+def test_table_results_are_filled_from_details(monkeypatch):
+    index = SearchIndex(("title", "original_title"), "release_date")
+    index.add_many([
+        {"id": 550, "original_title": "Fight Club", "popularity": 60.0, "adult": False, "video": False},
+        {"id": 551, "original_title": "Fight Night", "popularity": 9.0, "adult": False, "video": False},
+    ])
+    details = {
+        "id": 551, "title": "Fight Night", "original_title": "Fight Night", "overview": "...",
+        "poster_path": "/p.jpg", "popularity": 9.0, "genres": [{"id": 18, "name": "Drama"}],
+        "budget": 1000,
+    }
+    fetched = []
+
+    def fake_gather(calls, raw=False, **kwargs):
+        fetched.extend(path for path, _ in calls)
+        return [(json.dumps(details).encode(), 200) for _ in calls]
+
+    monkeypatch.setattr(movies, "movie_index", index)
+    monkeypatch.setattr(search_index, "tmdb_gather", fake_gather)
+    app = create_app()
+    app.testing = True
+    with app.app_context():
+        cache.clear()
+        cache_body(build_cache_key("/movies/550"), json.dumps(
+            {"id": 550, "title": "Fight Club", "original_title": "Fight Club", "popularity": 60.0}
+        ).encode())
+    client = app.test_client()
+
+    results = client.get("/movies/search?q=fight").json["results"]
+    assert fetched == ["/movie/551"]
+    assert [r["title"] for r in results] == ["Fight Club", "Fight Night"]
+    assert results[1]["poster_path"] == "/p.jpg" and results[1]["genre_ids"] == [18]
+    assert "budget" not in results[1]
+    # Filled documents stay in the index
+    assert not any(index.is_sparse(doc) for doc in index.documents())
+    assert client.get("/movies/search?q=fight+ni").json["results"][0]["title"] == "Fight Night"
+    assert fetched == ["/movie/551"]
+
+
+def test_failed_details_fetch_falls_back_upstream(monkeypatch):
+    index = SearchIndex(("title", "original_title"), "release_date")
+    index.add({"id": 550, "original_title": "Fight Club", "popularity": 60.0})
+    upstream = []
+    monkeypatch.setattr(movies, "movie_index", index)
+    monkeypatch.setattr(search_index, "tmdb_gather", lambda calls, **kwargs: [(b"{}", 503) for _ in calls])
+    monkeypatch.setattr(movies, "tmdb_passthrough",
+                        lambda path, params=None: upstream.append(params["query"]) or {"results": []})
+    app = create_app()
+    app.testing = True
+    with app.app_context():
+        cache.clear()
+
+    assert app.test_client().get("/movies/search?q=fight").status_code == 200
+    assert upstream == ["fight"]
+    assert index.is_sparse(index.documents()[0])
+
+
+def test_cli_commands_do_not_load_the_index(monkeypatch):
+    started = []
+    monkeypatch.setattr(search_index.socketio, "start_background_task",
+                        lambda target, *args: started.append(target))
+    with click.Context(click.Command("flask"), info_name="flask"):
+        create_app()
+    assert search_index._load not in started
+    create_app()
+    assert search_index._load in started
@@ -0,0 +1,136 @@
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from api.extensions import db
+from api.models import Session
+import api.routes.auth as auth
+import api.routes.movies as movies
+import api.session_cache as session_cache
+from api.session_cache import REVOKED, UNKNOWN, VALID, SessionCache
+
+
+def _client(app, monkeypatch):
+    posted = []
+
+    def fake_post(path, json_body=None, params=None):
+        posted.append(params["session_id"])
+        return {"success": True}, 201
+
+    monkeypatch.setattr(movies, "tmdb_post", fake_post)
+    monkeypatch.setattr(auth, "tmdb_delete", lambda path, json_body=None: ({"success": True}, 200))
+    with app.app_context():
+        db.session.add_all([
+            Session(tmdb_user_session_id="good"),
+            Session(tmdb_guest_session_id="old", revoked_at=db.func.now()),
+        ])
+        db.session.commit()
+    return app, app.test_client(), posted
+
+
+def test_entries_expire_and_unknown_ids_expire_sooner():
+    cache = SessionCache(ttl=60, negative_ttl=0.01, max_entries=2)
+    cache.put("a", VALID)
+    cache.put("b", UNKNOWN)
+    time.sleep(0.02)
+    assert cache.get("a") == VALID
+    assert cache.get("b") is None
+
+    cache.put("c", REVOKED)
+    cache.put("d", VALID)
+    assert cache.get("a") is None
+
+
+def test_rating_rejects_revoked_sessions_early(app, monkeypatch):
+    _, client, posted = _client(app, monkeypatch)
+
+    assert client.post("/movies/550/rating", json={"value": 8, "session_id": "good"}).status_code == 201
+    assert client.post("/movies/550/rating", json={"value": 8, "session_id": "old"}).status_code == 401
+    # Never seen here (issued elsewhere, or pruned): TMDB decides
+    assert client.post("/movies/550/rating", json={"value": 8, "session_id": "elsewhere"}).status_code == 201
+    assert posted == ["good", "elsewhere"]
+
+
+def test_state_lookups_search_the_partial_indexes(app):
+    with app.app_context():
+        for revoked, suffix in ((False, "active"), (True, "revoked")):
+            query = session_cache._lookup("some-id", revoked=revoked)
+            sql = str(query.compile(db.engine, compile_kwargs={"literal_binds": True}))
+            plan = " ".join(row[-1] for row in db.session.execute(db.text(f"EXPLAIN QUERY PLAN {sql}")))
+            assert "SCAN" not in plan
+            assert f"idx_sessions_guest_{suffix}" in plan and f"idx_sessions_user_{suffix}" in plan
+
+
+def test_rating_fails_open_when_the_sessions_table_is_down(app, monkeypatch):
+    _, client, posted = _client(app, monkeypatch)
+    with app.app_context():
+        db.drop_all()
+
+    assert client.post("/movies/550/rating", json={"value": 8, "session_id": "old"}).status_code == 201
+    assert session_cache._cache.get("old") is None
+    assert posted == ["old"]
+
+
+def test_logout_revokes_and_invalidates(app, monkeypatch):
+    _, client, posted = _client(app, monkeypatch)
+
+    assert client.post("/movies/550/rating", json={"value": 8, "session_id": "good"}).status_code == 201
+    assert client.delete("/auth/logout", json={"session_id": "good"}).status_code == 200
+    assert client.post("/movies/550/rating", json={"value": 8, "session_id": "good"}).status_code == 401
+    with app.app_context():
+        assert db.session.query(Session).filter_by(tmdb_user_session_id="good").one().revoked_at is not None
+
+
+def test_new_sessions_are_valid_before_they_are_flushed(app, monkeypatch):
+    _, client, posted = _client(app, monkeypatch)
+    monkeypatch.setattr(auth, "tmdb_get", lambda path, **kwargs: ({"guest_session_id": "fresh"}, 200))
+
+    client.get("/auth/guest-session")
+    assert client.post("/movies/550/rating", json={"value": 8, "session_id": "fresh"}).status_code == 201
+
+
+def test_listener_polls_and_resubscribes_after_a_dropped_connection(app, monkeypatch):
+    redis = pytest.importorskip("redis")
+
+    class Stop(BaseException):
+        pass
+
+    def event(session_id, state):
+        return {"type": "message", "data": json.dumps({"session_id": session_id, "state": state})}
+
+    scripts = [
+        [None, event("a", VALID), redis.ConnectionError("reset")],
+        [event("b", REVOKED), Stop()],
+    ]
+
+    class FakePubSub:
+        def __init__(self, script):
+            self.script = script
+
+        def subscribe(self, channel):
+            assert channel == session_cache.CHANNEL
+
+        def get_message(self, timeout=None):
+            assert timeout == 0
+            step = self.script.pop(0)
+            if isinstance(step, BaseException):
+                raise step
+            return step
+
+        def close(self):
+            pass
+
+    client = SimpleNamespace(pubsub=lambda ignore_subscribe_messages: FakePubSub(scripts.pop(0)))
+    slept = []
+    monkeypatch.setattr(session_cache, "socketio", SimpleNamespace(sleep=slept.append))
+    monkeypatch.setattr(session_cache, "_cache", SessionCache())
+
+    with pytest.raises(Stop):
+        session_cache._listen(app, client)
+
+    assert slept == [session_cache.LISTEN_POLL_INTERVAL, session_cache.RECONNECT_DELAY]
+    # Cleared on reconnect: anything missed while down is reloaded
+    assert session_cache._cache.get("a") is None
+    assert session_cache._cache.get("b") == REVOKED
@@ -0,0 +1,91 @@
+from datetime import date, datetime
+from types import SimpleNamespace
+
+import click
+import pytest
+
+from api.extensions import cache, db, socketio
+from api.models import Session
+import api.session_retention as session_retention
+from api.session_retention import _next_month, ensure_partitions, maintain_sessions, partition_name
+
+
+def test_partition_months():
+    assert partition_name(date(2026, 3, 1)) == "sessions_p202603"
+    assert _next_month(date(2026, 1, 1)) == date(2026, 2, 1)
+    assert _next_month(date(2026, 12, 1)) == date(2027, 1, 1)
+
+
+def test_unpartitioned_tables_delete_expired_guest_and_revoked_rows(app):
+    app.config["SESSION_RETENTION_DAYS"] = 30
+    old = datetime(2026, 1, 1)
+    with app.app_context():
+        db.session.add_all([
+            Session(tmdb_guest_session_id="old-guest", created_at=old),
+            Session(tmdb_user_session_id="old-user", created_at=old),
+            Session(tmdb_user_session_id="old-revoked", created_at=old, revoked_at=old),
+            Session(tmdb_guest_session_id="new-guest", created_at=datetime(2026, 3, 1)),
+        ])
+        db.session.commit()
+
+        assert maintain_sessions(today=date(2026, 3, 10))["deleted"] == 2
+
+        kept = db.session.scalars(db.select(Session)).all()
+        assert {s.tmdb_guest_session_id or s.tmdb_user_session_id for s in kept} == {"old-user", "new-guest"}
+
+
+class _RecordingConn:
+    def __init__(self, existing):
+        self.existing = existing
+        self.statements = []
+
+    def execute(self, statement):
+        self.statements.append(str(statement))
+        return SimpleNamespace(scalars=lambda: iter(self.existing))
+
+
+def test_ensure_partitions_creates_missing_months_across_the_year_end():
+    conn = _RecordingConn(["sessions_p202612", "sessions_default"])
+
+    assert ensure_partitions(conn, date(2026, 12, 15), ahead=2) == ["sessions_p202701", "sessions_p202702"]
+    assert conn.statements[1:] == [
+        "CREATE TABLE IF NOT EXISTS sessions_p202701 PARTITION OF sessions "
+        "FOR VALUES FROM ('2027-01-01') TO ('2027-02-01')",
+        "CREATE TABLE IF NOT EXISTS sessions_p202702 PARTITION OF sessions "
+        "FOR VALUES FROM ('2027-02-01') TO ('2027-03-01')",
+    ]
+
+
+def test_maintenance_runs_at_startup_before_the_first_sleep(app, monkeypatch):
+    class Stop(BaseException):
+        pass
+
+    events = []
+    app.config["SESSION_MAINTENANCE_INTERVAL"] = 60
+    monkeypatch.setattr(session_retention, "maintain_sessions", lambda: events.append("maintain") or {})
+
+    def sleep(seconds):
+        events.append(("sleep", seconds))
+        raise Stop
+
+    monkeypatch.setattr(socketio, "sleep", sleep)
+    monkeypatch.setattr(socketio, "start_background_task", lambda target: target())
+    with app.app_context():
+        cache.delete("sessions:maintenance:running")
+
+    with pytest.raises(Stop):
+        session_retention.init_session_retention(app)
+    assert events == ["maintain", ("sleep", 60)]
+
+
+def test_cli_commands_do_not_start_maintenance(app, monkeypatch):
+    started = []
+    app.config["SESSION_MAINTENANCE_INTERVAL"] = 60
+    monkeypatch.setattr(socketio, "start_background_task", started.append)
+
+    with click.Context(click.Group("flask"), info_name="flask"):
+        session_retention.init_session_retention(app)
+    assert started == []
+    with click.Context(click.Command("run"), info_name="run"):
+        session_retention.init_session_retention(app)
+    assert len(started) == 1
@@ -0,0 +1,60 @@
+import time
+
+from api.extensions import db, socketio
+from api.models import Session
+import api.routes.auth as auth
+import api.session_writer as session_writer
+from api.session_writer import SessionWriter
+
+
+def _count(app):
+    with app.app_context():
+        return db.session.query(Session).count()
+
+
+def test_rows_wait_for_a_flush_then_insert_together(app):
+    writer = SessionWriter(app, flush_rows=10, flush_interval=60)
+    writer.put({"tmdb_guest_session_id": "g1"})
+    writer.put({"tmdb_user_session_id": "u1"})
+
+    assert _count(app) == 0
+    assert writer.flush() == 2
+    assert _count(app) == 2
+    assert writer.stats() == {"pending": 0, "written": 2, "dropped": 0}
+
+
+def test_background_task_flushes_on_size_and_close(app):
+    writer = SessionWriter(app, flush_rows=2, flush_interval=60)
+    writer.start()
+    try:
+        writer.put({"tmdb_guest_session_id": "g1"})
+        writer.put({"tmdb_guest_session_id": "g2"})
+        deadline = time.monotonic() + 5
+        while _count(app) < 2:
+            assert time.monotonic() < deadline
+            socketio.sleep(0.01)
+
+        writer.put({"tmdb_guest_session_id": "g3"})
+    finally:
+        writer.close()
+    assert _count(app) == 3
+
+
+def test_failed_flush_keeps_rows_and_bounds_the_buffer(app):
+    with app.app_context():
+        db.drop_all()
+    writer = SessionWriter(app, flush_rows=10, flush_interval=60, max_pending=2)
+    for i in range(3):
+        writer.put({"tmdb_guest_session_id": f"g{i}"})
+
+    assert writer.flush() == 0
+    assert writer.stats() == {"pending": 2, "written": 0, "dropped": 1}
+
+
+def test_durable_mode_commits_inline(app, monkeypatch):
+    monkeypatch.setattr(session_writer, "_writer", None)
+    monkeypatch.setattr(auth, "tmdb_get", lambda path, **kwargs: ({"guest_session_id": "g1", "success": True}, 200))
+
+    assert app.test_client().get("/auth/guest-session").status_code == 200
+    with app.app_context():
+        assert db.session.query(Session).one().tmdb_guest_session_id == "g1"
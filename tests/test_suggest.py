@@ -0,0 +1,61 @@
+from api.app import create_app
+from api.suggest import PrefixIndex, normalize
+import api.routes.tv as tv
+
+TITLES = [
+    {"id": 155, "title": "The Dark Knight", "release_date": "2008-07-16", "popularity": 80.0},
+    {"id": 49026, "title": "The Dark Knight Rises", "release_date": "2012-07-17", "popularity": 60.0},
+    {"id": 9767, "title": "Darkman", "release_date": "1990-08-24", "popularity": 30.0},
+    {"id": 1, "title": "Dark", "popularity": 10.0},
+    {"id": 557, "title": "Spider-Man", "release_date": "2002-05-01", "popularity": 70.0},
+    {"id": 2, "title": "Amélie", "popularity": 20.0},
+]
+
+
+def _index():
+    index = PrefixIndex("title", "release_date")
+    index.load(TITLES)
+    return index
+
+
+def test_normalize_folds_punctuation_and_accents():
+    assert normalize("  Spider-Man: Far From Home ") == "spider man far from home"
+    assert normalize("Amélie") == "amelie"
+
+
+def test_suggest_ranks_by_popularity_and_matches_any_word():
+    index = _index()
+
+    # Mid-title matches count half: 80 * 0.5 = 40 beats Darkman's 30
+    assert [s["id"] for s in index.suggest("dark")] == [155, 49026, 9767, 1]
+    assert [s["id"] for s in index.suggest("the dark kn", limit=1)] == [155]
+    assert index.suggest("spider m") == [
+        {"id": 557, "title": "Spider-Man", "year": 2002, "popularity": 70.0}
+    ]
+    assert index.suggest("AME")[0]["title"] == "Amélie"
+    assert index.suggest("zzz") == []
+    assert index.suggest("  ") == []
+
+
+def test_each_title_is_suggested_once():
+    index = PrefixIndex("title", "release_date")
+    index.load([{"id": 7, "title": "Dark Dark Dark", "popularity": 1.0}])
+    assert [s["id"] for s in index.suggest("da")] == [7]
+    assert index.memory_bytes() > 0
+
+
+def test_documents_without_a_title_use_the_fallback_field():
+    index = PrefixIndex("title", "release_date", "original_title")
+    index.load([{"id": 550, "original_title": "Fight Club", "popularity": 60.0}])
+    assert [s["id"] for s in index.suggest("fight")] == [550]
+
+
+def test_suggest_route(monkeypatch):
+    index = PrefixIndex("name", "first_air_date")
+    index.load([{"id": 1399, "name": "Game of Thrones", "popularity": 300.0}])
+    monkeypatch.setattr(tv, "tv_suggest", index)
+    client = create_app().test_client()
+
+    assert client.get("/tv/suggest?prefix=game").json["results"][0]["id"] == 1399
+    assert client.get("/tv/suggest?prefix=thr&limit=0").json["results"][0]["id"] == 1399
+    assert client.get("/tv/suggest").status_code == 400
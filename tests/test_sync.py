@@ -0,0 +1,97 @@
+from datetime import date
+
+import pytest
+
+from api.caching import build_cache_key, cache_body, cached_body
+from api.extensions import db
+from api.models import Movie
+from api.search_index import SearchIndex
+import api.sync as sync
+
+CHANGES = {
+    ("2024-05-01", "2024-05-14"): [[{"id": 550}, {"id": 13}], [{"id": 550}, {"id": 404}]],
+    ("2024-05-15", "2024-05-20"): [[{"id": 680}]],
+}
+
+
+def _fake_upstream(monkeypatch, fail_on=None):
+    details_calls = []
+
+    def page(params):
+        pages = CHANGES[(params["start_date"], params["end_date"])]
+        return {"results": pages[params["page"] - 1], "page": params["page"], "total_pages": len(pages)}, 200
+
+    def fake_get(path, params=None, priority=None):
+        assert path == "/movie/changes"
+        return page(params)
+
+    def fake_gather(calls, priority=None, raw=False):
+        assert priority == sync.BACKGROUND
+        results = []
+        for path, params in calls:
+            if path == "/movie/changes":
+                results.append(page(params))
+                continue
+            movie_id = int(path.rsplit("/", 1)[1])
+            details_calls.append(movie_id)
+            if movie_id == fail_on:
+                results.append(({"error": "rate limited"}, 503))
+            elif movie_id == 404:
+                results.append(({"error": "not found"}, 404))
+            else:
+                results.append(({
+                    "id": movie_id, "title": f"Movie {movie_id}", "original_title": f"Movie {movie_id}",
+                    "popularity": 1.5, "genres": [{"id": 18, "name": "Drama"}], "runtime": 139,
+                }, 200))
+        return results
+
+    monkeypatch.setattr(sync, "tmdb_get", fake_get)
+    monkeypatch.setattr(sync, "tmdb_gather", fake_gather)
+    return details_calls
+
+
+@pytest.fixture
+def app(app):
+    with app.app_context():
+        db.session.add(Movie(id=404, original_title="Removed"))
+        db.session.commit()
+    return app
+
+
+def test_sync_upserts_changes_and_invalidates_details(app, monkeypatch):
+    details_calls = _fake_upstream(monkeypatch)
+
+    monkeypatch.setattr(sync, "movie_index", SearchIndex(("title", "original_title"), "release_date"))
+    monkeypatch.setitem(sync.SOURCES["movies"], "index", sync.movie_index)
+    sync.movie_index.add({"id": 550, "title": "Old"})
+
+    with app.test_request_context():
+        cache_body(build_cache_key("/movies/550"), b'{"id":550}')
+        cache_body(build_cache_key("/movies/550/reviews", {"page": 1}), b'{"results":[]}')
+        sync._set_high_water_mark("movies", date(2024, 5, 1))
+
+        totals = sync.sync_changes("movies", today=date(2024, 5, 20))
+
+        assert totals == {"changed": 4, "updated": 3, "deleted": 1}
+        assert sorted(details_calls) == [13, 404, 550, 680]
+        assert sorted(m.id for m in Movie.query) == [13, 550, 680]
+        assert cached_body(build_cache_key("/movies/550")) is None
+        assert cached_body(build_cache_key("/movies/550/reviews", {"page": 1})) is None
+        assert sync.movie_index.documents() == [{
+            "id": 550, "title": "Movie 550", "original_title": "Movie 550",
+            "popularity": 1.5, "genre_ids": [18],
+        }]
+        assert sync.high_water_mark("movies") == date(2024, 5, 20)
+
+
+def test_failed_window_keeps_high_water_mark(app, monkeypatch):
+    _fake_upstream(monkeypatch, fail_on=680)
+
+    with app.app_context():
+        sync._set_high_water_mark("movies", date(2024, 5, 1))
+        with pytest.raises(sync.SyncError):
+            sync.sync_changes("movies", today=date(2024, 5, 20))
+
+        # The first window was applied; a restart continues from it
+        assert sync.high_water_mark("movies") == date(2024, 5, 14)
+        assert db.session.get(Movie, 550).original_title == "Movie 550"
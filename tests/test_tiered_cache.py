@@ -0,0 +1,89 @@
+from flask_caching.backends import FileSystemCache, SimpleCache
+
+from api.tiered_cache import ByteLRUCache, TieredCache
+
+
+def test_l1_evicts_least_recently_used_by_bytes():
+    l1 = ByteLRUCache(max_bytes=300)
+    l1.set("a", "x" * 100)
+    l1.set("b", "y" * 100)
+    l1.get("a")
+    l1.set("c", "z" * 100)
+
+    assert l1.size <= 300
+    assert l1.get("a") is not None
+    assert l1.get("b") is None
+    assert l1.evictions == 1
+
+
+def test_values_larger_than_l1_are_not_stored():
+    l1 = ByteLRUCache(max_bytes=10)
+    assert not l1.set("big", "x" * 100)
+    assert len(l1) == 0
+
+
+def test_workers_share_l2_and_promote_into_l1():
+    # Two workers with their own L1 in front of one shared L2
+    shared = SimpleCache()
+    first = TieredCache(ByteLRUCache(), shared)
+    second = TieredCache(ByteLRUCache(), shared)
+
+    first.set("view/trending/all?page=1", {"results": [1, 2]})
+    assert second.get("view/trending/all?page=1") == {"results": [1, 2]}
+    assert second.get("view/trending/all?page=1") == {"results": [1, 2]}
+
+    stats = second.stats()
+    assert stats["l2"]["hits"] == 1
+    assert stats["l1"]["hits"] == 1
+    assert stats["l2"]["promotions"] == 1
+
+
+def test_evicted_entries_are_still_served_from_l2(tmp_path):
+    tiered = TieredCache(ByteLRUCache(max_bytes=200), FileSystemCache(str(tmp_path)))
+    tiered.set("a", "x" * 100)
+    tiered.set("b", "y" * 100)
+
+    assert tiered.l1.get("a") is None
+    assert tiered.get("a") == "x" * 100
+
+
+def test_add_is_decided_by_the_shared_tier():
+    shared = SimpleCache()
+    first = TieredCache(ByteLRUCache(), shared)
+    second = TieredCache(ByteLRUCache(), shared)
+
+    assert first.add("lock", True)
+    assert not second.add("lock", True)
+    first.delete("lock")
+    assert second.add("lock", True)
+
+
+def test_delete_many_goes_past_missing_keys():
+    tiered = TieredCache(ByteLRUCache(), SimpleCache())
+    tiered.set("b", 1)
+    tiered.set("c", 2)
+
+    assert tiered.delete_many("a", "b", "c") == ["b", "c"]
+    assert tiered.get("b") is None and tiered.get("c") is None
+
+
+class _DownCache(SimpleCache):
+    def _fail(self, *args, **kwargs):
+        raise ConnectionError("L2 is down")
+
+    get = set = add = delete = has = clear = _fail
+
+
+def test_unreachable_l2_degrades_to_l1():
+    tiered = TieredCache(ByteLRUCache(), _DownCache())
+
+    assert tiered.get("a") is None
+    assert tiered.set("a", 1) is False
+    # Still served from L1, which the failed write filled
+    assert tiered.get("a") == 1
+    assert tiered.has("a")
+    assert tiered.delete("a") is False
+    assert tiered.get("a") is None
+    # No lock without the shared tier
+    assert tiered.add("lock", True) is False
+    assert tiered.stats()["l2"]["errors"] == 5
@@ -0,0 +1,318 @@
+import json
+import threading
+import time
+
+from api.app import create_app
+import api.tmdb_client as tmdb_client
+
+
+def _app():
+    app = create_app()
+    app.testing = True
+    app.config["TMDB_READ_TOKEN"] = "test-token"
+    return app
+
+
+def test_gather_returns_results_in_call_order(monkeypatch):
+    def fake_send(path, params, headers, timeout, priority=0, raw=False):
+        time.sleep(0.01 if path.endswith("1") else 0)
+        return {"path": path}, 200
+
+    monkeypatch.setattr(tmdb_client, "_send_get", fake_send)
+
+    with _app().app_context():
+        results = tmdb_client.tmdb_gather([("/movie/1", None), ("/movie/2", None)])
+
+    assert results == [({"path": "/movie/1"}, 200), ({"path": "/movie/2"}, 200)]
+
+
+def test_gather_runs_concurrently_up_to_limit(monkeypatch):
+    in_flight = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def fake_send(path, params, headers, timeout, priority=0, raw=False):
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        time.sleep(0.02)
+        with lock:
+            in_flight -= 1
+        return {}, 200
+
+    monkeypatch.setattr(tmdb_client, "_send_get", fake_send)
+
+    app = _app()
+    app.config["TMDB_MAX_CONCURRENCY"] = 3
+    with app.app_context():
+        tmdb_client.tmdb_gather([(f"/movie/{i}", None) for i in range(9)])
+
+    assert peak == 3
+
+
+def test_gather_can_be_called_from_many_threads_at_once(monkeypatch):
+    def fake_send(path, params, headers, timeout, priority=0, raw=False):
+        time.sleep(0.01)
+        return {"path": path}, 200
+
+    monkeypatch.setattr(tmdb_client, "_send_get", fake_send)
+    app = _app()
+    results = {}
+
+    def worker(n):
+        with app.app_context():
+            results[n] = tmdb_client.tmdb_gather([(f"/movie/{n}{i}", None) for i in range(5)])
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert results == {
+        n: [({"path": f"/movie/{n}{i}"}, 200) for i in range(5)] for n in range(4)
+    }
+
+
+def test_gather_turns_connection_errors_into_502(monkeypatch):
+    def fake_send(path, params, headers, timeout, priority=0, raw=False):
+        raise tmdb_client.requests.ConnectionError("boom")
+
+    monkeypatch.setattr(tmdb_client, "_send_get", fake_send)
+
+    with _app().app_context():
+        assert tmdb_client.tmdb_gather([("/movie/1", None)])[0][1] == 502
+
+
+def test_identical_concurrent_gets_are_coalesced(monkeypatch):
+    calls = []
+    release = threading.Event()
+
+    def fake_fetch(path, params, headers, timeout, priority=0, raw=False):
+        calls.append(path)
+        release.wait(1)
+        return {"results": []}, 200
+
+    monkeypatch.setattr(tmdb_client, "_fetch_get", fake_fetch)
+    before = tmdb_client.coalesce_stats()["collapsed"]
+
+    app = _app()
+    results = []
+
+    def worker():
+        with app.app_context():
+            results.append(tmdb_client.tmdb_get("/trending/all/day", {"page": 1}))
+
+    threads = [threading.Thread(target=worker) for _ in range(5)]
+    for t in threads:
+        t.start()
+    deadline = time.monotonic() + 2
+    while tmdb_client.coalesce_stats()["collapsed"] - before < 4:
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert calls == ["/trending/all/day"]
+    assert results == [({"results": []}, 200)] * 5
+
+
+def test_token_minting_gets_are_never_coalesced(monkeypatch):
+    calls = []
+    started = threading.Barrier(3, timeout=2)
+
+    def fake_fetch(path, params, headers, timeout, priority=0, raw=False):
+        started.wait()
+        calls.append(path)
+        return {"request_token": f"token-{len(calls)}"}, 200
+
+    monkeypatch.setattr(tmdb_client, "_fetch_get", fake_fetch)
+
+    app = _app()
+    results = []
+
+    def worker():
+        with app.app_context():
+            results.append(tmdb_client.tmdb_get("/authentication/token/new"))
+
+    threads = [threading.Thread(target=worker) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 3
+    assert len({data["request_token"] for data, _ in results}) == 3
+
+
+def test_upstream_429_pauses_and_retries(monkeypatch):
+    class Resp:
+        def __init__(self, status, headers=None):
+            self.status_code = status
+            self.headers = headers or {}
+
+        def json(self):
+            return {"ok": self.status_code == 200}
+
+        @property
+        def content(self):
+            return b'{"ok": true}'
+
+    responses = [Resp(429, {"Retry-After": "0"}), Resp(200)]
+    monkeypatch.setattr(
+        tmdb_client._session, "request", lambda *a, **k: responses.pop(0)
+    )
+
+    with _app().app_context():
+        assert tmdb_client.tmdb_get("/movie/550") == ({"ok": True}, 200)
+    assert responses == []
+
+
+class _Resp:
+    def __init__(self, status, payload=None):
+        self.status_code = status
+        self.headers = {}
+        self.payload = payload or {}
+
+    def json(self):
+        return self.payload
+
+    @property
+    def content(self):
+        return json.dumps(self.payload).encode()
+
+
+def _retry_app():
+    app = _app()
+    app.config.update(TMDB_RETRY_BACKOFF=0, TMDB_BREAKER_THRESHOLD=1)
+    tmdb_client.init_tmdb_client(app)
+    return app
+
+
+def test_get_retries_5xx(monkeypatch):
+    responses = [_Resp(502), _Resp(200, {"id": 550})]
+    monkeypatch.setattr(
+        tmdb_client._session, "request", lambda *a, **k: responses.pop(0)
+    )
+
+    with _retry_app().app_context():
+        assert tmdb_client.tmdb_get("/movie/550") == ({"id": 550}, 200)
+
+
+def test_open_circuit_serves_stale_then_fails_fast(monkeypatch):
+    app = _retry_app()
+    monkeypatch.setattr(
+        tmdb_client._session, "request", lambda *a, **k: _Resp(200, {"id": 1})
+    )
+    with app.app_context():
+        assert tmdb_client.tmdb_get("/movie/1")[1] == 200
+
+    def down(*a, **k):
+        raise tmdb_client.requests.Timeout("slow")
+
+    monkeypatch.setattr(tmdb_client._session, "request", down)
+    with app.app_context():
+        assert tmdb_client.tmdb_get("/movie/1") == ({"id": 1}, 200)
+        assert tmdb_client.breaker_states()["/movie"] == "open"
+        assert tmdb_client.tmdb_get("/movie/2") == tmdb_client.CIRCUIT_OPEN
+
+
+def test_auth_gets_are_never_served_stale(monkeypatch):
+    app = _retry_app()
+    monkeypatch.setattr(
+        tmdb_client._session, "request", lambda *a, **k: _Resp(200, {"request_token": "t1"})
+    )
+    with app.app_context():
+        assert tmdb_client.tmdb_get("/authentication/token/new")[1] == 200
+
+    def down(*a, **k):
+        raise tmdb_client.requests.Timeout("slow")
+
+    monkeypatch.setattr(tmdb_client._session, "request", down)
+    with app.app_context():
+        assert tmdb_client.tmdb_get("/authentication/token/new")[1] == 504
+        assert tmdb_client.breaker_states()["/authentication"] == "open"
+        assert tmdb_client.tmdb_get("/authentication/token/new") == tmdb_client.CIRCUIT_OPEN
+
+
+def test_other_request_errors_fail_and_free_the_trial(monkeypatch):
+    app = _app()
+    app.config.update(TMDB_RETRY_BACKOFF=0, TMDB_BREAKER_THRESHOLD=1, TMDB_BREAKER_RESET=0)
+    tmdb_client.init_tmdb_client(app)
+
+    def broken(*a, **k):
+        raise tmdb_client.requests.exceptions.ChunkedEncodingError("cut off")
+
+    monkeypatch.setattr(tmdb_client._session, "request", broken)
+    with app.app_context():
+        assert tmdb_client.tmdb_get("/tv/1")[1] == 502
+        # This one is the half-open trial; it must end even though it failed
+        assert tmdb_client.tmdb_get("/tv/1")[1] == 502
+        monkeypatch.setattr(tmdb_client._session, "request", lambda *a, **k: _Resp(200, {"id": 1}))
+        assert tmdb_client.tmdb_get("/tv/1") == ({"id": 1}, 200)
+
+
+def test_passthrough_returns_upstream_bytes(monkeypatch):
+    body = b'{"id":550,"title":"Fight Club"}'
+
+    class Raw(_Resp):
+        content = body
+
+        def json(self):
+            raise AssertionError("passthrough must not parse the body")
+
+    monkeypatch.setattr(tmdb_client._session, "request", lambda *a, **k: Raw(200))
+
+    with _app().test_request_context():
+        resp = tmdb_client.tmdb_passthrough("/movie/550")
+
+    assert resp.status_code == 200
+    assert resp.get_data() == body
+    assert resp.mimetype == "application/json"
+
+
+def test_upstream_revalidation_reuses_body_on_304(monkeypatch):
+    sent = []
+
+    class Tagged(_Resp):
+        def __init__(self, status, payload=None):
+            super().__init__(status, payload)
+            self.headers = {"ETag": '"v1"'}
+
+    responses = [Tagged(200, {"id": 550}), Tagged(304)]
+
+    def request(method, url, headers=None, **kwargs):
+        sent.append(headers)
+        return responses.pop(0)
+
+    monkeypatch.setattr(tmdb_client._session, "request", request)
+
+    with _app().app_context():
+        assert tmdb_client.tmdb_get("/movie/550") == ({"id": 550}, 200)
+        assert tmdb_client.tmdb_get("/movie/550") == ({"id": 550}, 200)
+
+    assert "If-None-Match" not in sent[0]
+    assert sent[1]["If-None-Match"] == '"v1"'
+
+
+def test_appended_response_is_split_into_standalone_bodies(monkeypatch):
+    seen = []
+
+    def fake_send(path, params, headers, timeout, priority=0, raw=False):
+        seen.append((path, params))
+        doc = {"id": 1399, "name": "GoT", "keywords": {"results": [1]}, "similar": {"page": 1}}
+        return json.dumps(doc).encode(), 200
+
+    monkeypatch.setattr(tmdb_client, "_send_get", fake_send)
+
+    with _app().app_context():
+        parts, status = tmdb_client.tmdb_get_appended("/tv/1399", ["keywords", "similar", "reviews"])
+
+    assert status == 200
+    assert seen == [("/tv/1399", {"append_to_response": "keywords,similar,reviews"})]
+    assert json.loads(parts[""]) == {"id": 1399, "name": "GoT"}
+    assert json.loads(parts["keywords"]) == {"id": 1399, "results": [1]}
+    assert json.loads(parts["similar"]) == {"page": 1}
+    assert "reviews" not in parts
@@ -0,0 +1,81 @@
+import json
+
+from api.app import create_app
+from api.extensions import cache, socketio
+import api.trending_push as trending_push
+from api.trending_push import diff, refresh_feed
+
+
+def _movie(movie_id):
+    return {"id": movie_id, "media_type": "movie", "title": f"Movie {movie_id}"}
+
+
+def _serve(monkeypatch, pages):
+    calls = []
+
+    def fake_get_raw(path, params=None, priority=None):
+        calls.append(path)
+        return json.dumps({"page": 1, "results": pages[0]}).encode(), 200
+
+    monkeypatch.setattr(trending_push, "tmdb_get_raw", fake_get_raw)
+    return calls
+
+
+def test_diff_reports_entries_exits_and_moves_only():
+    previous = [_movie(1), _movie(2), _movie(3)]
+    current = [_movie(2), _movie(1), _movie(4)]
+
+    delta = diff("movies", previous, current)
+
+    assert delta["entered"] == [{"rank": 3, "item": _movie(4)}]
+    assert delta["exited"] == [{"media_type": "movie", "id": 3, "rank": 3}]
+    assert delta["moved"] == [
+        {"media_type": "movie", "id": 2, "from": 2, "to": 1},
+        {"media_type": "movie", "id": 1, "from": 1, "to": 2},
+    ]
+    assert diff("movies", current, current) == {"entered": [], "exited": [], "moved": []}
+
+
+def test_all_feed_keys_on_media_type():
+    movie = {"id": 7, "media_type": "movie"}
+    show = {"id": 7, "media_type": "tv"}
+
+    assert diff("all", [movie], [show])["entered"] == [{"rank": 1, "item": show}]
+
+
+def test_subscribers_get_a_snapshot_then_deltas(monkeypatch):
+    pages = [[_movie(1), _movie(2)]]
+    _serve(monkeypatch, pages)
+    app = create_app()
+    with app.app_context():
+        cache.clear()
+
+    movies = socketio.test_client(app)
+    tv = socketio.test_client(app)
+    assert movies.emit("trending:subscribe", {"feed": "movies"}, callback=True) == {"subscribed": "movies"}
+    tv.emit("trending:subscribe", {"feed": "tv"}, callback=True)
+
+    snapshot = movies.get_received()[0]
+    assert snapshot["name"] == "trending:snapshot"
+    assert snapshot["args"][0]["version"] == 1
+    tv.get_received()
+
+    pages[0] = [_movie(2), _movie(3)]
+    with app.app_context():
+        delta = refresh_feed("movies")
+        # A second refresh with the same ranking sends nothing
+        assert refresh_feed("movies") is None
+
+    received = movies.get_received()
+    assert [message["name"] for message in received] == ["trending:delta"]
+    assert received[0]["args"][0] == delta
+    assert delta["from_version"] == 1 and delta["version"] == 2
+    assert [e["item"]["id"] for e in delta["entered"]] == [3]
+    assert tv.get_received() == []
+
+
+def test_subscribe_rejects_unknown_feeds(monkeypatch):
+    _serve(monkeypatch, [[]])
+    client = socketio.test_client(create_app())
+
+    assert "error" in client.emit("trending:subscribe", {"feed": "people"}, callback=True)